@@ -0,0 +1 @@
+"""Load and performance checks run against local services (see README)."""
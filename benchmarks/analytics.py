@@ -0,0 +1,86 @@
+"""
+Benchmark vectorized transcript analytics against a per-word Python loop.
+
+    python -m benchmarks.analytics --transcripts 2000 --words 3000
+
+Both paths compute low-confidence spans (rolling mean over --window words),
+words per minute per 60 s bucket and silence gaps of at least 2 s.
+"""
+
+import argparse
+import random
+import time
+
+from stt.analytics import Timeline, low_confidence_spans, silence_gaps, words_per_minute
+from stt.models import TranscriptionResult, Word
+
+
+def make_transcript(word_count: int, rng: random.Random) -> TranscriptionResult:
+    """Words every 300 ms with occasional 3 s pauses and mostly high confidence."""
+    words = []
+    at_ms = 0
+    for _ in range(word_count):
+        if rng.random() < 0.01:
+            at_ms += 3000
+        words.append(Word("word", at_ms, at_ms + 250, rng.betavariate(8, 2)))
+        at_ms += 300
+    return TranscriptionResult(
+        text="",
+        words=tuple(words),
+        sentences=(),
+        language_code="en",
+        confidence=0.8,
+        duration_ms=at_ms,
+        audio_url="https://example.com/audio.mp3",
+    )
+
+
+def vectorized(result: TranscriptionResult, window: int, threshold: float) -> int:
+    timeline = Timeline.from_words(result.words)
+    spans = low_confidence_spans(timeline, threshold, window)
+    words_per_minute(timeline, result.duration_ms, 60_000)
+    return len(spans) + len(silence_gaps(timeline, 2000))
+
+
+def looped(result: TranscriptionResult, window: int, threshold: float) -> int:
+    words = result.words
+    window = max(1, min(window, len(words)))
+    covered = [False] * len(words)
+    for first in range(len(words) - window + 1):
+        mean = sum(w.confidence for w in words[first : first + window]) / window
+        if mean < threshold:
+            for index in range(first, first + window):
+                covered[index] = True
+    spans = sum(1 for n, c in enumerate(covered) if c and (n == 0 or not covered[n - 1]))
+    buckets: dict[int, int] = {}
+    for word in words:
+        buckets[word.start_ms // 60_000] = buckets.get(word.start_ms // 60_000, 0) + 1
+    gaps = sum(1 for a, b in zip(words, words[1:], strict=False) if b.start_ms - a.end_ms >= 2000)
+    return spans + gaps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transcripts", type=int, default=2_000)
+    parser.add_argument("--words", type=int, default=3_000)
+    parser.add_argument("--window", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    transcripts = [make_transcript(args.words, rng) for _ in range(args.transcripts)]
+    print(f"{args.transcripts} transcripts x {args.words} words, window {args.window}")
+
+    for name, analyze in (("numpy", vectorized), ("python", looped)):
+        started = time.perf_counter()
+        found = sum(analyze(result, args.window, args.threshold) for result in transcripts)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:>8}: {elapsed:8.2f} s, {args.transcripts / elapsed:8.0f} transcripts/s, "
+            f"{found} spans + gaps"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Seed a large campaign and print the query plans for campaign lookups.
+
+Runs against the configured database (e.g. the docker compose PostgreSQL):
+
+    python -m benchmarks.query_plans --rows 1000000
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import insert, text
+
+from core.db import create_campaign, get_engine, init_db
+from core.models import ContentItem, Failure
+
+BATCH_SIZE = 10_000
+STATUSES = ("completed", "completed", "completed", "failed", "pending")
+
+QUERIES = {
+    "campaign items": (
+        "SELECT * FROM content_items WHERE campaign_id = :cid",
+        {},
+    ),
+    "failed items": (
+        "SELECT * FROM content_items WHERE campaign_id = :cid AND status = :status",
+        {"status": "failed"},
+    ),
+    "retryable failures": (
+        "SELECT * FROM failures WHERE campaign_id = :cid AND error = :error",
+        {"error": "RATE_LIMITED"},
+    ),
+}
+
+
+def seed(rows: int, campaigns: int) -> str:
+    """Insert `rows` items spread over `campaigns` campaigns; return the last campaign id."""
+    campaign_ids = [create_campaign(f"bench-{i}").id for i in range(campaigns)]
+    engine = get_engine()
+    for offset in range(0, rows, BATCH_SIZE):
+        items = []
+        failures = []
+        for n in range(offset, min(offset + BATCH_SIZE, rows)):
+            item_id = str(uuid.uuid4())
+            campaign_id = campaign_ids[n % campaigns]
+            status = STATUSES[n % len(STATUSES)]
+            items.append(
+                {
+                    "id": item_id,
+                    "campaign_id": campaign_id,
+                    "source_url": f"https://example.com/{n}",
+                    "type": "video",
+                    "status": status,
+                }
+            )
+            if status == "failed":
+                failures.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "item_id": item_id,
+                        "campaign_id": campaign_id,
+                        "stage": "stt",
+                        "error": "RATE_LIMITED",
+                        "message": "rate limit exceeded",
+                    }
+                )
+        with engine.begin() as connection:
+            connection.execute(insert(ContentItem), items)
+            if failures:
+                connection.execute(insert(Failure), failures)
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("ANALYZE content_items"))
+            connection.execute(text("ANALYZE failures"))
+    return campaign_ids[-1]
+
+
+def explain(campaign_id: str) -> None:
+    engine = get_engine()
+    with engine.connect() as connection:
+        prefix = (
+            "EXPLAIN ANALYZE" if connection.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN"
+        )
+        for name, (sql, params) in QUERIES.items():
+            rows = connection.execute(text(f"{prefix} {sql}"), {"cid": campaign_id, **params})
+            print(f"-- {name}")
+            for row in rows:
+                print("  ", " ".join(str(col) for col in row))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--campaigns", type=int, default=100)
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    campaign_id = seed(args.rows, args.campaigns)
+    print(f"Seeded {args.rows} items in {time.perf_counter() - started:.1f}s")
+    explain(campaign_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark the term scanner against naive per-term substring search.
+
+    python -m benchmarks.scanner --transcripts 10000 --words 500 --terms 5000
+
+The naive baseline loops over every term for every transcript text; it runs
+on --naive-sample transcripts and is extrapolated, since it is too slow to run
+on all of them.
+"""
+
+import argparse
+import random
+import time
+
+from stt.models import TranscriptionResult, Word
+from stt.scanner import KeywordScanner, normalize
+
+_SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa", "do", "fi")
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    vocabulary: set[str] = set()
+    while len(vocabulary) < size:
+        vocabulary.add("".join(rng.choices(_SYLLABLES, k=rng.randint(1, 4))))
+    return sorted(vocabulary)
+
+
+def make_transcripts(
+    count: int, word_count: int, vocabulary: list[str], rng: random.Random
+) -> list[TranscriptionResult]:
+    transcripts = []
+    for _ in range(count):
+        tokens = rng.choices(vocabulary, k=word_count)
+        words = tuple(
+            Word(text=token, start_ms=n * 300, end_ms=n * 300 + 250, confidence=0.9)
+            for n, token in enumerate(tokens)
+        )
+        transcripts.append(
+            TranscriptionResult(
+                text=" ".join(tokens),
+                words=words,
+                sentences=(),
+                language_code="en",
+                confidence=0.9,
+                duration_ms=word_count * 300,
+                audio_url="https://example.com/audio.mp3",
+            )
+        )
+    return transcripts
+
+
+def naive_scan(text: str, terms: list[str]) -> int:
+    padded = f" {' '.join(normalize(token) for token in text.split())} "
+    return sum(padded.count(f" {term} ") for term in terms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transcripts", type=int, default=10_000)
+    parser.add_argument("--words", type=int, default=500)
+    parser.add_argument("--terms", type=int, default=5_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--naive-sample", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    terms = [
+        " ".join(rng.choices(vocabulary, k=rng.choice((1, 1, 2, 3)))) for _ in range(args.terms)
+    ]
+    transcripts = make_transcripts(args.transcripts, args.words, vocabulary, rng)
+    total_words = args.transcripts * args.words
+    print(f"{args.transcripts} transcripts x {args.words} words, {args.terms} terms")
+
+    started = time.perf_counter()
+    scanner = KeywordScanner(("bench", term) for term in terms)
+    print(f"{'compile':>10}: {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    hits = sum(len(found) for found in scanner.scan_batch(transcripts))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'automaton':>10}: {elapsed:8.2f} s, {args.transcripts / elapsed:8.0f} transcripts/s, "
+        f"{total_words / elapsed / 1e6:.2f} M words/s, {hits} hits"
+    )
+
+    sample = transcripts[: args.naive_sample]
+    started = time.perf_counter()
+    for transcript in sample:
+        naive_scan(transcript.text, terms)
+    per_transcript = (time.perf_counter() - started) / len(sample)
+    print(
+        f"{'naive':>10}: {per_transcript * args.transcripts:8.2f} s (extrapolated), "
+        f"{1 / per_transcript:8.0f} transcripts/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
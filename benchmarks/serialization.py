@@ -0,0 +1,79 @@
+"""
+Benchmark JSON encoding of large transcripts for every installed backend.
+
+    python -m benchmarks.serialization --words 30000
+"""
+
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+from functools import partial
+
+from core.serialization import BACKENDS, _load_backend
+from stt.models import Sentence, TranscriptionResult, Word
+
+
+def make_transcript(word_count: int) -> TranscriptionResult:
+    words = tuple(
+        Word(text=f"word{n}", start_ms=n * 300, end_ms=n * 300 + 250, confidence=0.9)
+        for n in range(word_count)
+    )
+    sentences = tuple(
+        Sentence(
+            text=" ".join(w.text for w in words[n : n + 12]),
+            start_ms=words[n].start_ms,
+            end_ms=words[min(n + 11, word_count - 1)].end_ms,
+        )
+        for n in range(0, word_count, 12)
+    )
+    return TranscriptionResult(
+        text=" ".join(s.text for s in sentences),
+        words=words,
+        sentences=sentences,
+        language_code="en",
+        confidence=0.9,
+        duration_ms=word_count * 300,
+        audio_url="https://example.com/audio.mp3",
+    )
+
+
+def _time(stmt: Callable[[], object], repeat: int) -> float:
+    """Best-of-`repeat` wall time in milliseconds."""
+    return min(timeit.repeat(stmt, number=1, repeat=repeat)) * 1000
+
+
+def _double_encode(data: dict[str, object]) -> bytes:
+    """Previous response path: handler dumps, server loads, response re-dumps."""
+    return json.dumps(json.loads(json.dumps(data))).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=30_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = make_transcript(args.words)
+    data = result.to_dict()
+    size = len(json.dumps(data))
+    print(f"Transcript: {args.words} words, {size / 1024:.0f} KiB encoded")
+    print(f"{'to_dict':>24}: {_time(result.to_dict, args.repeat):8.2f} ms")
+    from_dict = partial(TranscriptionResult.from_dict, data)
+    print(f"{'from_dict':>24}: {_time(from_dict, args.repeat):8.2f} ms")
+    double = partial(_double_encode, data)
+    print(f"{'stdlib double-encode':>24}: {_time(double, args.repeat):8.2f} ms")
+
+    for name in BACKENDS:
+        try:
+            dumps, loads = _load_backend(name)
+        except ImportError:
+            print(f"{name:>24}: not installed")
+            continue
+        dumps_ms = _time(partial(dumps, data), args.repeat)
+        loads_ms = _time(partial(loads, dumps(data)), args.repeat)
+        print(f"{name + ' dumps':>24}: {dumps_ms:8.2f} ms   {name} loads: {loads_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
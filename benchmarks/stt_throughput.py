@@ -0,0 +1,90 @@
+"""
+Benchmark TranscriptionService throughput and retries against the fake AssemblyAI API.
+
+    python -m benchmarks.stt_throughput --requests 200 --workers 16 --rate-limit-rate 0.05
+
+The fake server runs in-process. Redis at --redis-url is used for the rate
+limiter when reachable; every request uses a distinct audio URL so the
+transcript cache never short-circuits the provider.
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from core.config import settings
+from stt.fake_assemblyai import FakeProfile, running
+from stt.service import TranscriptionError, TranscriptionService
+
+
+def _transcribe(service: TranscriptionService, audio_url: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    try:
+        service.transcribe(audio_url)
+        outcome = "ok"
+    except TranscriptionError as e:
+        outcome = e.error_code
+    return outcome, time.perf_counter() - started
+
+
+def _percentile(values: list[float], pct: int) -> float:
+    return statistics.quantiles(values, n=100)[pct - 1] if len(values) > 1 else values[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=60.0, help="audio seconds per request")
+    parser.add_argument("--latency-median", type=float, default=0.5)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--polling-interval", type=float, default=0.1)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    profile = FakeProfile(
+        latency_median_seconds=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        duration_seconds=args.duration,
+        seed=args.seed,
+    )
+    with running(profile) as base_url:
+        settings.set("stt_assemblyai_api_key", "fake-key")
+        settings.set("stt_assemblyai_base_url", base_url)
+        settings.set("stt_assemblyai_polling_interval_seconds", args.polling_interval)
+        settings.set("redis_url", args.redis_url)
+        service = TranscriptionService()
+
+        run_id = time.time_ns()
+        urls = [f"https://bench.local/{run_id}/{n}.mp3" for n in range(args.requests)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(lambda url: _transcribe(service, url), urls))
+        elapsed = time.perf_counter() - started
+        server_stats = httpx.get(f"{base_url}/fake/stats").json()
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    latencies = [latency for _, latency in results]
+    print(f"Requests: {args.requests} with {args.workers} workers in {elapsed:.2f} s")
+    print(f"Throughput: {args.requests / elapsed:.1f} transcripts/s")
+    print(
+        f"Latency: p50 {_percentile(latencies, 50):.2f} s, "
+        f"p95 {_percentile(latencies, 95):.2f} s, max {max(latencies):.2f} s"
+    )
+    print(f"Outcomes: {dict(outcomes)}")
+    print(f"Provider: {server_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,46 @@
 """Flask API for local development and testing."""
 
 import logging
+from collections.abc import Iterator
+from typing import Any
 
-from flask import Flask, Response, request
+from flask import Flask, Response, request, stream_with_context
 
-from core.cache import create_cache
+from core.cache import RedisCache, campaign_key, create_cache
+from core.config import settings
 from core.db import (
     create_campaign,
     create_item,
     get_campaign,
     get_campaign_items,
+    get_campaign_summary,
+    get_retryable_item_ids,
     init_db,
+    iter_campaign_items,
+    release_pending_items,
+    requeue_failed_items,
 )
-from core.invoker import invoke_stt
-from core.utils import json_response, to_dict
+from core.export import (
+    EXTENSIONS,
+    MIMETYPES,
+    ExportError,
+    iter_rows,
+    stream,
+    validate,
+    with_results,
+)
+from core.invoker import invoke_stt_campaign
+from core.models import RETRYABLE_ERRORS
+from core.serialization import dumps
+from core.serving import serve
+from core.utils import json_response, register_profiling, register_unit_of_work, to_dict
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+register_unit_of_work(app)
+register_profiling(app)
 
 
 @app.before_request
@@ -39,7 +61,28 @@ def create_campaign_endpoint() -> Response:
     if not data or "name" not in data:
         return json_response({"error": "name is required"}, 400)
 
-    campaign = create_campaign(data["name"])
+    lane = data.get("lane", "interactive")
+    if lane not in settings.stt_lane_weights:
+        return json_response(
+            {"error": f"lane must be one of {sorted(settings.stt_lane_weights)}"}, 400
+        )
+    weight = data.get("weight", 1.0)
+    if not _is_positive_number(weight):
+        return json_response({"error": "weight must be a positive number"}, 400)
+    budgets = {}
+    for field in ("budget_audio_minutes", "budget_spend_usd"):
+        value = data.get(field)
+        if value is not None and not _is_positive_number(value):
+            return json_response({"error": f"{field} must be a positive number"}, 400)
+        budgets[field] = None if value is None else float(value)
+    for item_data in data.get("items", []):
+        duration = item_data.get("audio_duration_ms")
+        if duration is not None and not (
+            isinstance(duration, int) and _is_positive_number(duration)
+        ):
+            return json_response({"error": "audio_duration_ms must be a positive integer"}, 400)
+
+    campaign = create_campaign(data["name"], lane=lane, weight=float(weight), **budgets)
 
     items = []
     items_with_audio = []
@@ -47,7 +90,9 @@ def create_campaign_endpoint() -> Response:
         source_url = item_data.get("source_url", "")
         audio_url = item_data.get("audio_url")
         item_type = item_data.get("type", "video")
-        item = create_item(campaign.id, source_url, item_type, audio_url)
+        item = create_item(
+            campaign.id, source_url, item_type, audio_url, item_data.get("audio_duration_ms")
+        )
         items.append(to_dict(item))
         if audio_url:
             items_with_audio.append(item)
@@ -56,53 +101,200 @@ def create_campaign_endpoint() -> Response:
 
     # Invoke STT processing for items with audio URLs
     if items_with_audio:
-        for item in items_with_audio:
-            logger.info("Invoking STT for item %s", item.id)
-            invoke_stt(campaign.id, item.id)
+        logger.info("Invoking STT for %d items", len(items_with_audio))
+        invoke_stt_campaign(campaign.id, [item.id for item in items_with_audio])
 
     return json_response(
         {
             "campaign_id": campaign.id,
             "name": campaign.name,
             "status": campaign.status,
+            "lane": campaign.lane,
+            "weight": campaign.weight,
+            "budget_audio_minutes": campaign.budget_audio_minutes,
+            "budget_spend_usd": campaign.budget_spend_usd,
             "items": items,
         }
     )
 
 
+@app.route("/campaigns/<campaign_id>/retry", methods=["POST"])
+def retry_campaign(campaign_id: str) -> Response:
+    """
+    Re-enqueue items that failed with a retryable error.
+
+    Items are claimed in keyset batches (failed -> pending in one conditional
+    UPDATE, so concurrent retries never dispatch an item twice) and handed to
+    the invoker in bulk. Items at `stt_max_item_attempts` are left failed.
+    Items whose invocation fails go back to failed, so a later retry picks
+    them up again; they are reported and the response is a 502.
+    """
+    if get_campaign(campaign_id) is None:
+        return json_response({"error": "Campaign not found"}, 404)
+
+    requeued: list[str] = []
+    undispatched: list[str] = []
+    invocations = 0
+    after = None
+    while batch := get_retryable_item_ids(
+        campaign_id,
+        RETRYABLE_ERRORS,
+        settings.stt_max_item_attempts,
+        after=after,
+        limit=settings.stt_retry_batch_size,
+    ):
+        after = batch[-1]
+        claimed = requeue_failed_items(batch)
+        if not claimed:
+            continue
+        failed: list[str] = []
+        for item_ids, response in invoke_stt_campaign(campaign_id, claimed):
+            if 200 <= response["statusCode"] < 300:
+                invocations += 1
+            else:
+                logger.error("Retry invocation of %d items failed: %s", len(item_ids), response)
+                failed.extend(item_ids)
+        released = set(release_pending_items(failed))
+        undispatched.extend(item_id for item_id in claimed if item_id in released)
+        requeued.extend(item_id for item_id in claimed if item_id not in released)
+
+    logger.info("Retrying %d items of campaign %s", len(requeued), campaign_id)
+    body = {
+        "campaign_id": campaign_id,
+        "requeued": len(requeued),
+        "item_ids": requeued,
+        "invocations": invocations,
+    }
+    if undispatched:
+        body["failed_item_ids"] = undispatched
+        return json_response(body, 502)
+    return json_response(body)
+
+
+def _is_positive_number(value: Any) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool) and value > 0
+
+
 @app.route("/campaigns/<campaign_id>", methods=["GET"])
 def get_campaign_endpoint(campaign_id: str) -> Response:
-    campaign = get_campaign(campaign_id)
+    """
+    Campaign with its items and transcription results.
+
+    Supports keyset pagination via `?after=<item_id>&limit=<n>` and streaming
+    NDJSON (`?format=ndjson` or `Accept: application/x-ndjson`), where the first
+    line is the campaign and every following line is one item.
+    """
+    cache = create_cache()
+    campaign = _load_campaign(campaign_id, cache)
     if not campaign:
         return json_response({"error": "Campaign not found"}, 404)
 
-    cache = create_cache()
-    items = get_campaign_items(campaign_id)
+    after = request.args.get("after")
+    limit = request.args.get("limit", type=int)
+    if "limit" in request.args and (limit is None or limit < 1):
+        return json_response({"error": "limit must be a positive integer"}, 400)
+
+    if _wants_ndjson():
+        return Response(
+            stream_with_context(_stream_campaign(campaign, cache, after)),
+            mimetype="application/x-ndjson",
+        )
 
-    items_with_results = []
-    for item in items:
-        item_dict = to_dict(item)
-        if cache and item.status == "completed":
-            result = cache.get(f"stt:result:{item.id}")
-            if result:
-                item_dict["result"] = result
-        items_with_results.append(item_dict)
+    if after is None and limit is None:
+        items = get_campaign_items(campaign_id)
+        return json_response({**campaign, "items": with_results(items, cache)})
 
+    limit = min(limit or settings.api_page_size, settings.api_max_page_size)
+    items = get_campaign_items(campaign_id, after=after, limit=limit)
     return json_response(
         {
-            **to_dict(campaign),
-            "items": items_with_results,
+            **campaign,
+            "items": with_results(items, cache),
+            "next_after": items[-1].id if len(items) == limit else None,
         }
     )
 
 
+def _load_campaign(campaign_id: str, cache: RedisCache | None) -> dict[str, Any] | None:
+    """Campaign record, served stale-while-revalidate from the cache when available."""
+
+    def load() -> dict[str, Any] | None:
+        campaign = get_campaign(campaign_id)
+        return to_dict(campaign) if campaign else None
+
+    if not cache:
+        return load()
+    return cache.get_or_load(campaign_key(campaign_id), load)
+
+
+def _wants_ndjson() -> bool:
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == "application/x-ndjson"
+
+
+def _stream_campaign(
+    campaign: dict[str, Any], cache: RedisCache | None, after: str | None
+) -> Iterator[bytes]:
+    yield dumps(campaign) + b"\n"
+    for batch in iter_campaign_items(
+        campaign["id"], after=after, batch_size=settings.api_stream_batch_size
+    ):
+        for item_dict in with_results(batch, cache):
+            yield dumps(item_dict) + b"\n"
+
+
+@app.route("/campaigns/<campaign_id>/export", methods=["GET"])
+def export_campaign(campaign_id: str) -> Response:
+    """
+    Stream one table (`?table=items|sentences|words`) of a campaign as
+    `?format=parquet|arrow|ndjson`, encoded batch by batch.
+    """
+    table = request.args.get("table", "items")
+    fmt = request.args.get("format", "parquet")
+    try:
+        validate(table, fmt)
+    except ExportError as e:
+        return json_response({"error": str(e)}, 400)
+
+    cache = create_cache()
+    if not _load_campaign(campaign_id, cache):
+        return json_response({"error": "Campaign not found"}, 404)
+
+    chunks = stream(iter_rows(campaign_id, table, cache), table, fmt)
+    filename = f"{campaign_id}-{table}.{EXTENSIONS[fmt]}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.route("/campaigns/<campaign_id>/summary", methods=["GET"])
+def campaign_summary(campaign_id: str) -> Response:
+    """Item counts, audio, word, confidence and failure totals; one primary-key read."""
+    summary = get_campaign_summary(campaign_id)
+    if summary is None:
+        return json_response({"error": "Campaign not found"}, 404)
+    return json_response(summary)
+
+
+@app.route("/stats/cache", methods=["GET"])
+def cache_stats() -> Response:
+    """Transcript cache hit rate."""
+    cache = create_cache()
+    if not cache:
+        return json_response({"error": "Cache unavailable"}, 503)
+    return json_response({"stt:transcript": cache.hit_stats("stt:transcript")})
+
+
 @app.route("/health", methods=["GET"])
 def health() -> Response:
     return json_response({"status": "ok"})
 
 
 def run() -> None:
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    serve(app, port=5000)
 
 
 if __name__ == "__main__":
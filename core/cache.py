@@ -3,20 +3,41 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import logging
+import random
 import time
-from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, cast
 
 import redis
+from redis.exceptions import RedisClusterException
+from redis.sentinel import Sentinel
 
 from core.config import settings
+from core.serialization import dumps, loads
 
 if TYPE_CHECKING:
     from redis import Redis
 
+logger = logging.getLogger(__name__)
+
+FRESH_SUFFIX = ":fresh"
+REFRESH_LOCK_SUFFIX = ":refresh"
+REFRESH_LOCK_SECONDS = 30
+
+_refresh_pool: ThreadPoolExecutor | None = None
+
 
 class RedisCache:
-    """Redis client for caching and rate limiting."""
+    """
+    Redis client for caching and rate limiting.
+
+    Works against a standalone server, a Sentinel-monitored master or a
+    cluster (`redis_mode`). Multi-key reads go through `_mget`, which splits
+    keys by slot in cluster mode; keys that must share a slot, such as a
+    campaign record and its freshness marker, are hash-tagged by `campaign_key`.
+    """
 
     _instance: RedisCache | None = None
     _client: Redis[str] | None = None
@@ -31,18 +52,92 @@ class RedisCache:
     def client(self) -> Redis[str]:
         """Lazy connection initialization."""
         if self._client is None:
-            self._client = redis.from_url(settings.redis_url, decode_responses=True)
+            self._client = connect()
         return self._client
 
+    def _mget(self, keys: list[str]) -> list[str | None]:
+        client = self.client
+        if isinstance(client, redis.RedisCluster):
+            return list(client.mget_nonatomic(keys))
+        return list(client.mget(keys))
+
     def get(self, key: str) -> dict[str, Any] | None:
         """Get cached JSON value."""
         data = self.client.get(key)
-        return json.loads(data) if data else None
+        return loads(data) if data else None
+
+    def get_many(self, keys: list[str]) -> list[dict[str, Any] | None]:
+        """Get several cached JSON values in one round trip."""
+        if not keys:
+            return []
+        return [loads(data) if data else None for data in self._mget(keys)]
 
     def set(self, key: str, value: dict[str, Any], ttl: int | None = None) -> None:
-        """Cache JSON value with optional TTL."""
-        ttl = ttl or settings.cache_ttl_seconds
-        self.client.setex(key, ttl, json.dumps(value))
+        """Cache JSON value with optional TTL (defaults to the key's TTL policy)."""
+        ttl = ttl or ttl_for(key)
+        self.client.setex(key, ttl, dumps(value))
+
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], dict[str, Any] | None],
+        fresh_ttl: int | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Stale-while-revalidate read.
+
+        Values are fresh for `fresh_ttl` seconds and kept for the key's full TTL.
+        A stale value is returned immediately while a single background task
+        reloads it from `loader`; a missing value is loaded synchronously.
+        """
+        data, fresh = self._mget([key, key + FRESH_SUFFIX])
+        if data is None:
+            value = loader()
+            if value is not None:
+                self._set_fresh(key, value, fresh_ttl)
+            return value
+
+        if fresh is None and self.client.set(
+            key + REFRESH_LOCK_SUFFIX, "1", nx=True, ex=REFRESH_LOCK_SECONDS
+        ):
+            _get_refresh_pool().submit(self._refresh, key, loader, fresh_ttl)
+        return loads(data)
+
+    def _set_fresh(self, key: str, value: dict[str, Any], fresh_ttl: int | None) -> None:
+        fresh_ttl = fresh_ttl or settings.cache_fresh_ttl_seconds
+        pipe = self.client.pipeline()
+        pipe.setex(key, max(ttl_for(key), fresh_ttl), dumps(value))
+        pipe.setex(key + FRESH_SUFFIX, fresh_ttl, "1")
+        pipe.execute()
+
+    def _refresh(
+        self,
+        key: str,
+        loader: Callable[[], dict[str, Any] | None],
+        fresh_ttl: int | None,
+    ) -> None:
+        try:
+            value = loader()
+            if value is None:
+                self.client.delete(key, key + FRESH_SUFFIX)
+            else:
+                self._set_fresh(key, value, fresh_ttl)
+        except Exception:
+            logger.exception("Background refresh failed for %s", key)
+        finally:
+            self.client.delete(key + REFRESH_LOCK_SUFFIX)
+
+    def record_hit(self, name: str, hit: bool) -> None:
+        """Count a cache lookup for hit-rate reporting."""
+        self.client.incr(f"stats:{name}:{'hits' if hit else 'misses'}")
+
+    def hit_stats(self, name: str) -> dict[str, Any]:
+        """Hits, misses and hit rate recorded for `name`."""
+        hits, misses = (
+            int(v or 0) for v in self._mget([f"stats:{name}:hits", f"stats:{name}:misses"])
+        )
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else None}
 
     def rate_limit(self, key: str, limit: int) -> bool:
         """
@@ -67,6 +162,56 @@ class RedisCache:
             self._client = None
 
 
+def connect() -> Redis[str]:
+    """Client for `redis_mode`: "standalone", "cluster" or "sentinel"."""
+    if settings.redis_mode == "cluster":
+        # RedisCluster serves the same command API; the stubs type it separately
+        return cast(
+            "Redis[str]", redis.RedisCluster.from_url(settings.redis_url, decode_responses=True)
+        )
+    if settings.redis_mode == "sentinel":
+        sentinels = [
+            (host, int(port)) for host, port in (s.rsplit(":", 1) for s in settings.redis_sentinels)
+        ]
+        return Sentinel(sentinels, decode_responses=True).master_for(
+            settings.redis_sentinel_service
+        )
+    return redis.from_url(settings.redis_url, decode_responses=True)
+
+
+def campaign_key(campaign_id: str, *parts: str) -> str:
+    """
+    Key for per-campaign data, hash-tagged so every key of a campaign (and any
+    suffixed companion key) lands in the same cluster slot.
+    """
+    return ":".join(("campaign", f"{{{campaign_id}}}", *parts))
+
+
+def ttl_for(key: str) -> int:
+    """
+    TTL for a key from the longest matching prefix in `cache_ttl_policies`.
+
+    A random jitter of +/- `cache_ttl_jitter_ratio` spreads out the expiry of
+    keys written together.
+    """
+    ttl = settings.cache_ttl_seconds
+    matched = ""
+    for prefix, seconds in settings.cache_ttl_policies.items():
+        if key.startswith(prefix) and len(prefix) > len(matched):
+            matched, ttl = prefix, seconds
+    jitter = settings.cache_ttl_jitter_ratio
+    return max(1, round(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def _get_refresh_pool() -> ThreadPoolExecutor:
+    global _refresh_pool
+    if _refresh_pool is None:
+        _refresh_pool = ThreadPoolExecutor(
+            max_workers=settings.cache_refresh_workers, thread_name_prefix="cache-refresh"
+        )
+    return _refresh_pool
+
+
 def cache_key(prefix: str, identifier: str) -> str:
     """Generate cache key from prefix and identifier."""
     id_hash = hashlib.sha256(identifier.encode()).hexdigest()[:16]
@@ -79,5 +224,5 @@ def create_cache() -> RedisCache | None:
         cache = RedisCache()
         cache.client.ping()
         return cache
-    except redis.ConnectionError:
+    except (redis.ConnectionError, RedisClusterException):
         return None
@@ -2,29 +2,178 @@
 
 from __future__ import annotations
 
+import random
+import threading
+import time
 import uuid
-from typing import TYPE_CHECKING
+from collections import Counter
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import create_engine
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, func, inspect, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from core.config import settings
-from core.models import Base, Campaign, ContentItem, Failure
+from core.models import Campaign, CampaignErrorCount, CampaignStats, ContentItem, Failure
 
 if TYPE_CHECKING:
-    from sqlalchemy.engine import Engine
+    from sqlalchemy.engine import Connection, Engine
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+# Schema created by `create_all` before migrations were introduced
+BASELINE_REVISION = "0001"
+# Serializes concurrent startups (api and stt containers) on PostgreSQL
+MIGRATION_LOCK_KEY = 7_302_026
+
+# Item statuses with a counter in CampaignStats
+_STATUS_COUNTERS = {"completed": "items_completed", "failed": "items_failed"}
 
 _engine: Engine | None = None
+_replica_engines: list[Engine] | None = None
 _session_factory: sessionmaker[Session] | None = None
 
+_pool_stats_lock = threading.Lock()
+_pool_stats = {"connects": 0, "checkouts": 0}
+
+
+class UnitOfWork:
+    """
+    Single connection and session shared by every db call of one request or event.
+
+    With `use_replicas`, read-only queries go to a lazily checked out replica
+    connection until the unit of work writes; from then on they use the
+    primary session so they see their own writes. Until `primary_until` (a
+    `time.time()` the client got after its own last write) they use the
+    primary from the start.
+    """
+
+    def __init__(self, use_replicas: bool = True, primary_until: float = 0.0) -> None:
+        self.use_replicas = use_replicas
+        self.primary_until = primary_until
+        self.wrote = False
+        self._connection: Connection | None = None
+        self._session: Session | None = None
+        self._replica_connection: Connection | None = None
+        self._replica_session: Session | None = None
+
+    @property
+    def session(self) -> Session:
+        """Lazily check out a connection so requests without queries stay free."""
+        if self._session is None:
+            self._connection = get_engine().connect()
+            self._session = Session(bind=self._connection, expire_on_commit=False)
+        return self._session
+
+    @property
+    def replica_session(self) -> Session:
+        if self._replica_session is None:
+            self._replica_connection = get_replica_engine().connect()
+            self._replica_session = Session(bind=self._replica_connection, expire_on_commit=False)
+        return self._replica_session
+
+    def rollback(self) -> None:
+        if self._session is not None:
+            self._session.rollback()
+
+    def close(self, exc: BaseException | None = None) -> None:
+        """
+        Commit pending work (or roll back on error) and return the connections.
+
+        The unit of work stays usable: the next query checks out a connection
+        again. Connections are returned even when the commit fails.
+        """
+        try:
+            if self._session is not None:
+                if exc is None:
+                    self._session.commit()
+                else:
+                    self._session.rollback()
+        finally:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            if self._replica_session is not None:
+                self._replica_session.close()
+                self._replica_session = None
+            if self._replica_connection is not None:
+                self._replica_connection.close()
+                self._replica_connection = None
+
+
+_current_uow: ContextVar[UnitOfWork | None] = ContextVar("db_unit_of_work", default=None)
+
+
+def _engine_options() -> dict[str, Any]:
+    options: dict[str, Any] = {"echo": False, "pool_pre_ping": settings.db_pool_pre_ping}
+    if settings.db_pool_class == "null":
+        # One connection per unit of work, e.g. for Lambda behind RDS Proxy
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+    return options
+
+
+def _count(stat: str) -> None:
+    with _pool_stats_lock:
+        _pool_stats[stat] += 1
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(url, **_engine_options())
+    event.listen(engine, "connect", lambda *_: _count("connects"))
+    event.listen(engine, "checkout", lambda *_: _count("checkouts"))
+    return engine
+
 
 def get_engine() -> Engine:
     global _engine
     if _engine is None:
-        _engine = create_engine(settings.database_url, echo=False)
+        _engine = _create_engine(settings.database_url)
     return _engine
 
 
+def get_replica_engine() -> Engine:
+    """A random read replica from `database_replica_urls`, or the primary if there are none."""
+    global _replica_engines
+    if _replica_engines is None:
+        _replica_engines = [_create_engine(url) for url in settings.database_replica_urls]
+    return random.choice(_replica_engines) if _replica_engines else get_engine()
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection, e.g. in tests or after forking."""
+    global _engine, _replica_engines, _session_factory
+    for engine in [_engine, *(_replica_engines or [])]:
+        if engine is not None:
+            engine.dispose()
+    _engine = None
+    _replica_engines = None
+    _session_factory = None
+
+
+def pool_stats() -> dict[str, Any]:
+    """Connection churn counters since process start, plus the pool status line."""
+    with _pool_stats_lock:
+        stats: dict[str, Any] = dict(_pool_stats)
+    stats["pool"] = get_engine().pool.status()
+    return stats
+
+
 def get_session() -> Session:
     global _session_factory
     if _session_factory is None:
@@ -32,26 +181,182 @@ def get_session() -> Session:
     return _session_factory()
 
 
-def init_db() -> None:
-    Base.metadata.create_all(get_engine())
+def begin_unit_of_work(
+    use_replicas: bool = True, primary_until: float = 0.0
+) -> Token[UnitOfWork | None]:
+    """Make a new unit of work current; pair with `end_unit_of_work`."""
+    return _current_uow.set(UnitOfWork(use_replicas, primary_until))
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    """The unit of work of the current request or event, if any."""
+    return _current_uow.get()
+
+
+def end_unit_of_work(token: Token[UnitOfWork | None], exc: BaseException | None = None) -> None:
+    uow = _current_uow.get()
+    _current_uow.reset(token)
+    if uow is not None:
+        uow.close(exc)
+
+
+def release_connection() -> None:
+    """
+    Commit the current unit of work and return its connections to the pool.
+
+    Call before long waits that need no database (e.g. the provider call), so
+    idle work does not hold pooled connections; later queries check out again.
+    """
+    uow = _current_uow.get()
+    if uow is not None:
+        uow.close()
+
+
+def rollback_session() -> None:
+    """Roll back the current unit of work's session after a failed statement."""
+    uow = _current_uow.get()
+    if uow is not None:
+        uow.rollback()
+
+
+@contextmanager
+def unit_of_work(use_replicas: bool = True) -> Iterator[UnitOfWork]:
+    """
+    Share one connection across all db calls in the block.
+
+    Nested blocks reuse the outer unit of work, so the STT handler invoked
+    directly from an API request does not check out a second connection. A
+    nested block with `use_replicas=False` still reads the primary until it ends.
+    """
+    current = _current_uow.get()
+    if current is not None:
+        outer_use_replicas = current.use_replicas
+        current.use_replicas = outer_use_replicas and use_replicas
+        try:
+            yield current
+        finally:
+            current.use_replicas = outer_use_replicas
+        return
 
+    token = begin_unit_of_work(use_replicas)
+    uow = _current_uow.get()
+    assert uow is not None
+    try:
+        yield uow
+    except BaseException as e:
+        end_unit_of_work(token, e)
+        raise
+    end_unit_of_work(token)
 
-def create_campaign(name: str) -> Campaign:
+
+@contextmanager
+def _session_scope() -> Iterator[Session]:
+    """Primary session; anything run in it counts as a write for read routing."""
+    try:
+        with _primary_scope() as session:
+            yield session
+    finally:
+        _mark_write()
+
+
+@contextmanager
+def _primary_scope() -> Iterator[Session]:
+    uow = _current_uow.get()
+    if uow is not None:
+        yield uow.session
+        return
     with get_session() as session:
-        campaign = Campaign(id=str(uuid.uuid4()), name=name)
+        yield session
+
+
+@contextmanager
+def _read_scope() -> Iterator[Session]:
+    """Session for read-only queries: a replica unless they must see recent writes."""
+    if not _reads_from_replica():
+        with _primary_scope() as session:
+            yield session
+        return
+    uow = _current_uow.get()
+    if uow is not None:
+        yield uow.replica_session
+        return
+    with Session(get_replica_engine()) as session:
+        yield session
+
+
+def _mark_write() -> None:
+    uow = _current_uow.get()
+    if uow is not None:
+        uow.wrote = True
+
+
+def _reads_from_replica() -> bool:
+    if not settings.database_replica_urls:
+        return False
+    uow = _current_uow.get()
+    if uow is None:
+        return True
+    return uow.use_replicas and not uow.wrote and time.time() >= uow.primary_until
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    """Alembic configuration pointing at the bundled migrations."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def init_db() -> None:
+    """Upgrade the schema to the latest migration, adopting pre-migration databases."""
+    with get_engine().begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+        config = alembic_config(connection)
+        tables = inspect(connection).get_table_names()
+        if "campaigns" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+
+
+def create_campaign(
+    name: str,
+    lane: str = "interactive",
+    weight: float = 1.0,
+    budget_audio_minutes: float | None = None,
+    budget_spend_usd: float | None = None,
+) -> Campaign:
+    with _session_scope() as session:
+        campaign = Campaign(
+            id=str(uuid.uuid4()),
+            name=name,
+            lane=lane,
+            weight=weight,
+            budget_audio_minutes=budget_audio_minutes,
+            budget_spend_usd=budget_spend_usd,
+        )
         session.add(campaign)
+        session.add(CampaignStats(campaign_id=campaign.id))
         session.commit()
         session.refresh(campaign)
         return campaign
 
 
 def get_campaign(campaign_id: str) -> Campaign | None:
-    with get_session() as session:
-        return session.get(Campaign, campaign_id)
+    with _read_scope() as session:
+        campaign = session.get(Campaign, campaign_id)
+    if campaign is None and _reads_from_replica():
+        # Created by another process and not replicated yet
+        with _primary_scope() as session:
+            campaign = session.get(Campaign, campaign_id)
+    return campaign
 
 
 def update_campaign_status(campaign_id: str, status: str) -> None:
-    with get_session() as session:
+    with _session_scope() as session:
         campaign = session.get(Campaign, campaign_id)
         if campaign:
             campaign.status = status
@@ -63,39 +368,234 @@ def create_item(
     source_url: str,
     item_type: str = "video",
     audio_url: str | None = None,
+    audio_duration_ms: int | None = None,
 ) -> ContentItem:
-    with get_session() as session:
+    with _session_scope() as session:
         item = ContentItem(
             id=str(uuid.uuid4()),
             campaign_id=campaign_id,
             source_url=source_url,
             type=item_type,
             audio_url=audio_url,
+            audio_duration_ms=audio_duration_ms,
         )
         session.add(item)
+        _update_stats(session, campaign_id, items_total=CampaignStats.items_total + 1)
         session.commit()
         session.refresh(item)
         return item
 
 
 def get_item(item_id: str) -> ContentItem | None:
-    with get_session() as session:
-        return session.get(ContentItem, item_id)
+    with _read_scope() as session:
+        item = session.get(ContentItem, item_id)
+    if item is None and _reads_from_replica():
+        # Created by another process and not replicated yet
+        with _primary_scope() as session:
+            item = session.get(ContentItem, item_id)
+    return item
 
 
-def get_campaign_items(campaign_id: str) -> list[ContentItem]:
-    with get_session() as session:
-        return list(session.query(ContentItem).filter(ContentItem.campaign_id == campaign_id))
+def get_campaign_items(
+    campaign_id: str,
+    after: str | None = None,
+    limit: int | None = None,
+) -> list[ContentItem]:
+    """Campaign items ordered by id; `after`/`limit` select a keyset page."""
+    query = (
+        select(ContentItem).where(ContentItem.campaign_id == campaign_id).order_by(ContentItem.id)
+    )
+    if after is not None:
+        query = query.where(ContentItem.id > after)
+    if limit is not None:
+        query = query.limit(limit)
+    with _read_scope() as session:
+        return list(session.scalars(query))
+
+
+def iter_campaign_items(
+    campaign_id: str,
+    after: str | None = None,
+    batch_size: int = 500,
+) -> Iterator[list[ContentItem]]:
+    """Stream campaign items in id order from a server-side cursor, one batch at a time."""
+    query = (
+        select(ContentItem)
+        .where(ContentItem.campaign_id == campaign_id)
+        .order_by(ContentItem.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if after is not None:
+        query = query.where(ContentItem.id > after)
+    with _read_scope() as session:
+        for batch in session.scalars(query).partitions():
+            yield list(batch)
 
 
 def update_item_status(item_id: str, status: str) -> None:
-    with get_session() as session:
-        item = session.get(ContentItem, item_id)
-        if item:
-            item.status = status
+    with _session_scope() as session:
+        if _set_item_status(session, item_id, status):
+            session.commit()
+
+
+def start_item_attempt(item_id: str) -> None:
+    """Mark an item as processing and count the attempt."""
+    with _session_scope() as session:
+        if _set_item_status(session, item_id, "processing", attempts=ContentItem.attempts + 1):
             session.commit()
 
 
+def complete_item(
+    item_id: str,
+    duration_ms: int,
+    word_count: int,
+    confidence: float,
+    flag_count: int = 0,
+) -> None:
+    """
+    Mark an item as completed and add its transcription to the campaign stats.
+
+    Completing an already completed item (a redelivered event) adds nothing.
+    """
+    with _session_scope() as session:
+        moved = _set_item_status(session, item_id, "completed")
+        if moved is None:
+            return
+        campaign_id, previous = moved
+        if previous == "completed":
+            session.commit()
+            return
+        _update_stats(
+            session,
+            campaign_id,
+            transcriptions=CampaignStats.transcriptions + 1,
+            audio_ms=CampaignStats.audio_ms + duration_ms,
+            word_count=CampaignStats.word_count + word_count,
+            confidence_sum=CampaignStats.confidence_sum + confidence,
+            flag_count=CampaignStats.flag_count + flag_count,
+        )
+        session.commit()
+
+
+def _set_item_status(
+    session: Session, item_id: str, status: str, **values: Any
+) -> tuple[str, str] | None:
+    """
+    Change an item's status and move it between the campaign's status counters.
+
+    The item row is locked first so concurrent transitions of the same item
+    count once. Returns the item's campaign id and previous status, or None if
+    it does not exist.
+    """
+    row = session.execute(
+        select(ContentItem.campaign_id, ContentItem.status)
+        .where(ContentItem.id == item_id)
+        .with_for_update()
+    ).first()
+    if row is None:
+        return None
+    campaign_id, previous = row
+    session.execute(
+        update(ContentItem).where(ContentItem.id == item_id).values(status=status, **values)
+    )
+    if previous != status:
+        counters: dict[str, Any] = {}
+        if previous in _STATUS_COUNTERS:
+            counters[_STATUS_COUNTERS[previous]] = (
+                getattr(CampaignStats, _STATUS_COUNTERS[previous]) - 1
+            )
+        if status in _STATUS_COUNTERS:
+            counters[_STATUS_COUNTERS[status]] = (
+                getattr(CampaignStats, _STATUS_COUNTERS[status]) + 1
+            )
+        if counters:
+            _update_stats(session, campaign_id, **counters)
+    return str(campaign_id), str(previous)
+
+
+def _update_stats(session: Session, campaign_id: str, **values: Any) -> None:
+    session.execute(
+        update(CampaignStats)
+        .where(CampaignStats.campaign_id == campaign_id)
+        .values(updated_at=func.now(), **values)
+    )
+
+
+def get_retryable_item_ids(
+    campaign_id: str,
+    errors: Collection[str],
+    max_attempts: int,
+    after: str | None = None,
+    limit: int | None = None,
+) -> list[str]:
+    """
+    Ids of failed campaign items worth retrying, in id order.
+
+    An item qualifies when it failed with one of `errors`, never failed with
+    any other (permanent) error and has been attempted fewer than
+    `max_attempts` times. Both failure lookups are served by the
+    (campaign_id, error) index.
+    """
+    failures = select(Failure.item_id).where(Failure.campaign_id == campaign_id)
+    query = (
+        select(ContentItem.id)
+        .where(
+            ContentItem.campaign_id == campaign_id,
+            ContentItem.status == "failed",
+            ContentItem.attempts < max_attempts,
+            ContentItem.id.in_(failures.where(Failure.error.in_(errors))),
+            ContentItem.id.not_in(failures.where(Failure.error.not_in(errors))),
+        )
+        .order_by(ContentItem.id)
+    )
+    if after is not None:
+        query = query.where(ContentItem.id > after)
+    if limit is not None:
+        query = query.limit(limit)
+    with _primary_scope() as session:
+        return list(session.scalars(query))
+
+
+def requeue_failed_items(item_ids: list[str]) -> list[str]:
+    """
+    Move failed items back to pending; returns the ids actually moved.
+
+    The status check in the UPDATE makes concurrent retries of the same
+    campaign claim each item at most once.
+    """
+    return _move_items(item_ids, "failed", "pending")
+
+
+def release_pending_items(item_ids: list[str]) -> list[str]:
+    """
+    Move claimed items that were never dispatched back to failed; returns the ids moved.
+
+    Items a synchronous invocation already moved on are left alone.
+    """
+    return _move_items(item_ids, "pending", "failed")
+
+
+def _move_items(item_ids: list[str], previous: str, status: str) -> list[str]:
+    """Conditionally move items from `previous` to `status`, keeping the failed counters."""
+    if not item_ids:
+        return []
+    with _session_scope() as session:
+        moved = session.execute(
+            update(ContentItem)
+            .where(ContentItem.id.in_(item_ids), ContentItem.status == previous)
+            .values(status=status)
+            .returning(ContentItem.id, ContentItem.campaign_id)
+        ).all()
+        delta = (status == "failed") - (previous == "failed")
+        per_campaign = Counter(campaign_id for _, campaign_id in moved)
+        for campaign_id, count in per_campaign.items():
+            _update_stats(
+                session, campaign_id, items_failed=CampaignStats.items_failed + delta * count
+            )
+        session.commit()
+        return sorted(item_id for item_id, _ in moved)
+
+
 def create_failure(
     item_id: str,
     campaign_id: str,
@@ -103,7 +603,7 @@ def create_failure(
     error: str,
     message: str,
 ) -> Failure:
-    with get_session() as session:
+    with _session_scope() as session:
         failure = Failure(
             id=str(uuid.uuid4()),
             item_id=item_id,
@@ -113,6 +613,49 @@ def create_failure(
             message=message,
         )
         session.add(failure)
+        _count_error(session, campaign_id, error)
         session.commit()
         session.refresh(failure)
         return failure
+
+
+def _count_error(session: Session, campaign_id: str, error: str) -> None:
+    """Increment the campaign's count for `error`, creating the row on first use."""
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    insert = dialect.insert(CampaignErrorCount).values(
+        campaign_id=campaign_id, error=error, count=1
+    )
+    session.execute(
+        insert.on_conflict_do_update(
+            index_elements=[CampaignErrorCount.campaign_id, CampaignErrorCount.error],
+            set_={"count": CampaignErrorCount.count + 1},
+        )
+    )
+
+
+def get_campaign_summary(campaign_id: str) -> dict[str, Any] | None:
+    """Materialized aggregates of a campaign, read without touching its items."""
+    with _read_scope() as session:
+        stats = session.get(CampaignStats, campaign_id)
+        if stats is None:
+            return None
+        errors = session.execute(
+            select(CampaignErrorCount.error, CampaignErrorCount.count)
+            .where(CampaignErrorCount.campaign_id == campaign_id)
+            .order_by(CampaignErrorCount.error)
+        ).all()
+        return {
+            "campaign_id": campaign_id,
+            "items_total": stats.items_total,
+            "items_completed": stats.items_completed,
+            "items_failed": stats.items_failed,
+            "transcriptions": stats.transcriptions,
+            "audio_ms": stats.audio_ms,
+            "word_count": stats.word_count,
+            "mean_confidence": (
+                stats.confidence_sum / stats.transcriptions if stats.transcriptions else None
+            ),
+            "flag_count": stats.flag_count,
+            "failures_by_error": dict(errors),
+            "updated_at": stats.updated_at.isoformat(),
+        }
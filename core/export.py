@@ -0,0 +1,217 @@
+"""
+Columnar export of campaign items, sentences and words.
+
+Rows are streamed from the database in keyset batches with their cached
+transcription results fetched one MGET per batch, so memory stays bounded by
+the batch size whatever the campaign size. Parquet and Arrow IPC output needs
+the `export` extra (pyarrow); NDJSON works without it.
+
+    python -m core.export <campaign_id> --table words --format parquet --out words.parquet
+"""
+
+import argparse
+import io
+import sys
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from core.cache import RedisCache, create_cache
+from core.config import settings
+from core.db import init_db, iter_campaign_items
+from core.models import ContentItem
+from core.serialization import dumps
+from core.utils import to_dict
+
+TABLES = ("items", "sentences", "words")
+FORMATS = ("ndjson", "parquet", "arrow")
+
+MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+EXTENSIONS = {"ndjson": "ndjson", "parquet": "parquet", "arrow": "arrows"}
+
+# Column names and Arrow type names per table; item columns mirror ContentItem
+# plus the result summary, sentence and word columns mirror TranscriptionResult.to_dict
+COLUMNS: dict[str, list[tuple[str, str]]] = {
+    "items": [
+        ("id", "string"),
+        ("campaign_id", "string"),
+        ("source_url", "string"),
+        ("type", "string"),
+        ("status", "string"),
+        ("audio_url", "string"),
+        ("attempts", "int32"),
+        ("created_at", "string"),
+        ("text", "string"),
+        ("language_code", "string"),
+        ("confidence", "float64"),
+        ("duration_ms", "int64"),
+    ],
+    "sentences": [
+        ("item_id", "string"),
+        ("index", "int32"),
+        ("text", "string"),
+        ("start_ms", "int64"),
+        ("end_ms", "int64"),
+    ],
+    "words": [
+        ("item_id", "string"),
+        ("index", "int32"),
+        ("text", "string"),
+        ("start_ms", "int64"),
+        ("end_ms", "int64"),
+        ("confidence", "float64"),
+    ],
+}
+
+
+class ExportError(Exception):
+    """Unsupported export request, e.g. a columnar format without pyarrow."""
+
+
+def with_results(items: list[ContentItem], cache: RedisCache | None) -> list[dict[str, Any]]:
+    """Serialize items, attaching cached results for completed ones in one round trip."""
+    item_dicts = [to_dict(item) for item in items]
+    if not cache:
+        return item_dicts
+
+    completed = [d for d in item_dicts if d["status"] == "completed"]
+    results = cache.get_many([f"stt:result:{d['id']}" for d in completed])
+    for item_dict, result in zip(completed, results, strict=True):
+        if result:
+            item_dict["result"] = result
+    return item_dicts
+
+
+def iter_rows(
+    campaign_id: str,
+    table: str,
+    cache: RedisCache | None,
+    batch_size: int | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """Flat rows of one export table, one list per database batch."""
+    batch_size = batch_size or settings.api_stream_batch_size
+    for batch in iter_campaign_items(campaign_id, batch_size=batch_size):
+        rows: list[dict[str, Any]] = []
+        for item in with_results(batch, cache):
+            rows.extend(_rows(table, item))
+        yield rows
+
+
+def _rows(table: str, item: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    result = item.pop("result", None) or {}
+    if table == "items":
+        yield {
+            **item,
+            "text": result.get("text"),
+            "language_code": result.get("language_code"),
+            "confidence": result.get("confidence"),
+            "duration_ms": result.get("duration_ms"),
+        }
+        return
+    for index, row in enumerate(result.get(table, ())):
+        yield {"item_id": item["id"], "index": index, **row}
+
+
+def stream(batches: Iterable[list[dict[str, Any]]], table: str, fmt: str) -> Iterator[bytes]:
+    """Encode row batches as `fmt`, yielding bytes as each batch is written."""
+    if fmt == "ndjson":
+        return _stream_ndjson(batches)
+    if fmt in ("parquet", "arrow"):
+        return _stream_arrow(batches, table, fmt)
+    raise ExportError(f"format must be one of {', '.join(FORMATS)}")
+
+
+def _stream_ndjson(batches: Iterable[list[dict[str, Any]]]) -> Iterator[bytes]:
+    for rows in batches:
+        if rows:
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every batch."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_arrow(batches: Iterable[list[dict[str, Any]]], table: str, fmt: str) -> Iterator[bytes]:
+    """Parquet (one row group per batch) or Arrow IPC stream (one record batch per batch)."""
+    pa = _pyarrow()
+    schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in COLUMNS[table]])
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    for rows in batches:
+        if rows:
+            writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ExportError("Parquet and Arrow export need pyarrow (uv sync --extra export)") from e
+    return pyarrow
+
+
+def validate(table: str, fmt: str) -> None:
+    """Fail early, before streaming starts, for unknown tables or unavailable formats."""
+    if table not in TABLES:
+        raise ExportError(f"table must be one of {', '.join(TABLES)}")
+    if fmt not in FORMATS:
+        raise ExportError(f"format must be one of {', '.join(FORMATS)}")
+    if fmt != "ndjson":
+        _pyarrow()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export a campaign as Parquet, Arrow or NDJSON")
+    parser.add_argument("campaign_id")
+    parser.add_argument("--table", choices=TABLES, default="items")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args(argv)
+
+    validate(args.table, args.format)
+    init_db()
+    batches = iter_rows(args.campaign_id, args.table, create_cache(), args.batch_size)
+    chunks = stream(batches, args.table, args.format)
+    if args.out:
+        with open(args.out, "wb") as out:
+            out.writelines(chunks)
+    else:
+        sys.stdout.buffer.writelines(chunks)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,15 @@
 """Utility for invoking services via HTTP, direct function call, or Step Functions."""
 
-import json
 import logging
 import uuid
 from enum import StrEnum
+from functools import cache
 from typing import Any
 
 import httpx
 
 from core.config import settings
+from core.serialization import dumps_str, loads
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,34 @@ def invoke_stt(campaign_id: str, item_id: str) -> dict[str, Any]:
         return _invoke_direct(event)
 
 
+def invoke_stt_campaign(
+    campaign_id: str, item_ids: list[str]
+) -> list[tuple[list[str], dict[str, Any]]]:
+    """
+    Invoke STT processing for many items of one campaign.
+
+    In step mode with `stt_campaign_state_machine_arn` configured, this starts
+    one Distributed Map execution per `stt_step_max_items_per_execution` items
+    instead of one execution per item. Other modes invoke items one by one.
+
+    Nothing here waits on the provider rate limit, so callers serving a request
+    return as soon as everything is dispatched: the handler's rate limiter
+    paces provider calls, and the campaign state machine's `MaxConcurrency`
+    caps how many batches run at once.
+
+    Returns:
+        The item ids and response of each execution (step mode) or item
+    """
+    campaign_arn = getattr(settings, "stt_campaign_state_machine_arn", "")
+    if get_invoke_mode() == InvokeMode.STEP and campaign_arn:
+        chunk_size = int(getattr(settings, "stt_step_max_items_per_execution", 2000))
+        chunks = [item_ids[i : i + chunk_size] for i in range(0, len(item_ids), chunk_size)]
+        return [
+            (chunk, _start_campaign_execution(campaign_arn, campaign_id, chunk)) for chunk in chunks
+        ]
+    return [([item_id], invoke_stt(campaign_id, item_id)) for item_id in item_ids]
+
+
 def _invoke_http(event: dict[str, Any]) -> dict[str, Any]:
     """Invoke STT via HTTP request to the stt container."""
     stt_url = getattr(settings, "stt_service_url", "http://stt:5001")
@@ -58,17 +87,19 @@ def _invoke_http(event: dict[str, Any]) -> dict[str, Any]:
 
     try:
         response = httpx.post(url, json=event, timeout=300.0)
-        return {
-            "statusCode": response.status_code,
-            "body": response.text,
-        }
     except httpx.RequestError as e:
         logger.error("HTTP request to STT failed: %s", e)
         return {
             "statusCode": 503,
-            "body": json.dumps({"error": "SERVICE_UNAVAILABLE", "message": str(e)}),
+            "body": {"error": "SERVICE_UNAVAILABLE", "message": str(e)},
         }
 
+    try:
+        body = loads(response.content)
+    except ValueError:
+        body = {"error": "INVALID_RESPONSE", "message": response.text[:200]}
+    return {"statusCode": response.status_code, "body": body}
+
 
 def _invoke_direct(event: dict[str, Any]) -> dict[str, Any]:
     """Invoke STT handler directly (same process)."""
@@ -80,47 +111,91 @@ def _invoke_direct(event: dict[str, Any]) -> dict[str, Any]:
 
 def _invoke_step_functions(event: dict[str, Any]) -> dict[str, Any]:
     """Invoke STT via AWS Step Functions."""
-    import boto3
-
     state_machine_arn = getattr(settings, "stt_state_machine_arn", "")
     if not state_machine_arn:
         logger.error("stt_state_machine_arn not configured")
         return {
             "statusCode": 500,
-            "body": json.dumps(
-                {
-                    "error": "CONFIGURATION_ERROR",
-                    "message": "stt_state_machine_arn not configured",
-                }
-            ),
+            "body": {
+                "error": "CONFIGURATION_ERROR",
+                "message": "stt_state_machine_arn not configured",
+            },
         }
 
     logger.info("Invoking STT via Step Functions: %s", state_machine_arn)
 
     try:
-        client = boto3.client("stepfunctions")
+        client = _stepfunctions_client()
         execution_name = f"stt-{event['item_id']}-{uuid.uuid4().hex[:8]}"
 
         response = client.start_execution(
             stateMachineArn=state_machine_arn,
             name=execution_name,
-            input=json.dumps(event),
+            input=dumps_str(event),
         )
 
         return {
             "statusCode": 202,
-            "body": json.dumps(
+            "body": {
+                "status": "started",
+                "execution_arn": response["executionArn"],
+                "item_id": event["item_id"],
+                "campaign_id": event["campaign_id"],
+            },
+        }
+    except Exception as e:
+        logger.error("Step Functions invocation failed: %s", e)
+        return {
+            "statusCode": 503,
+            "body": {"error": "STEP_FUNCTIONS_ERROR", "message": str(e)},
+        }
+
+
+def _start_campaign_execution(
+    state_machine_arn: str, campaign_id: str, item_ids: list[str]
+) -> dict[str, Any]:
+    """Start one Distributed Map execution over a chunk of campaign items."""
+    batch_size = int(getattr(settings, "stt_step_batch_size", 25))
+    logger.info(
+        "Invoking STT for %d items via Step Functions: %s", len(item_ids), state_machine_arn
+    )
+
+    try:
+        response = _stepfunctions_client().start_execution(
+            stateMachineArn=state_machine_arn,
+            name=f"stt-campaign-{campaign_id}-{uuid.uuid4().hex[:8]}",
+            input=dumps_str(
                 {
-                    "status": "started",
-                    "execution_arn": response["executionArn"],
-                    "item_id": event["item_id"],
-                    "campaign_id": event["campaign_id"],
+                    "campaign_id": campaign_id,
+                    "batch_size": batch_size,
+                    "items": [
+                        {"campaign_id": campaign_id, "item_id": item_id} for item_id in item_ids
+                    ],
                 }
             ),
+        )
+
+        return {
+            "statusCode": 202,
+            "body": {
+                "status": "started",
+                "execution_arn": response["executionArn"],
+                "campaign_id": campaign_id,
+                "item_count": len(item_ids),
+            },
         }
     except Exception as e:
-        logger.error("Step Functions invocation failed: %s", e)
+        logger.error("Step Functions campaign invocation failed: %s", e)
         return {
             "statusCode": 503,
-            "body": json.dumps({"error": "STEP_FUNCTIONS_ERROR", "message": str(e)}),
+            "body": {"error": "STEP_FUNCTIONS_ERROR", "message": str(e)},
         }
+
+
+@cache
+def _stepfunctions_client() -> Any:
+    """Step Functions client shared across invocations (honours a local endpoint)."""
+    import boto3
+
+    endpoint_url = getattr(settings, "stt_stepfunctions_endpoint_url", "") or None
+    return boto3.client("stepfunctions", endpoint_url=endpoint_url)
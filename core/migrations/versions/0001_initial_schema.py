@@ -0,0 +1,52 @@
+"""Initial schema for campaigns, content items and failures.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "campaigns",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "content_items",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("campaign_id", sa.String(36), sa.ForeignKey("campaigns.id"), nullable=False),
+        sa.Column("source_url", sa.Text(), nullable=False),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("audio_url", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "failures",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("item_id", sa.String(36), sa.ForeignKey("content_items.id"), nullable=False),
+        sa.Column("campaign_id", sa.String(36), sa.ForeignKey("campaigns.id"), nullable=False),
+        sa.Column("stage", sa.String(30), nullable=False),
+        sa.Column("error", sa.String(50), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("failed_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("failures")
+    op.drop_table("content_items")
+    op.drop_table("campaigns")
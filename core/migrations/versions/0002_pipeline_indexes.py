@@ -0,0 +1,29 @@
+"""Index campaign lookups on content items and failures.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_content_items_campaign_id_status", "content_items", ["campaign_id", "status"]
+    )
+    op.create_index("ix_failures_campaign_id_error", "failures", ["campaign_id", "error"])
+    op.create_index("ix_failures_item_id", "failures", ["item_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_failures_item_id", table_name="failures")
+    op.drop_index("ix_failures_campaign_id_error", table_name="failures")
+    op.drop_index("ix_content_items_campaign_id_status", table_name="content_items")
@@ -0,0 +1,23 @@
+"""Index content items for keyset pagination within a campaign.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_content_items_campaign_id_id", "content_items", ["campaign_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_items_campaign_id_id", table_name="content_items")
@@ -0,0 +1,32 @@
+"""Add scheduling lane and weight to campaigns.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "campaigns",
+        sa.Column("lane", sa.String(20), nullable=False, server_default="interactive"),
+    )
+    op.add_column(
+        "campaigns",
+        sa.Column("weight", sa.Float(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("campaigns", "weight")
+    op.drop_column("campaigns", "lane")
@@ -0,0 +1,26 @@
+"""Add audio-minutes and spend budgets to campaigns.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("campaigns", sa.Column("budget_audio_minutes", sa.Float(), nullable=True))
+    op.add_column("campaigns", sa.Column("budget_spend_usd", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("campaigns", "budget_spend_usd")
+    op.drop_column("campaigns", "budget_audio_minutes")
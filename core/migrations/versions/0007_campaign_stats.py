@@ -0,0 +1,65 @@
+"""Materialized per-campaign aggregates.
+
+Item and failure counts are backfilled from existing rows. Audio, word,
+confidence and flag totals live in cached results and start at zero for
+campaigns that predate this revision.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "campaign_stats",
+        sa.Column("campaign_id", sa.String(36), sa.ForeignKey("campaigns.id"), primary_key=True),
+        sa.Column("items_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("items_completed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("items_failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("transcriptions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("audio_ms", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("word_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("confidence_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("flag_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "campaign_error_counts",
+        sa.Column("campaign_id", sa.String(36), sa.ForeignKey("campaigns.id"), primary_key=True),
+        sa.Column("error", sa.String(50), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO campaign_stats (campaign_id, items_total, items_completed, items_failed)
+        SELECT campaigns.id,
+               COUNT(content_items.id),
+               COUNT(CASE WHEN content_items.status = 'completed' THEN 1 END),
+               COUNT(CASE WHEN content_items.status = 'failed' THEN 1 END)
+        FROM campaigns
+        LEFT JOIN content_items ON content_items.campaign_id = campaigns.id
+        GROUP BY campaigns.id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO campaign_error_counts (campaign_id, error, count)
+        SELECT campaign_id, error, COUNT(*) FROM failures GROUP BY campaign_id, error
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("campaign_error_counts")
+    op.drop_table("campaign_stats")
@@ -2,7 +2,7 @@
 
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -22,13 +22,56 @@ class Campaign(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     name: Mapped[str] = mapped_column(String(255))
     status: Mapped[str] = mapped_column(String(20), default="pending")
+    lane: Mapped[str] = mapped_column(
+        String(20), default="interactive", server_default="interactive"
+    )
+    weight: Mapped[float] = mapped_column(Float, default=1.0, server_default="1")
+    budget_audio_minutes: Mapped[float | None] = mapped_column(Float, nullable=True)
+    budget_spend_usd: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
 
 
+class CampaignStats(Base):
+    """
+    Per-campaign aggregates, updated in the transaction of every item change.
+
+    Item counts follow status transitions. Audio, word, confidence and flag
+    totals add up every completed transcription, so `transcriptions` (not
+    `items_completed`) is the denominator of the mean confidence.
+    """
+
+    __tablename__ = "campaign_stats"
+
+    campaign_id: Mapped[str] = mapped_column(ForeignKey("campaigns.id"), primary_key=True)
+    items_total: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    items_completed: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    items_failed: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    transcriptions: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    audio_ms: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    word_count: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    confidence_sum: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+    flag_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow, onupdate=_utcnow)
+
+
+class CampaignErrorCount(Base):
+    """Number of failures per error code of a campaign."""
+
+    __tablename__ = "campaign_error_counts"
+
+    campaign_id: Mapped[str] = mapped_column(ForeignKey("campaigns.id"), primary_key=True)
+    error: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
 class ContentItem(Base):
     """Content item to be processed."""
 
     __tablename__ = "content_items"
+    __table_args__ = (
+        Index("ix_content_items_campaign_id_status", "campaign_id", "status"),
+        Index("ix_content_items_campaign_id_id", "campaign_id", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     campaign_id: Mapped[str] = mapped_column(ForeignKey("campaigns.id"))
@@ -36,13 +79,24 @@ class ContentItem(Base):
     type: Mapped[str] = mapped_column(String(20), default="video")
     status: Mapped[str] = mapped_column(String(20), default="pending")
     audio_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Known before transcription (e.g. from the scraper); what a budget reserves
+    audio_duration_ms: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
 
 
+# Failure.error codes worth retrying; anything else fails the same way again
+RETRYABLE_ERRORS = frozenset({"RATE_LIMITED", "TIMEOUT", "INTERNAL_ERROR", "BUDGET_RESERVED"})
+
+
 class Failure(Base):
     """Pipeline failure record."""
 
     __tablename__ = "failures"
+    __table_args__ = (
+        Index("ix_failures_campaign_id_error", "campaign_id", "error"),
+        Index("ix_failures_item_id", "item_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     item_id: Mapped[str] = mapped_column(ForeignKey("content_items.id"))
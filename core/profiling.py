@@ -0,0 +1,186 @@
+"""
+Opt-in profiling of single requests and handler events.
+
+Nothing is profiled unless `profiling_enabled` is set. Then a request or
+event is profiled when it asks for it (the `profiling_header` header or a
+`"profile": true` event key) or at random with `profiling_sample_rate`.
+Profiles are written to `profiling_output_dir` as:
+
+- `cprofile`: deterministic cProfile stats, one `.prof` file for `python -m pstats`
+  or snakeviz. cProfile hooks the whole process, so one runs at a time; a
+  request profiled while another is falls back to sampling;
+- `sampling`: the profiled thread's stack every `profiling_interval_ms`, as a
+  `.collapsed` file (one `frame;frame;frame count` line per stack) for
+  flamegraph.pl or speedscope. It costs far less than cProfile under load.
+"""
+
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Protocol
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Set while this thread is profiled; nested scopes (the handler invoked directly
+# from a profiled API request) run inside the outer profile
+_active = threading.local()
+# Held while a cProfile runs: since Python 3.12 it uses the process-wide
+# sys.monitoring, and a second one fails to start
+_cprofile_lock = threading.Lock()
+
+
+class _Profiler(Protocol):
+    extension: str
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+    def dump(self, path: Path) -> None: ...
+
+
+class _CProfiler:
+    """cProfile run; owns `_cprofile_lock`, which its creator acquired."""
+
+    extension = "prof"
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        try:
+            self._profile.enable()
+        except BaseException:
+            _cprofile_lock.release()
+            raise
+
+    def stop(self) -> None:
+        try:
+            self._profile.disable()
+        finally:
+            _cprofile_lock.release()
+
+    def dump(self, path: Path) -> None:
+        self._profile.dump_stats(path)
+
+
+class SamplingProfiler:
+    """Samples the calling thread's stack from a background thread."""
+
+    extension = "collapsed"
+
+    def __init__(self, interval_seconds: float) -> None:
+        self._interval = interval_seconds
+        self._thread_id = threading.get_ident()
+        self._stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampler.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._stacks[_collapse(frame)] += 1
+
+    def dump(self, path: Path) -> None:
+        with path.open("w") as out:
+            for stack, count in self._stacks.most_common():
+                out.write(f"{stack} {count}\n")
+
+
+def _collapse(frame: FrameType | None) -> str:
+    """Root-to-leaf `module:function` names joined by semicolons."""
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def should_profile(requested: bool = False) -> bool:
+    """Whether to profile a request or event, given whether it asked to be."""
+    if not settings.profiling_enabled:
+        return False
+    return requested or random.random() < settings.profiling_sample_rate
+
+
+@contextmanager
+def profile_scope(name: str, requested: bool = False) -> Iterator[None]:
+    """
+    Profile the block if `should_profile(requested)`, writing the dump on exit.
+
+    Profiling never fails the block: a profiler that cannot start or write
+    its dump is logged and skipped.
+    """
+    if getattr(_active, "profiling", False) or not should_profile(requested):
+        yield
+        return
+
+    profiler = _start_profiler(name)
+    if profiler is None:
+        yield
+        return
+    _active.profiling = True
+    try:
+        yield
+    finally:
+        _active.profiling = False
+        _finish_profiler(profiler, name)
+
+
+def _start_profiler(name: str) -> _Profiler | None:
+    profiler = _create_profiler()
+    try:
+        profiler.start()
+    except Exception:
+        logger.exception("Failed to start profiling %s", name)
+        return None
+    return profiler
+
+
+def _finish_profiler(profiler: _Profiler, name: str) -> None:
+    try:
+        profiler.stop()
+        path = _output_path(name, profiler.extension)
+        profiler.dump(path)
+        logger.info("Wrote %s profile of %s to %s", profiler.extension, name, path)
+    except Exception:
+        logger.exception("Failed to write profile of %s", name)
+
+
+def _create_profiler() -> _Profiler:
+    if settings.profiling_mode != "sampling":
+        if settings.profiling_mode != "cprofile":
+            logger.warning("Unknown profiling_mode %r, using cprofile", settings.profiling_mode)
+        if _cprofile_lock.acquire(blocking=False):
+            return _CProfiler()
+        logger.info("Another request is under cProfile, sampling this one instead")
+    return SamplingProfiler(settings.profiling_interval_ms / 1000)
+
+
+def _output_path(name: str, extension: str) -> Path:
+    directory = Path(settings.profiling_output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "profile"
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return directory / f"{stamp}-{safe_name}-{os.getpid()}-{uuid.uuid4().hex[:8]}.{extension}"
@@ -0,0 +1,68 @@
+"""JSON encoding with a pluggable fast backend (orjson, msgspec) and stdlib fallback."""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from core.config import settings
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _load_backend(name: str) -> tuple[Callable[[Any], bytes], Callable[[str | bytes], Any]]:
+    if name == "orjson":
+        import orjson
+
+        return orjson.dumps, orjson.loads
+    if name == "msgspec":
+        import msgspec
+
+        encoder = msgspec.json.Encoder()
+        decoder = msgspec.json.Decoder()
+
+        def decode(data: str | bytes) -> Any:
+            try:
+                return decoder.decode(data)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+
+        return encoder.encode, decode
+    if name == "json":
+        return _stdlib_dumps, json.loads
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+
+def _select_backend(
+    preferred: str,
+) -> tuple[str, Callable[[Any], bytes], Callable[[str | bytes], Any]]:
+    """Preferred backend, or the first installed one for "auto"."""
+    candidates = BACKENDS if preferred == "auto" else (preferred,)
+    for name in candidates:
+        try:
+            return (name, *_load_backend(name))
+        except ImportError:
+            if preferred != "auto":
+                raise
+    raise RuntimeError("No JSON backend available")
+
+
+backend, _dumps, _loads = _select_backend(settings.json_backend)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to compact UTF-8 JSON bytes."""
+    return _dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    """Encode to a compact JSON string."""
+    return _dumps(obj).decode()
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode JSON from str or bytes; raises ValueError on invalid input."""
+    return _loads(data)
@@ -0,0 +1,83 @@
+"""Entry points for serving the Flask apps: dev server or gunicorn."""
+
+import logging
+from typing import Any
+
+from flask import Flask
+from gunicorn.app.base import BaseApplication
+
+from core.cache import create_cache
+from core.config import settings
+from core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+class GunicornApplication(BaseApplication):  # type: ignore[misc]
+    """Runs a Flask app under gunicorn with options from settings."""
+
+    def __init__(self, app: Flask, options: dict[str, Any]) -> None:
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Flask:
+        return self.application
+
+
+def warm_up() -> None:
+    """
+    Open the DB pool and Redis connection in a worker before it takes traffic.
+
+    Best effort: if a backend is unreachable the worker still boots and
+    connects lazily on the first request.
+    """
+    try:
+        engine = get_engine()
+        # Never share connections inherited from the master across the fork
+        engine.dispose(close=False)
+        with engine.connect():
+            pass
+    except Exception:
+        logger.warning("Database warm-up failed", exc_info=True)
+    try:
+        if create_cache() is None:
+            logger.warning("Redis unavailable during warm-up")
+    except Exception:
+        logger.warning("Redis warm-up failed", exc_info=True)
+
+
+def _post_fork(_server: Any, worker: Any) -> None:
+    warm_up()
+    logger.info("Worker %s warmed up", worker.pid)
+
+
+def _worker_int(worker: Any) -> None:
+    logger.info("Worker %s interrupted, draining in-flight requests", worker.pid)
+
+
+def gunicorn_options(port: int) -> dict[str, Any]:
+    """gunicorn config from settings; graceful_timeout bounds in-flight draining."""
+    return {
+        "bind": f"{settings.server_host}:{port}",
+        "workers": settings.server_workers,
+        "threads": settings.server_threads,
+        "worker_class": settings.server_worker_class,
+        "timeout": settings.server_timeout_seconds,
+        "graceful_timeout": settings.server_graceful_timeout_seconds,
+        "keepalive": settings.server_keepalive_seconds,
+        "post_fork": _post_fork,
+        "worker_int": _worker_int,
+    }
+
+
+def serve(app: Flask, port: int) -> None:
+    """Serve with gunicorn when `server_mode` is "production", else the Flask dev server."""
+    if settings.server_mode == "production":
+        GunicornApplication(app, gunicorn_options(port)).run()
+    else:
+        app.run(host=settings.server_host, port=port, debug=settings.server_debug)
@@ -1,20 +1,34 @@
 """Shared utilities."""
 
-import json
+import time
+from contextlib import ExitStack
 from datetime import datetime
 from typing import Any
 
-from flask import Response
+from flask import Flask, Response, g, request
+
+from core.config import settings
+from core.db import begin_unit_of_work, current_unit_of_work, end_unit_of_work
+from core.profiling import profile_scope
+from core.serialization import dumps
+
+# time.time() until which a client that wrote reads from the primary database
+READ_PRIMARY_COOKIE = "db_read_primary_until"
 
 
 def json_response(data: dict[str, Any], status: int = 200) -> Response:
     """Create a Flask JSON response."""
-    return Response(json.dumps(data), status=status, mimetype="application/json")
+    return Response(dumps(data), status=status, mimetype="application/json")
 
 
 def lambda_response(data: dict[str, Any], status: int = 200) -> dict[str, Any]:
-    """Create an AWS Lambda response."""
-    return {"statusCode": status, "body": json.dumps(data)}
+    """
+    Create an AWS Lambda response.
+
+    The body stays structured: it is encoded once by whichever boundary
+    delivers it (Lambda runtime, Step Functions, or `json_response`).
+    """
+    return {"statusCode": status, "body": data}
 
 
 def to_dict(obj: Any) -> dict[str, Any]:
@@ -26,3 +40,58 @@ def to_dict(obj: Any) -> dict[str, Any]:
             value = value.isoformat()
         result[c.name] = value
     return result
+
+
+def register_unit_of_work(app: Flask) -> None:
+    """
+    Share one db connection and session across all queries of a request.
+
+    A request that writes returns a cookie keeping that client's reads on the
+    primary for `db_replica_read_your_writes_seconds`, so it sees its own
+    writes while every other client keeps reading from replicas.
+    """
+
+    @app.before_request
+    def begin_request_unit_of_work() -> None:
+        g.db_unit_of_work = begin_unit_of_work(primary_until=_read_primary_until())
+
+    @app.after_request
+    def mark_client_write(response: Response) -> Response:
+        uow = current_unit_of_work()
+        seconds = settings.db_replica_read_your_writes_seconds
+        if uow is not None and uow.wrote and seconds > 0:
+            until = f"{time.time() + seconds:.3f}"
+            response.set_cookie(READ_PRIMARY_COOKIE, until, max_age=seconds, httponly=True)
+        return response
+
+    @app.teardown_request
+    def end_request_unit_of_work(exc: BaseException | None) -> None:
+        token = g.pop("db_unit_of_work", None)
+        if token is not None:
+            end_unit_of_work(token, exc)
+
+
+def _read_primary_until() -> float:
+    """The client's read-your-writes deadline, capped so a forged cookie cannot pin it."""
+    try:
+        until = float(request.cookies.get(READ_PRIMARY_COOKIE, 0))
+    except ValueError:
+        return 0.0
+    return min(until, time.time() + float(settings.db_replica_read_your_writes_seconds))
+
+
+def register_profiling(app: Flask) -> None:
+    """Profile requests sent with the `profiling_header` header, or sampled ones."""
+
+    @app.before_request
+    def begin_request_profile() -> None:
+        scope = ExitStack()
+        requested = bool(request.headers.get(settings.profiling_header))
+        scope.enter_context(profile_scope(request.endpoint or request.path, requested))
+        g.profile_scope = scope
+
+    @app.teardown_request
+    def end_request_profile(_exc: BaseException | None) -> None:
+        scope = g.pop("profile_scope", None)
+        if scope is not None:
+            scope.close()
@@ -0,0 +1,144 @@
+"""
+Vectorized transcript analytics: where a transcript is unreliable and how dense its speech is.
+
+A transcript's words are turned into NumPy arrays of start, end and
+confidence once; every metric is then computed with array operations instead
+of a Python loop over `Word` objects. The result is stored under `analytics`
+in the result dict, next to the transcript.
+
+    python -m stt.analytics <campaign_id>   # recompute stored results of a campaign
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from core.cache import RedisCache
+from core.config import settings
+from stt import results
+from stt.models import TranscriptionResult, Word
+from stt.results import rewrite_campaign_results
+
+
+@dataclass(frozen=True)
+class Timeline:
+    """Word timings and confidences of one transcript as parallel arrays."""
+
+    start_ms: npt.NDArray[np.int64]
+    end_ms: npt.NDArray[np.int64]
+    confidence: npt.NDArray[np.float64]
+
+    @classmethod
+    def from_words(cls, words: Sequence[Word]) -> "Timeline":
+        count = len(words)
+        return cls(
+            start_ms=np.fromiter((w.start_ms for w in words), np.int64, count),
+            end_ms=np.fromiter((w.end_ms for w in words), np.int64, count),
+            confidence=np.fromiter((w.confidence for w in words), np.float64, count),
+        )
+
+    def __len__(self) -> int:
+        return len(self.start_ms)
+
+
+def rolling_confidence(confidence: npt.NDArray[np.float64], window: int) -> npt.NDArray[np.float64]:
+    """Mean confidence of every run of `window` consecutive words (all words if fewer)."""
+    window = max(1, min(window, len(confidence)))
+    sums = np.concatenate(([0.0], np.cumsum(confidence)))
+    means: npt.NDArray[np.float64] = (sums[window:] - sums[:-window]) / window
+    return means
+
+
+def low_confidence_spans(timeline: Timeline, threshold: float, window: int) -> list[dict[str, Any]]:
+    """
+    Maximal spans of words covered by a window whose mean confidence is below
+    `threshold`, with their timing and own mean confidence.
+    """
+    if not len(timeline):
+        return []
+    window = max(1, min(window, len(timeline)))
+    low = rolling_confidence(timeline.confidence, window) < threshold
+    # A word is covered when any of the windows containing it is low
+    covered = np.convolve(low.astype(np.int32), np.ones(window, np.int32)) > 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], covered.astype(np.int8), [0]))))
+    first, last = edges[::2], edges[1::2]  # span is words[first:last]
+    sums = np.concatenate(([0.0], np.cumsum(timeline.confidence)))
+    means = (sums[last] - sums[first]) / (last - first)
+    return [
+        {
+            "start_ms": int(timeline.start_ms[a]),
+            "end_ms": int(timeline.end_ms[b - 1]),
+            "word_index": int(a),
+            "word_count": int(b - a),
+            "mean_confidence": round(float(mean), 4),
+        }
+        for a, b, mean in zip(first, last, means, strict=True)
+    ]
+
+
+def words_per_minute(
+    timeline: Timeline, duration_ms: int, bucket_ms: int
+) -> tuple[float, list[float]]:
+    """Overall speech rate and the rate within each `bucket_ms` slice of the audio."""
+    duration_ms = max(duration_ms, int(timeline.end_ms.max()) if len(timeline) else 0)
+    if duration_ms <= 0:
+        return 0.0, []
+    buckets = -(-duration_ms // bucket_ms)
+    counts = np.bincount(np.minimum(timeline.start_ms // bucket_ms, buckets - 1), minlength=buckets)
+    # The last bucket is usually shorter than bucket_ms
+    lengths = np.minimum(bucket_ms, duration_ms - np.arange(buckets) * bucket_ms)
+    rates = counts * 60_000 / lengths
+    overall = len(timeline) * 60_000 / duration_ms
+    return round(overall, 2), [round(float(rate), 2) for rate in rates]
+
+
+def silence_gaps(timeline: Timeline, min_gap_ms: int) -> list[dict[str, int]]:
+    """Pauses of at least `min_gap_ms` between consecutive words."""
+    gaps = timeline.start_ms[1:] - timeline.end_ms[:-1]
+    (indexes,) = np.nonzero(gaps >= min_gap_ms)
+    return [
+        {
+            "start_ms": int(timeline.end_ms[i]),
+            "end_ms": int(timeline.start_ms[i + 1]),
+            "after_word_index": int(i),
+        }
+        for i in indexes
+    ]
+
+
+def analyze(result: TranscriptionResult) -> dict[str, Any]:
+    """Analytics of one transcript with the thresholds from settings."""
+    timeline = Timeline.from_words(result.words)
+    overall, per_bucket = words_per_minute(
+        timeline, result.duration_ms, settings.stt_analytics_bucket_seconds * 1000
+    )
+    gaps = silence_gaps(timeline, settings.stt_analytics_min_gap_ms)
+    return {
+        "low_confidence_spans": low_confidence_spans(
+            timeline, settings.stt_analytics_low_confidence, settings.stt_analytics_window_words
+        ),
+        "words_per_minute": overall,
+        "words_per_minute_buckets": per_bucket,
+        "silence_gaps": gaps,
+        "silence_ms": sum(gap["end_ms"] - gap["start_ms"] for gap in gaps),
+    }
+
+
+def analyze_campaign(campaign_id: str, cache: RedisCache, batch_size: int = 500) -> int:
+    """Recompute analytics of a campaign's stored results; returns items analyzed."""
+
+    def update(data: dict[str, Any]) -> dict[str, Any]:
+        return {"analytics": analyze(TranscriptionResult.from_dict(data))}
+
+    return rewrite_campaign_results(campaign_id, cache, update, batch_size)
+
+
+def main(argv: list[str] | None = None) -> None:
+    results.main(argv, "Recompute a campaign's transcript analytics", analyze_campaign)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Per-campaign audio budgets enforced atomically in Redis."""
+
+import logging
+from dataclasses import dataclass
+
+from core.cache import RedisCache
+from core.config import settings
+from core.models import Campaign
+
+logger = logging.getLogger(__name__)
+
+BUDGET_PREFIX = "stt:budget"
+MS_PER_MINUTE = 60_000
+MS_PER_HOUR = 3_600_000
+
+# BudgetLedger.reserve result while in-flight reservations hold the budget
+HELD_BY_IN_FLIGHT = -1
+
+# Reserve ARGV[2] ms of the remaining budget. Returns -1 while in-flight work
+# holds what the estimate needs, and 0 once the budget is spent. With nothing
+# in flight, the last item may take what is left and overrun by its remainder.
+# The hash holds `used_ms` (charged) and `reserved_ms` (held by in-flight work).
+_RESERVE_SCRIPT = """
+local used = tonumber(redis.call('HGET', KEYS[1], 'used_ms') or '0')
+local reserved = tonumber(redis.call('HGET', KEYS[1], 'reserved_ms') or '0')
+local limit = tonumber(ARGV[1])
+if used >= limit then
+    return 0
+end
+local remaining = limit - used - reserved
+local estimate = math.max(1, tonumber(ARGV[2]))
+if estimate > remaining and reserved > 0 then
+    return -1
+end
+local amount = math.min(estimate, remaining)
+redis.call('HINCRBY', KEYS[1], 'reserved_ms', amount)
+return amount
+"""
+
+# Release a reservation of ARGV[1] ms and charge the ARGV[2] ms actually used.
+_SETTLE_SCRIPT = """
+local reserved = tonumber(redis.call('HINCRBY', KEYS[1], 'reserved_ms', -tonumber(ARGV[1])))
+if reserved < 0 then
+    redis.call('HSET', KEYS[1], 'reserved_ms', 0)
+end
+return redis.call('HINCRBY', KEYS[1], 'used_ms', ARGV[2])
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Budget:
+    """Audio a campaign may still have transcribed, as one limit in milliseconds."""
+
+    campaign_id: str
+    limit_ms: int
+
+    @classmethod
+    def for_campaign(cls, campaign: Campaign) -> "Budget | None":
+        """
+        The tighter of the campaign's audio-minutes and spend budgets.
+
+        Spend is converted to audio time at `stt_cost_per_audio_hour_usd`.
+        Returns None when the campaign has no budget.
+        """
+        limits = []
+        if campaign.budget_audio_minutes is not None:
+            limits.append(int(campaign.budget_audio_minutes * MS_PER_MINUTE))
+        if campaign.budget_spend_usd is not None:
+            hours = campaign.budget_spend_usd / settings.stt_cost_per_audio_hour_usd
+            limits.append(int(hours * MS_PER_HOUR))
+        if not limits:
+            return None
+        return cls(campaign.id, min(limits))
+
+
+class BudgetLedger:
+    """
+    Reserve-then-charge accounting of campaign audio in Redis.
+
+    Work reserves an estimate of its audio before calling the provider, so
+    concurrent workers cannot overrun a budget together. After completion the
+    reservation is released and the actual `duration_ms` is charged. The
+    ledger has no TTL, so a spent budget never silently resets. A
+    reservation that only fails because of other in-flight reservations is
+    told apart from a spent budget, since it can succeed once they settle.
+    """
+
+    def __init__(self, cache: RedisCache) -> None:
+        self._client = cache.client
+        self._reserve = self._client.register_script(_RESERVE_SCRIPT)
+        self._settle = self._client.register_script(_SETTLE_SCRIPT)
+
+    def reserve(self, budget: Budget, estimate_ms: int) -> int:
+        """
+        Reserve `estimate_ms`; returns the amount reserved, 0 if the budget is
+        spent, or `HELD_BY_IN_FLIGHT` if in-flight work holds what is needed.
+        """
+        key = budget_key(budget.campaign_id)
+        return int(self._reserve(keys=[key], args=[budget.limit_ms, estimate_ms]))
+
+    def settle(self, budget: Budget, reserved_ms: int, used_ms: int) -> int:
+        """Release a reservation and charge `used_ms`; returns the total charged so far."""
+        key = budget_key(budget.campaign_id)
+        used = self._settle(keys=[key], args=[reserved_ms, used_ms])
+        if int(used) > budget.limit_ms:
+            logger.warning("Campaign %s is over its audio budget", budget.campaign_id)
+        return int(used)
+
+    def used_ms(self, campaign_id: str) -> int:
+        """Audio charged to a campaign so far."""
+        return int(self._client.hget(budget_key(campaign_id), "used_ms") or 0)
+
+
+def budget_key(campaign_id: str) -> str:
+    return f"{BUDGET_PREFIX}:{campaign_id}"
@@ -0,0 +1,98 @@
+"""Cache identity for transcripts: canonical audio URLs, content and config fingerprints."""
+
+import hashlib
+import json
+import logging
+from fnmatch import fnmatch
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_FINGERPRINT_TIMEOUT_SECONDS = 10.0
+
+
+def canonical_url(url: str, mode: str, strip_params: list[str]) -> str:
+    """
+    Normalize an audio URL so re-signed links to the same object share a key.
+
+    Modes:
+        none: use the URL as is
+        strip_signing: drop query params matching `strip_params` (glob, case-insensitive)
+        path: drop the whole query string
+    """
+    if mode == "none":
+        return url
+
+    parts = urlsplit(url)
+    query = ""
+    if mode == "strip_signing":
+        patterns = [p.lower() for p in strip_params]
+        kept = [
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not any(fnmatch(name.lower(), p) for p in patterns)
+        ]
+        query = urlencode(sorted(kept))
+    elif mode != "path":
+        raise ValueError(f"Unknown URL canonicalization mode: {mode}")
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+def content_fingerprint(url: str, range_bytes: int) -> str | None:
+    """Hash of the leading `range_bytes` of the audio plus its total size, if fetchable."""
+    try:
+        with httpx.stream(
+            "GET",
+            url,
+            headers={"Range": f"bytes=0-{range_bytes - 1}"},
+            timeout=CONTENT_FINGERPRINT_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        ) as response:
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            read = 0
+            for data in response.iter_bytes():
+                digest.update(data[: range_bytes - read])
+                read += len(data)
+                if read >= range_bytes:
+                    break
+            total = response.headers.get("content-range", "").rpartition("/")[2]
+            digest.update((total or response.headers.get("content-length", "")).encode())
+            return f"content:{digest.hexdigest()}"
+    except httpx.HTTPError as e:
+        logger.warning("Content fingerprint unavailable for %s: %s", url[:50], e)
+        return None
+
+
+def config_fingerprint() -> str:
+    """Short hash of every setting that changes transcript output."""
+    config = {
+        "speech_models": list(settings.stt_speech_models),
+        "language_code": settings.stt_language_code,
+        "speaker_labels": settings.stt_speaker_labels,
+        "punctuate": settings.stt_punctuate,
+        "format_text": settings.stt_format_text,
+        "chunking": settings.stt_chunking_enabled,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def transcript_namespace(prefix: str) -> str:
+    """Cache prefix scoped to the current transcription config."""
+    return f"{prefix}:{config_fingerprint()}"
+
+
+def transcript_identity(audio_url: str) -> str:
+    """Identifier the transcript cache key is derived from."""
+    if settings.stt_cache_content_fingerprint:
+        fingerprint = content_fingerprint(audio_url, settings.stt_cache_fingerprint_bytes)
+        if fingerprint:
+            return fingerprint
+    return canonical_url(
+        audio_url, settings.stt_cache_url_mode, list(settings.stt_cache_strip_params)
+    )
@@ -0,0 +1,192 @@
+"""Splitting long audio into overlapping chunks and stitching their transcripts."""
+
+import json
+import subprocess
+import tempfile
+from collections.abc import Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+from core.config import settings
+from stt.models import Sentence, TranscriptionResult, Word
+
+
+@dataclass(frozen=True, slots=True)
+class AudioChunk:
+    """Segment of the source audio, transcribable on its own."""
+
+    source: str
+    offset_ms: int
+    duration_ms: int
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkingConfig:
+    """Chunk sizing and parallelism for long audio."""
+
+    chunk_ms: int
+    overlap_ms: int
+    max_workers: int
+
+    @classmethod
+    def from_settings(cls) -> "ChunkingConfig":
+        return cls(
+            chunk_ms=int(settings.stt_chunk_seconds * 1000),
+            overlap_ms=int(settings.stt_chunk_overlap_seconds * 1000),
+            max_workers=settings.stt_chunk_max_workers,
+        )
+
+
+class AudioSplitter(Protocol):
+    """Splits audio into chunks that stay available while the context is open."""
+
+    def split(
+        self, audio_url: str, chunk_ms: int, overlap_ms: int
+    ) -> AbstractContextManager[list[AudioChunk]]: ...
+
+
+class FfmpegSplitter:
+    """Splits audio with ffmpeg into temporary FLAC files."""
+
+    def __init__(self, ffmpeg: str = "ffmpeg", ffprobe: str = "ffprobe") -> None:
+        self._ffmpeg = ffmpeg
+        self._ffprobe = ffprobe
+
+    @contextmanager
+    def split(self, audio_url: str, chunk_ms: int, overlap_ms: int) -> Iterator[list[AudioChunk]]:
+        duration_ms = self._probe_duration_ms(audio_url)
+        if duration_ms <= chunk_ms:
+            yield [AudioChunk(audio_url, 0, duration_ms)]
+            return
+
+        with tempfile.TemporaryDirectory(prefix="stt-chunks-") as tmp:
+            chunks = []
+            for index, (offset, length) in enumerate(
+                chunk_spans(duration_ms, chunk_ms, overlap_ms)
+            ):
+                path = Path(tmp) / f"chunk-{index:04d}.flac"
+                self._extract(audio_url, offset, length, path)
+                chunks.append(AudioChunk(str(path), offset, length))
+            yield chunks
+
+    def _probe_duration_ms(self, audio_url: str) -> int:
+        output = subprocess.run(
+            [
+                self._ffprobe,
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "json",
+                audio_url,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        return int(float(json.loads(output)["format"]["duration"]) * 1000)
+
+    def _extract(self, audio_url: str, offset_ms: int, length_ms: int, path: Path) -> None:
+        subprocess.run(
+            [
+                self._ffmpeg,
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-ss",
+                f"{offset_ms / 1000:.3f}",
+                "-t",
+                f"{length_ms / 1000:.3f}",
+                "-i",
+                audio_url,
+                "-vn",
+                "-ac",
+                "1",
+                "-ar",
+                "16000",
+                str(path),
+            ],
+            check=True,
+            capture_output=True,
+        )
+
+
+def chunk_spans(duration_ms: int, chunk_ms: int, overlap_ms: int) -> list[tuple[int, int]]:
+    """(offset, length) pairs covering the audio, consecutive spans overlapping."""
+    if overlap_ms >= chunk_ms:
+        raise ValueError("overlap must be shorter than the chunk")
+    spans = []
+    offset = 0
+    while True:
+        length = min(chunk_ms, duration_ms - offset)
+        spans.append((offset, length))
+        if offset + length >= duration_ms:
+            return spans
+        offset += chunk_ms - overlap_ms
+
+
+def stitch(
+    chunks: Sequence[AudioChunk],
+    results: Sequence[TranscriptionResult],
+    audio_url: str,
+) -> TranscriptionResult:
+    """
+    Merge per-chunk transcripts into one result on the source audio timeline.
+
+    Timestamps are shifted by each chunk's offset. Within an overlap, words and
+    sentences starting before the overlap midpoint come from the earlier chunk
+    and the rest from the later one, so nothing is transcribed twice.
+    """
+    words: list[Word] = []
+    sentences: list[Sentence] = []
+
+    for index, (chunk, result) in enumerate(zip(chunks, results, strict=True)):
+        lower = _cut(chunks[index - 1], chunk) if index > 0 else 0
+        upper = _cut(chunk, chunks[index + 1]) if index + 1 < len(chunks) else None
+        offset = chunk.offset_ms
+
+        def keep(start_ms: int, lower: int = lower, upper: int | None = upper) -> bool:
+            return start_ms >= lower and (upper is None or start_ms < upper)
+
+        words.extend(
+            Word(w.text, w.start_ms + offset, w.end_ms + offset, w.confidence)
+            for w in result.words
+            if keep(w.start_ms + offset)
+        )
+        sentences.extend(
+            Sentence(s.text, s.start_ms + offset, s.end_ms + offset)
+            for s in result.sentences
+            if keep(s.start_ms + offset)
+        )
+
+    segments: Sequence[Sentence | Word] = sentences or words
+    text = " ".join(segment.text for segment in segments)
+
+    if words:
+        confidence = sum(w.confidence for w in words) / len(words)
+    else:
+        confidence = sum(r.confidence for r in results) / len(results) if results else 0.0
+
+    return TranscriptionResult(
+        text=text,
+        words=tuple(words),
+        sentences=tuple(sentences),
+        language_code=next((r.language_code for r in results if r.text), "en"),
+        confidence=confidence,
+        duration_ms=max(
+            (
+                c.offset_ms + max(c.duration_ms, r.duration_ms)
+                for c, r in zip(chunks, results, strict=True)
+            ),
+            default=0,
+        ),
+        audio_url=audio_url,
+    )
+
+
+def _cut(earlier: AudioChunk, later: AudioChunk) -> int:
+    """Midpoint of the overlap between two consecutive chunks."""
+    return (later.offset_ms + earlier.offset_ms + earlier.duration_ms) // 2
@@ -0,0 +1,381 @@
+"""
+Fake AssemblyAI HTTP server for offline load tests and benchmarks.
+
+Implements the v2 endpoints the SDK uses for pre-recorded audio (upload,
+create transcript, poll, sentences). Transcripts are either replayed from
+recordings of real API responses or generated synthetically. Processing time
+follows a lognormal latency distribution, and a share of requests can fail or
+be rate limited.
+
+Point the service at it with `APP_STT_ASSEMBLYAI_BASE_URL`:
+
+    python -m stt.fake_assemblyai serve --port 5002 --rate-limit-rate 0.05
+    python -m stt.fake_assemblyai record <transcript_id> ... --out recordings/
+"""
+
+import argparse
+import hashlib
+import itertools
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+
+from core.config import settings
+from core.serialization import dumps, loads
+from core.utils import json_response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.assemblyai.com"
+
+_VOCABULARY = (
+    "the",
+    "quick",
+    "brown",
+    "fox",
+    "jumps",
+    "over",
+    "lazy",
+    "dog",
+    "we",
+    "are",
+    "going",
+    "to",
+    "talk",
+    "about",
+    "product",
+    "pricing",
+    "market",
+    "customer",
+    "growth",
+    "today",
+    "this",
+    "week",
+    "really",
+    "great",
+    "question",
+    "thanks",
+    "everyone",
+    "for",
+    "joining",
+    "let",
+    "me",
+    "share",
+    "my",
+    "screen",
+    "next",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class FakeProfile:
+    """
+    Behaviour of the fake server.
+
+    `mode` is "synthetic" or "replay". Processing takes a lognormal sample with
+    the given median and sigma (sigma 0 is a fixed delay), plus
+    `latency_per_audio_minute_seconds` for each minute of audio. `error_rate`
+    completes transcripts with status "error"; `rate_limit_rate` answers
+    transcript creation with HTTP 429. Synthetic audio lasts `duration_seconds`
+    unless the audio URL carries a `duration` query parameter.
+    """
+
+    mode: str = "synthetic"
+    recordings_dir: Path | None = None
+    latency_median_seconds: float = 1.0
+    latency_sigma: float = 0.5
+    latency_per_audio_minute_seconds: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    duration_seconds: float = 60.0
+    words_per_minute: int = 150
+    seed: int | None = None
+
+
+@dataclass(slots=True)
+class _Job:
+    transcript: dict[str, Any]
+    sentences: list[dict[str, Any]]
+    ready_at: float
+    failed: bool
+
+
+@dataclass(slots=True)
+class FakeStats:
+    """Request counters, served at `GET /fake/stats`."""
+
+    created: int = 0
+    rate_limited: int = 0
+    failed: int = 0
+    polls: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def incr(self, name: str) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def to_dict(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "created": self.created,
+                "rate_limited": self.rate_limited,
+                "failed": self.failed,
+                "polls": self.polls,
+            }
+
+
+def create_app(profile: FakeProfile) -> Flask:
+    """Flask app emulating the AssemblyAI v2 transcript API."""
+    app = Flask(__name__)
+    rng = random.Random(profile.seed)
+    rng_lock = threading.Lock()
+    recordings = load_recordings(profile.recordings_dir) if profile.mode == "replay" else []
+    if profile.mode == "replay" and not recordings:
+        raise ValueError("Replay mode needs recordings in recordings_dir")
+    jobs: dict[str, _Job] = {}
+    stats = FakeStats()
+    app.extensions["fake_assemblyai_stats"] = stats
+
+    def chance(rate: float) -> bool:
+        with rng_lock:
+            return rng.random() < rate
+
+    def processing_seconds(duration_ms: int) -> float:
+        with rng_lock:
+            sample = profile.latency_median_seconds * math.exp(
+                rng.gauss(0.0, profile.latency_sigma)
+            )
+        return sample + profile.latency_per_audio_minute_seconds * duration_ms / 60_000
+
+    @app.route("/v2/upload", methods=["POST"])
+    def upload() -> Response:
+        digest = hashlib.sha256(request.get_data()).hexdigest()[:16]
+        return json_response({"upload_url": f"https://cdn.fake-assemblyai.local/{digest}"})
+
+    @app.route("/v2/transcript", methods=["POST"])
+    def create_transcript() -> Response:
+        body = request.get_json(silent=True) or {}
+        audio_url = body.get("audio_url")
+        if not audio_url:
+            return json_response({"error": "audio_url is required"}, 400)
+        if chance(profile.rate_limit_rate):
+            stats.incr("rate_limited")
+            return json_response({"error": "Too many requests"}, 429)
+
+        if profile.mode == "replay":
+            transcript, sentences = _replay(recordings, audio_url)
+        else:
+            transcript, sentences = _synthesize(profile, audio_url)
+        transcript.update(id=str(uuid.uuid4()), audio_url=audio_url)
+        duration_ms = int((transcript.get("audio_duration") or 0) * 1000)
+        job = _Job(
+            transcript=transcript,
+            sentences=sentences,
+            ready_at=time.monotonic() + processing_seconds(duration_ms),
+            failed=chance(profile.error_rate),
+        )
+        jobs[transcript["id"]] = job
+        stats.incr("created")
+        return json_response({"id": transcript["id"], "status": "queued", "audio_url": audio_url})
+
+    @app.route("/v2/transcript/<transcript_id>", methods=["GET"])
+    def get_transcript(transcript_id: str) -> Response:
+        job = jobs.get(transcript_id)
+        if job is None:
+            return json_response({"error": "Transcript not found"}, 404)
+        stats.incr("polls")
+        if time.monotonic() < job.ready_at:
+            return json_response(
+                {
+                    "id": transcript_id,
+                    "status": "processing",
+                    "audio_url": job.transcript["audio_url"],
+                }
+            )
+        if job.failed:
+            stats.incr("failed")
+            return json_response(
+                {
+                    "id": transcript_id,
+                    "status": "error",
+                    "audio_url": job.transcript["audio_url"],
+                    "error": "Internal server error, please try again",
+                }
+            )
+        return json_response({**job.transcript, "status": "completed"})
+
+    @app.route("/v2/transcript/<transcript_id>/sentences", methods=["GET"])
+    def get_sentences(transcript_id: str) -> Response:
+        job = jobs.get(transcript_id)
+        if job is None or time.monotonic() < job.ready_at or job.failed:
+            return json_response({"error": "Transcript not found"}, 404)
+        return json_response(
+            {
+                "id": transcript_id,
+                "sentences": job.sentences,
+                "confidence": job.transcript.get("confidence") or 0.0,
+                "audio_duration": job.transcript.get("audio_duration") or 0.0,
+            }
+        )
+
+    @app.route("/fake/stats", methods=["GET"])
+    def fake_stats() -> Response:
+        return json_response(stats.to_dict())
+
+    return app
+
+
+def load_recordings(directory: Path | None) -> list[dict[str, Any]]:
+    """Recordings written by `record`: {"transcript": {...}, "sentences": [...]} per file."""
+    if directory is None:
+        return []
+    return [loads(path.read_bytes()) for path in sorted(Path(directory).glob("*.json"))]
+
+
+def _replay(
+    recordings: list[dict[str, Any]], audio_url: str
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """The recording of this audio URL, else one picked deterministically by URL."""
+    for recording in recordings:
+        if recording["transcript"].get("audio_url") == audio_url:
+            break
+    else:
+        index = int(hashlib.sha256(audio_url.encode()).hexdigest(), 16) % len(recordings)
+        recording = recordings[index]
+    return dict(recording["transcript"]), list(recording.get("sentences", []))
+
+
+def _synthesize(
+    profile: FakeProfile, audio_url: str
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Deterministic transcript for a URL, `duration_seconds` long at `words_per_minute`."""
+    query = parse_qs(urlsplit(audio_url).query)
+    duration_seconds = float(query.get("duration", [profile.duration_seconds])[0])
+    duration_ms = int(duration_seconds * 1000)
+    seed = f"{profile.seed}:{audio_url}".encode()
+    rng = random.Random(int(hashlib.sha256(seed).hexdigest(), 16))
+
+    slot_ms = 60_000 // profile.words_per_minute
+    words: list[dict[str, Any]] = []
+    for start in range(0, duration_ms - slot_ms + 1, slot_ms):
+        words.append(
+            {
+                "text": rng.choice(_VOCABULARY),
+                "start": start,
+                "end": start + slot_ms * 4 // 5,
+                "confidence": round(rng.uniform(0.6, 1.0), 3),
+            }
+        )
+
+    sentences = []
+    remaining = iter(words)
+    while batch := list(itertools.islice(remaining, rng.randint(8, 16))):
+        batch[0]["text"] = batch[0]["text"].capitalize()
+        batch[-1]["text"] += "."
+        sentences.append(
+            {
+                "text": " ".join(word["text"] for word in batch),
+                "start": batch[0]["start"],
+                "end": batch[-1]["end"],
+                "confidence": sum(word["confidence"] for word in batch) / len(batch),
+                "words": batch,
+            }
+        )
+
+    confidence = sum(word["confidence"] for word in words) / len(words) if words else 0.0
+    transcript = {
+        "text": " ".join(sentence["text"] for sentence in sentences),
+        "words": words,
+        "confidence": confidence,
+        "audio_duration": round(duration_seconds),  # whole seconds, like the real API
+        "language_code": "en_us",
+    }
+    return transcript, sentences
+
+
+@contextmanager
+def running(profile: FakeProfile, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Run the fake server in a background thread; yields its base URL."""
+    server = make_server(host, port, create_app(profile), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def record(transcript_ids: list[str], out_dir: Path, base_url: str = DEFAULT_BASE_URL) -> None:
+    """Save completed transcripts from the real API as replay recordings."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    headers = {"authorization": settings.stt_assemblyai_api_key}
+    with httpx.Client(base_url=base_url, headers=headers, timeout=30) as client:
+        for transcript_id in transcript_ids:
+            transcript = client.get(f"/v2/transcript/{transcript_id}").raise_for_status().json()
+            sentences = client.get(f"/v2/transcript/{transcript_id}/sentences")
+            recording = {
+                "transcript": transcript,
+                "sentences": sentences.raise_for_status().json()["sentences"],
+            }
+            (out_dir / f"{transcript_id}.json").write_bytes(dumps(recording))
+            logger.info("Recorded transcript %s", transcript_id)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Fake AssemblyAI API for offline load tests")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the fake API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=5002)
+    serve_parser.add_argument("--mode", choices=("synthetic", "replay"), default="synthetic")
+    serve_parser.add_argument("--recordings", type=Path)
+    serve_parser.add_argument("--latency-median", type=float, default=1.0)
+    serve_parser.add_argument("--latency-sigma", type=float, default=0.5)
+    serve_parser.add_argument("--latency-per-audio-minute", type=float, default=0.0)
+    serve_parser.add_argument("--error-rate", type=float, default=0.0)
+    serve_parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    serve_parser.add_argument("--duration", type=float, default=60.0)
+    serve_parser.add_argument("--seed", type=int)
+
+    record_parser = commands.add_parser("record", help="save real transcripts for replay")
+    record_parser.add_argument("transcript_ids", nargs="+")
+    record_parser.add_argument("--out", type=Path, required=True)
+    record_parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "record":
+        record(args.transcript_ids, args.out, args.base_url)
+        return
+
+    profile = FakeProfile(
+        mode=args.mode,
+        recordings_dir=args.recordings,
+        latency_median_seconds=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        latency_per_audio_minute_seconds=args.latency_per_audio_minute,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        duration_seconds=args.duration,
+        seed=args.seed,
+    )
+    create_app(profile).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
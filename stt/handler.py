@@ -1,12 +1,32 @@
 """AWS Lambda handler for STT service."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from core.cache import create_cache
-from core.db import create_failure, get_item, update_item_status
+from core.config import settings
+from core.db import (
+    complete_item,
+    create_failure,
+    get_campaign,
+    get_item,
+    release_connection,
+    rollback_session,
+    start_item_attempt,
+    unit_of_work,
+    update_item_status,
+)
+from core.models import RETRYABLE_ERRORS
+from core.profiling import profile_scope
+from core.serialization import loads
 from core.utils import lambda_response
-from stt.service import TranscriptionError, TranscriptionService
+from stt.analytics import analyze
+from stt.budget import Budget
+from stt.chunking import ChunkingConfig, FfmpegSplitter
+from stt.scanner import flag_result, get_scanner
+from stt.scheduler import FairScheduler, Share
+from stt.service import RATE_LIMIT_KEY, TranscriptionError, TranscriptionService
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -18,10 +38,29 @@ def get_service() -> TranscriptionService:
     """Get or create service instance."""
     global _service
     if _service is None:
-        _service = TranscriptionService()
+        scheduler = _create_scheduler() if settings.stt_fair_scheduling else None
+        if settings.stt_chunking_enabled:
+            _service = TranscriptionService(
+                FfmpegSplitter(), ChunkingConfig.from_settings(), scheduler=scheduler
+            )
+        else:
+            _service = TranscriptionService(scheduler=scheduler)
     return _service
 
 
+def _create_scheduler() -> FairScheduler | None:
+    cache = create_cache()
+    if cache is None:
+        return None
+    return FairScheduler(
+        cache,
+        RATE_LIMIT_KEY,
+        settings.stt_rate_limit_requests,
+        settings.rate_limit_window_seconds,
+        settings.stt_lane_weights,
+    )
+
+
 def handler(event: dict[str, Any], _context: Any) -> dict[str, Any]:
     """
     Lambda handler for audio transcription.
@@ -29,12 +68,91 @@ def handler(event: dict[str, Any], _context: Any) -> dict[str, Any]:
     Expected event format (e.g., from Step Functions):
     {
         "campaign_id": "uuid",
-        "item_id": "uuid"
+        "item_id": "uuid",
+        "profile": true  # optional, see core.profiling
     }
 
     Returns:
         Lambda response with statusCode and body
     """
+    # Items are usually created moments before they are processed, so read the primary
+    with (
+        profile_scope("stt_handler", event.get("profile") is True),
+        unit_of_work(use_replicas=False),
+    ):
+        return _process(event)
+
+
+def batch_handler(event: dict[str, Any], _context: Any) -> dict[str, Any]:
+    """
+    Lambda handler for a batch of items, processed concurrently.
+
+    Accepted event formats:
+    - SQS: {"Records": [{"messageId": "...", "body": "<item event JSON>"}]}
+    - Step Functions ItemBatcher: {"Items": [{"campaign_id": ..., "item_id": ...}]}
+    - Plain list: {"items": [...]}
+
+    Returns:
+        {"batchItemFailures": [{"itemIdentifier": ...}], "results": [...]} where
+        failures list only retryable errors (message id for SQS, else item id)
+    """
+    entries = _batch_entries(event)
+    get_service()  # initialize once before fanning out to worker threads
+
+    with ThreadPoolExecutor(max_workers=settings.stt_batch_max_workers) as pool:
+        responses = list(pool.map(_process_entry, entries))
+
+    failures = [
+        {"itemIdentifier": identifier}
+        for (identifier, _), response in zip(entries, responses, strict=True)
+        if _is_retryable(response)
+    ]
+    logger.info("Processed batch of %d items, %d to retry", len(entries), len(failures))
+    return {
+        "batchItemFailures": failures,
+        "results": [
+            {"item_id": item_event.get("item_id"), "statusCode": response["statusCode"]}
+            for (_, item_event), response in zip(entries, responses, strict=True)
+        ],
+    }
+
+
+def _batch_entries(event: dict[str, Any]) -> list[tuple[str, dict[str, Any]]]:
+    """(failure identifier, single-item event) pairs from any supported batch format."""
+    if "Records" in event:
+        entries = []
+        for record in event["Records"]:
+            try:
+                body = loads(record["body"])
+            except ValueError:
+                body = None
+            if not isinstance(body, dict):
+                logger.error("Dropping malformed record %s", record.get("messageId"))
+                body = {}
+            entries.append((record["messageId"], body))
+        return entries
+    items = event.get("Items", event.get("items", []))
+    return [(item.get("item_id", ""), item) for item in items]
+
+
+def _process_entry(entry: tuple[str, dict[str, Any]]) -> dict[str, Any]:
+    """One item's response; its errors never fail the other items of the batch."""
+    identifier, item_event = entry
+    try:
+        return handler(item_event, None)
+    except Exception as e:
+        logger.exception("Unhandled error for batch entry %s", identifier)
+        return _error_response(500, "INTERNAL_ERROR", str(e), item_event.get("item_id"))
+
+
+def _is_retryable(response: dict[str, Any]) -> bool:
+    if response["statusCode"] >= 500:
+        return True
+    return response["body"].get("error") in RETRYABLE_ERRORS
+
+
+def _process(event: dict[str, Any]) -> dict[str, Any]:
+    """Process a single item within the caller's unit of work."""
     campaign_id = event.get("campaign_id")
     item_id = event.get("item_id")
 
@@ -48,22 +166,47 @@ def handler(event: dict[str, Any], _context: Any) -> dict[str, Any]:
     if item.campaign_id != campaign_id:
         return _error_response(400, "INVALID_INPUT", "Item does not belong to campaign")
 
+    if item.status == "completed":
+        # Redelivered event (SQS delivers at least once, Step Functions retries
+        # batches): don't pay for the audio or count it in the stats again
+        logger.info("Item %s is already completed", item_id)
+        return lambda_response(
+            {"item_id": item_id, "campaign_id": campaign_id, "status": "completed"}
+        )
+
     if not item.audio_url:
         _log_failure(item_id, campaign_id, "NO_AUDIO_URL", "Item has no audio_url set")
         update_item_status(item_id, "failed")
         return _error_response(422, "NO_AUDIO_URL", "Item has no audio_url set")
 
-    update_item_status(item_id, "processing")
+    campaign = get_campaign(campaign_id)
+    share = Share(campaign_id, campaign.lane, campaign.weight) if campaign else None
+    budget = Budget.for_campaign(campaign) if campaign else None
+
+    start_item_attempt(item_id)
+    # The provider call can take minutes; don't hold a pooled connection through it
+    release_connection()
 
     try:
         service = get_service()
-        result = service.transcribe(item.audio_url)
+        result = service.transcribe(item.audio_url, share, budget, item.audio_duration_ms)
 
+        scanner = get_scanner()
+        result_dict = flag_result(scanner, result) if scanner else result.to_dict()
+        if settings.stt_analytics_enabled:
+            result_dict["analytics"] = analyze(result)
         cache = create_cache()
         if cache:
-            cache.set(f"stt:result:{item_id}", result.to_dict())
+            cache.set(f"stt:result:{item_id}", result_dict)
 
-        update_item_status(item_id, "completed")
+        flag_count = len(result_dict.get("flags", ()))
+        complete_item(
+            item_id,
+            duration_ms=result.duration_ms,
+            word_count=len(result.words),
+            confidence=result.confidence,
+            flag_count=flag_count,
+        )
         logger.info("Transcription completed for item %s", item_id)
 
         return lambda_response(
@@ -73,6 +216,7 @@ def handler(event: dict[str, Any], _context: Any) -> dict[str, Any]:
                 "status": "completed",
                 "duration_ms": result.duration_ms,
                 "confidence": result.confidence,
+                "flags": flag_count,
             }
         )
 
@@ -110,3 +254,5 @@ def _log_failure(item_id: str, campaign_id: str, error: str, message: str) -> No
         create_failure(item_id, campaign_id, "stt", error, message)
     except Exception:
         logger.exception("Failed to log failure record")
+        # A failed flush leaves the shared session unusable until rolled back
+        rollback_session()
@@ -0,0 +1,69 @@
+"""
+Rewriting the stored results of a campaign's completed items in place.
+
+Passes that add a field to every stored result (term flags, analytics) share
+the batch loop and the command line skeleton here:
+
+    python -m stt.scanner <campaign_id>     # re-scan for flagged terms
+    python -m stt.analytics <campaign_id>   # recompute analytics
+"""
+
+import argparse
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from core.cache import RedisCache, create_cache
+from core.db import init_db, iter_campaign_items
+
+logger = logging.getLogger(__name__)
+
+# Fields to set on one stored result dict, computed from the current dict
+ResultUpdate = Callable[[dict[str, Any]], dict[str, Any]]
+
+# A rewrite holds the campaign's lock for this long per batch
+_LOCK_SECONDS = 300
+
+
+def rewrite_campaign_results(
+    campaign_id: str, cache: RedisCache, update: ResultUpdate, batch_size: int = 500
+) -> int:
+    """
+    Merge `update(result)` into the stored result of each completed item;
+    returns results rewritten.
+
+    Each result is read, updated and written back, so rewrites of one campaign
+    hold a Redis lock: concurrent passes setting different fields run one
+    after the other instead of overwriting each other's changes.
+    """
+    rewritten = 0
+    lock = cache.client.lock(f"stt:rewrite:{campaign_id}", timeout=_LOCK_SECONDS)
+    with lock:
+        for batch in iter_campaign_items(campaign_id, batch_size=batch_size):
+            keys = [f"stt:result:{item.id}" for item in batch if item.status == "completed"]
+            for key, data in zip(keys, cache.get_many(keys), strict=True):
+                if data:
+                    cache.set(key, {**data, **update(data)})
+                    rewritten += 1
+            lock.reacquire()
+    return rewritten
+
+
+def main(
+    argv: list[str] | None,
+    description: str,
+    rewrite: Callable[[str, RedisCache, int], int],
+) -> None:
+    """Command line entry point running `rewrite(campaign_id, cache, batch_size)`."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("campaign_id")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    cache = create_cache()
+    if cache is None:
+        parser.error("Redis is unavailable")
+    init_db()
+    rewritten = rewrite(args.campaign_id, cache, args.batch_size)
+    logger.info("Rewrote %d results of campaign %s", rewritten, args.campaign_id)
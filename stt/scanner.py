@@ -0,0 +1,229 @@
+"""
+Flag configured terms in transcripts with a word-level Aho-Corasick automaton.
+
+Terms (single words or phrases) are compiled once per term list into a trie
+over normalized words with failure links, so a transcript is scanned in one
+pass whatever the number of terms. The configured scanner is kept until the
+settings or the terms file change. Hits carry the word timestamps of the
+matched span.
+
+    python -m stt.scanner <campaign_id>   # re-scan stored results of a campaign
+"""
+
+import string
+import threading
+from collections import deque
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from core.cache import RedisCache
+from core.config import settings
+from core.serialization import loads
+from stt import results
+from stt.models import TranscriptionResult, Word
+from stt.results import rewrite_campaign_results
+
+_STRIP = string.punctuation + "“”‘’…"
+
+
+@dataclass(frozen=True, slots=True)
+class Hit:
+    """One matched term with the timing of the words it spans."""
+
+    term: str
+    category: str
+    start_ms: int
+    end_ms: int
+    word_index: int
+    word_count: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def normalize(text: str) -> str:
+    """Case- and punctuation-insensitive form of a word."""
+    return text.strip(_STRIP).casefold()
+
+
+class KeywordScanner:
+    """Aho-Corasick automaton whose alphabet is normalized words."""
+
+    def __init__(self, terms: Iterable[tuple[str, str]]) -> None:
+        """Compile `(category, term)` pairs; terms are split into words."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[str, str, int]]] = [[]]
+        for category, term in terms:
+            tokens = [token for token in map(normalize, term.split()) if token]
+            if tokens:
+                self._add(tokens, category, term)
+        self._link()
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def _add(self, tokens: list[str], category: str, term: str) -> None:
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((category, term, len(tokens)))
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state also emits its suffix states' terms."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, words: Sequence[Word]) -> list[Hit]:
+        """All term occurrences in `words`, including overlapping ones, in end order."""
+        return self._scan(words, {})
+
+    def scan_batch(self, results: Iterable[TranscriptionResult]) -> list[list[Hit]]:
+        """
+        Hits of many transcripts. Transcripts share most of their vocabulary,
+        so each distinct word is normalized once per batch rather than per use.
+        """
+        tokens: dict[str, str] = {}
+        return [self._scan(result.words, tokens) for result in results]
+
+    def _scan(self, words: Sequence[Word], tokens: dict[str, str]) -> list[Hit]:
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: list[Hit] = []
+        positions: list[int] = []  # word index of every token seen
+        state = 0
+        for index, word in enumerate(words):
+            token = tokens.get(word.text)
+            if token is None:
+                token = tokens[word.text] = normalize(word.text)
+            if not token:
+                continue
+            positions.append(index)
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for category, term, length in out[state]:
+                first = positions[-length]
+                hits.append(
+                    Hit(
+                        term=term,
+                        category=category,
+                        start_ms=words[first].start_ms,
+                        end_ms=word.end_ms,
+                        word_index=first,
+                        word_count=index - first + 1,
+                    )
+                )
+        return hits
+
+
+@lru_cache(maxsize=4)
+def compile_scanner(terms: tuple[tuple[str, str], ...]) -> KeywordScanner:
+    """Scanner for a term list, compiled once per distinct list."""
+    return KeywordScanner(terms)
+
+
+def configured_terms() -> tuple[tuple[str, str], ...]:
+    """
+    `(category, term)` pairs from `stt_flag_terms` and the JSON file at
+    `stt_flag_terms_path`, both mapping category to a list of terms.
+    """
+    return _collect_terms(settings.stt_flag_terms, settings.stt_flag_terms_path)
+
+
+def _collect_terms(
+    inline: Mapping[str, list[str]], path: str, version: int | None = None
+) -> tuple[tuple[str, str], ...]:
+    mappings: list[Mapping[str, list[str]]] = [inline]
+    if path:
+        mappings.append(_load_terms_file(path, version))
+    pairs = {
+        (category, term)
+        for mapping in mappings
+        for category, terms in mapping.items()
+        for term in terms
+    }
+    return tuple(sorted(pairs))
+
+
+@lru_cache(maxsize=4)
+def _load_terms_file(path: str, version: int | None = None) -> dict[str, list[str]]:
+    """Parsed terms file; `version` (its mtime) makes an edited file load again."""
+    data: dict[str, list[str]] = loads(Path(path).read_bytes())
+    return data
+
+
+# The configured scanner with the settings identity it was compiled for
+_configured: tuple[tuple[Any, ...], KeywordScanner] | None = None
+_configured_lock = threading.Lock()
+
+
+def get_scanner() -> KeywordScanner:
+    """
+    Scanner for the configured terms.
+
+    It is recompiled only when `stt_flag_terms` is replaced or the terms file
+    changes, so looking it up per item costs a stat of the file, not a pass
+    over every term.
+    """
+    global _configured
+    inline, path = settings.stt_flag_terms, settings.stt_flag_terms_path
+    identity = (inline, path, Path(path).stat().st_mtime_ns if path else None)
+    configured = _configured
+    if configured is not None and configured[0] == identity:
+        return configured[1]
+    with _configured_lock:
+        if _configured is None or _configured[0] != identity:
+            _configured = identity, compile_scanner(_collect_terms(inline, path, identity[2]))
+        return _configured[1]
+
+
+def flag_result(scanner: KeywordScanner, result: TranscriptionResult) -> dict[str, Any]:
+    """Result dict with its `flags`, as stored under `stt:result:<item_id>`."""
+    return {**result.to_dict(), "flags": _flags(scanner, result.words)}
+
+
+def _flags(scanner: KeywordScanner, words: Sequence[Word]) -> list[dict[str, Any]]:
+    return [hit.to_dict() for hit in scanner.scan(words)]
+
+
+def rescan_campaign(
+    campaign_id: str, cache: RedisCache, scanner: KeywordScanner, batch_size: int = 500
+) -> int:
+    """Re-flag the stored results of a campaign's completed items; returns items scanned."""
+
+    def update(data: dict[str, Any]) -> dict[str, Any]:
+        return {"flags": _flags(scanner, TranscriptionResult.from_dict(data).words)}
+
+    return rewrite_campaign_results(campaign_id, cache, update, batch_size)
+
+
+def main(argv: list[str] | None = None) -> None:
+    results.main(
+        argv,
+        "Re-scan a campaign's transcripts for terms",
+        lambda campaign_id, cache, batch_size: rescan_campaign(
+            campaign_id, cache, get_scanner(), batch_size
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
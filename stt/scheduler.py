@@ -0,0 +1,188 @@
+"""Weighted fair sharing of the STT provider rate budget across campaigns."""
+
+import threading
+import time
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from core.cache import RedisCache
+
+DEFAULT_LANE = "interactive"
+
+# Grant the rate limit token to ARGV[1] (a "<campaign>|<id>" ticket) if its
+# campaign is at the head of the queue of campaigns with live tickets.
+# KEYS: token counter, passes (zset campaign -> pass), tickets (zset ticket ->
+# last poll ms), virtual time, queue (zset campaign -> pass, campaigns with
+# live tickets only), waiters (hash campaign -> live tickets).
+# ARGV: ticket, campaign, effective weight, token limit, window seconds,
+# now ms, ticket lease ms, state TTL seconds.
+# Returns 1 when granted, 0 when at the head but out of tokens and -1 when
+# another campaign is next. Only expired tickets are visited, each once.
+_GRANT_SCRIPT = """
+local now = tonumber(ARGV[6])
+local vtime = tonumber(redis.call('GET', KEYS[4]) or '0')
+local function leave(campaign)
+    if redis.call('HINCRBY', KEYS[6], campaign, -1) <= 0 then
+        redis.call('HDEL', KEYS[6], campaign)
+        redis.call('ZREM', KEYS[5], campaign)
+    end
+end
+local expired = redis.call(
+    'ZRANGEBYSCORE', KEYS[3], '-inf', now - tonumber(ARGV[7]), 'LIMIT', 0, 100)
+for _, ticket in ipairs(expired) do
+    redis.call('ZREM', KEYS[3], ticket)
+    leave(string.match(ticket, '^(.*)|[^|]*$'))
+end
+if redis.call('ZADD', KEYS[3], now, ARGV[1]) == 1 then
+    if redis.call('HINCRBY', KEYS[6], ARGV[2], 1) == 1 then
+        local pass = tonumber(redis.call('ZSCORE', KEYS[2], ARGV[2]) or vtime)
+        redis.call('ZADD', KEYS[5], math.max(pass, vtime), ARGV[2])
+    end
+    for _, key in ipairs({KEYS[3], KEYS[5], KEYS[6]}) do
+        redis.call('EXPIRE', key, ARGV[8])
+    end
+end
+local head = redis.call('ZRANGE', KEYS[5], 0, 0, 'WITHSCORES')
+if head[1] ~= ARGV[2] then
+    return -1
+end
+if tonumber(redis.call('GET', KEYS[1]) or '0') >= tonumber(ARGV[4]) then
+    return 0
+end
+if redis.call('INCR', KEYS[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+end
+local pass = tonumber(head[2])
+local next_pass = pass + 1 / tonumber(ARGV[3])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('SET', KEYS[4], tostring(pass), 'EX', ARGV[8])
+redis.call('ZADD', KEYS[2], next_pass, ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. tostring(pass))
+redis.call('EXPIRE', KEYS[2], ARGV[8])
+if redis.call('HINCRBY', KEYS[6], ARGV[2], -1) <= 0 then
+    redis.call('HDEL', KEYS[6], ARGV[2])
+    redis.call('ZREM', KEYS[5], ARGV[2])
+else
+    redis.call('ZADD', KEYS[5], next_pass, ARGV[2])
+end
+return 1
+"""
+
+# Withdraw ticket ARGV[1] of campaign ARGV[2] before it is granted.
+# KEYS: tickets, queue, waiters (as above).
+_WITHDRAW_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 1 then
+    if redis.call('HINCRBY', KEYS[3], ARGV[2], -1) <= 0 then
+        redis.call('HDEL', KEYS[3], ARGV[2])
+        redis.call('ZREM', KEYS[2], ARGV[2])
+    end
+end
+"""
+
+_GRANTED = 1
+_NOT_HEAD = -1
+
+# Fairness state outlives idle periods by this much, then starts afresh
+_STATE_TTL_SECONDS = 86_400
+
+
+@dataclass(frozen=True, slots=True)
+class Share:
+    """Who a transcription is for: its campaign, priority lane and campaign weight."""
+
+    campaign_id: str
+    lane: str = DEFAULT_LANE
+    weight: float = 1.0
+
+
+class FairScheduler:
+    """
+    Stride scheduler in front of the shared provider rate limit.
+
+    Every campaign with waiting requests is a flow. Each grant advances the
+    flow's pass value by 1 / (campaign weight * lane weight), and the next
+    rate limit token always goes to the flow with the lowest pass. Over time
+    each active campaign gets a budget share proportional to its effective
+    weight: a small interactive campaign is not stuck behind a large backfill,
+    and backfill still progresses. Campaigns that go idle do not bank credit.
+
+    Pass values, waiting tickets and the token counter live in Redis and are
+    checked and updated by one script, so fairness holds across every process
+    (Lambda invocations, server workers) sharing `token_key`. Campaigns with
+    waiting tickets are kept in a queue ordered by pass, so a poll costs the
+    same however many requests wait. A request at the head of the queue
+    re-polls every `poll_interval`; the others back off up to
+    `max_poll_interval`, which must stay well below `lease_seconds`: tickets
+    not polled for that long (crashed processes) stop counting. Derived keys
+    append to `token_key`, so a hash tag in it (e.g. `{assemblyai}`) keeps
+    them in one cluster slot.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        token_key: str,
+        limit: int,
+        window_seconds: int,
+        lane_weights: Mapping[str, float],
+        poll_interval: float = 0.05,
+        max_poll_interval: float = 0.25,
+        lease_seconds: float = 2.0,
+    ) -> None:
+        self._client = cache.client
+        self._grant = self._client.register_script(_GRANT_SCRIPT)
+        self._withdraw = self._client.register_script(_WITHDRAW_SCRIPT)
+        self._keys = [token_key] + [
+            f"{token_key}:{key}" for key in ("passes", "tickets", "vtime", "queue", "waiters")
+        ]
+        self._limit = limit
+        self._window_seconds = window_seconds
+        self._lane_weights = dict(lane_weights)
+        self._poll_interval = poll_interval
+        self._max_poll_interval = max_poll_interval
+        self._lease_ms = int(lease_seconds * 1000)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    def acquire(self, share: Share) -> None:
+        """Block until `share` is next in line and a rate limit token is available."""
+        ticket = f"{share.campaign_id}|{uuid.uuid4().hex}"
+        weight = share.weight * self._lane_weights.get(share.lane, 1.0)
+        with self._lock:
+            self._waiting += 1
+        delay = self._poll_interval
+        try:
+            while (result := self._try_grant(ticket, share.campaign_id, weight)) != _GRANTED:
+                if result == _NOT_HEAD:
+                    delay = min(delay * 2, self._max_poll_interval)
+                else:
+                    delay = self._poll_interval
+                time.sleep(delay)
+        except BaseException:
+            self._withdraw(
+                keys=[self._keys[i] for i in (2, 4, 5)], args=[ticket, share.campaign_id]
+            )
+            raise
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _try_grant(self, ticket: str, campaign_id: str, weight: float) -> int:
+        args = [
+            ticket,
+            campaign_id,
+            weight,
+            self._limit,
+            self._window_seconds,
+            int(time.time() * 1000),
+            self._lease_ms,
+            _STATE_TTL_SECONDS,
+        ]
+        return int(self._grant(keys=self._keys, args=args))
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests of this process currently waiting for a grant."""
+        with self._lock:
+            return self._waiting
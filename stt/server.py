@@ -1,18 +1,20 @@
 """HTTP server for STT service (local development)."""
 
-import json
 import logging
 
 from flask import Flask, Response, request
 
 from core.db import init_db
-from core.utils import json_response
+from core.serving import serve
+from core.utils import json_response, register_profiling, register_unit_of_work
 from stt.handler import handler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+register_unit_of_work(app)
+register_profiling(app)
 
 
 @app.before_request
@@ -30,11 +32,11 @@ def invoke() -> Response:
         return json_response({"error": "Request body required"}, 400)
 
     result = handler(data, None)
-    return json_response(json.loads(result["body"]), result["statusCode"])
+    return json_response(result["body"], result["statusCode"])
 
 
 def run() -> None:
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    serve(app, port=5001)
 
 
 if __name__ == "__main__":
@@ -1,24 +1,38 @@
 """AssemblyAI transcription service."""
 
 import logging
+import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
 
 import assemblyai as aai
+from assemblyai.types import TranscriptError as ProviderError
 
 from core.cache import RedisCache, cache_key, create_cache
 from core.config import settings
+from stt.budget import HELD_BY_IN_FLIGHT, Budget, BudgetLedger
+from stt.cache_keys import transcript_identity, transcript_namespace
+from stt.chunking import AudioChunk, AudioSplitter, ChunkingConfig, stitch
 from stt.models import Sentence, TranscriptionResult, Word
+from stt.scheduler import FairScheduler, Share
 
 logger = logging.getLogger(__name__)
 
 CACHE_PREFIX = "stt:transcript"
-RATE_LIMIT_KEY = "stt:ratelimit:assemblyai"
+CACHE_STATS_NAME = "stt:transcript"
+# The hash tag keeps the fair scheduler's state keys in the same cluster slot
+RATE_LIMIT_KEY = "stt:ratelimit:{assemblyai}"
 
 # Retry configuration
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2.0
 RETRY_BACKOFF_MULTIPLIER = 2.0
 
+# How often a reservation held up by in-flight work is tried again
+BUDGET_POLL_SECONDS = 1.0
+
 
 class TranscriptionError(Exception):
     """Transcription error with error code for categorization."""
@@ -29,31 +43,173 @@ class TranscriptionError(Exception):
 
 
 class TranscriptionService:
-    """Audio transcription using AssemblyAI with Redis caching."""
+    """
+    Audio transcription using AssemblyAI with Redis caching.
+
+    With a splitter, long audio is transcribed as overlapping chunks in
+    parallel (each under the rate limiter) and stitched into one result.
+    With a scheduler, rate limit capacity is shared fairly between campaigns
+    according to the `Share` passed to `transcribe`. With a `Budget`, each
+    provider call is admitted against the campaign's audio budget first.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        splitter: AudioSplitter | None = None,
+        chunking: ChunkingConfig | None = None,
+        scheduler: FairScheduler | None = None,
+    ) -> None:
         self._cache: RedisCache | None = create_cache()
+        self._splitter = splitter
+        self._chunking = chunking
+        self._scheduler = scheduler
+        self._ledger = BudgetLedger(self._cache) if self._cache else None
         aai.settings.api_key = settings.stt_assemblyai_api_key
+        if settings.stt_assemblyai_base_url:
+            aai.settings.base_url = settings.stt_assemblyai_base_url
+        aai.settings.polling_interval = settings.stt_assemblyai_polling_interval_seconds
 
-    def transcribe(self, audio_url: str) -> TranscriptionResult:
-        """Transcribe audio from URL with caching and retry logic."""
-        key = cache_key(CACHE_PREFIX, audio_url)
+    def transcribe(
+        self,
+        audio_url: str,
+        share: Share | None = None,
+        budget: Budget | None = None,
+        estimate_ms: int | None = None,
+    ) -> TranscriptionResult:
+        """
+        Transcribe audio from URL with caching and retry logic.
+
+        `estimate_ms` is the audio duration recorded for the item, if known;
+        it is what a budgeted transcription reserves.
+        """
+        key = cache_key(transcript_namespace(CACHE_PREFIX), transcript_identity(audio_url))
         if self._cache:
             cached = self._cache.get(key)
+            self._cache.record_hit(CACHE_STATS_NAME, cached is not None)
             if cached:
                 logger.info("Cache hit for %s", audio_url[:50])
                 return TranscriptionResult.from_dict(cached)
-            self._cache.wait_for_rate_limit(RATE_LIMIT_KEY, settings.stt_rate_limit_requests)
+
+        if self._splitter is not None:
+            result = self._transcribe_chunked(audio_url, self._splitter, share, budget, estimate_ms)
+        else:
+            result = self._transcribe_with_retry(audio_url, share, budget, estimate_ms)
+
+        if self._cache:
+            self._cache.set(key, result.to_dict())
+        return result
+
+    def _transcribe_chunked(
+        self,
+        audio_url: str,
+        splitter: AudioSplitter,
+        share: Share | None,
+        budget: Budget | None,
+        estimate_ms: int | None,
+    ) -> TranscriptionResult:
+        """
+        Transcribe overlapping chunks in parallel and stitch them together.
+
+        Audio that can't be split locally (ffmpeg missing, a URL it can't
+        read) is sent to the provider whole instead.
+        """
+        chunking = self._chunking or ChunkingConfig.from_settings()
+        with ExitStack() as stack:
+            try:
+                chunks = stack.enter_context(
+                    splitter.split(audio_url, chunking.chunk_ms, chunking.overlap_ms)
+                )
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.warning("Splitting %s failed, sending it whole: %s", audio_url[:50], e)
+                return self._transcribe_with_retry(audio_url, share, budget, estimate_ms)
+
+            if len(chunks) == 1:
+                return self._transcribe_with_retry(audio_url, share, budget, chunks[0].duration_ms)
+
+            logger.info("Transcribing %s as %d chunks", audio_url[:50], len(chunks))
+            with ThreadPoolExecutor(max_workers=chunking.max_workers) as pool:
+                results = list(
+                    pool.map(partial(self._transcribe_chunk, share=share, budget=budget), chunks)
+                )
+
+        if not any(r.text for r in results):
+            raise TranscriptionError("No speech detected in audio", "NO_SPEECH_DETECTED")
+        return stitch(chunks, results, audio_url)
+
+    def _transcribe_chunk(
+        self, chunk: AudioChunk, share: Share | None, budget: Budget | None
+    ) -> TranscriptionResult:
+        """Transcribe one chunk; silence in a chunk is not an error for the whole file."""
+        try:
+            return self._transcribe_with_retry(chunk.source, share, budget, chunk.duration_ms)
+        except TranscriptionError as e:
+            if e.error_code != "NO_SPEECH_DETECTED":
+                raise
+            return TranscriptionResult(
+                text="",
+                words=(),
+                sentences=(),
+                language_code="",
+                confidence=0.0,
+                duration_ms=chunk.duration_ms,
+                audio_url=chunk.source,
+            )
+
+    def _transcribe_with_retry(
+        self,
+        audio_url: str,
+        share: Share | None,
+        budget: Budget | None = None,
+        estimate_ms: int | None = None,
+    ) -> TranscriptionResult:
+        """Reserve budget, then transcribe under the rate limiter."""
+        if budget is None or self._ledger is None:
+            return self._transcribe_within_rate_limit(audio_url, share)
+
+        if estimate_ms is None:
+            estimate_ms = int(settings.stt_budget_reserve_seconds * 1000)
+        reserved_ms = self._reserve(self._ledger, budget, estimate_ms)
+        if not reserved_ms:
+            raise TranscriptionError(
+                f"Campaign {budget.campaign_id} audio budget exhausted", "BUDGET_EXCEEDED"
+            )
+
+        used_ms = 0
+        try:
+            result = self._transcribe_within_rate_limit(audio_url, share)
+            used_ms = result.duration_ms
+            return result
+        finally:
+            self._ledger.settle(budget, reserved_ms, used_ms)
+
+    def _reserve(self, ledger: BudgetLedger, budget: Budget, estimate_ms: int) -> int:
+        """
+        Reserve `estimate_ms`, waiting up to `stt_budget_wait_seconds` while
+        in-flight transcriptions hold the budget: most settle at or below
+        their reservation and free it again.
+        """
+        deadline = time.monotonic() + settings.stt_budget_wait_seconds
+        while (reserved_ms := ledger.reserve(budget, estimate_ms)) == HELD_BY_IN_FLIGHT:
+            if time.monotonic() >= deadline:
+                raise TranscriptionError(
+                    f"Campaign {budget.campaign_id} audio budget is held by in-flight work",
+                    "BUDGET_RESERVED",
+                )
+            time.sleep(BUDGET_POLL_SECONDS)
+        return reserved_ms
+
+    def _transcribe_within_rate_limit(
+        self, audio_url: str, share: Share | None
+    ) -> TranscriptionResult:
+        """Wait for rate limit capacity, then transcribe with retries on transient errors."""
+        self._wait_for_capacity(share)
 
         last_error: TranscriptionError | None = None
         delay = RETRY_DELAY_SECONDS
 
         for attempt in range(MAX_RETRIES):
             try:
-                result = self._do_transcribe(audio_url)
-                if self._cache:
-                    self._cache.set(key, result.to_dict())
-                return result
+                return self._do_transcribe(audio_url)
 
             except TranscriptionError as e:
                 if e.error_code in ("RATE_LIMITED", "TIMEOUT"):
@@ -66,10 +222,16 @@ class TranscriptionService:
 
         raise last_error or TranscriptionError("Max retries exceeded")
 
+    def _wait_for_capacity(self, share: Share | None) -> None:
+        if self._scheduler is not None:
+            self._scheduler.acquire(share or Share(campaign_id=""))
+        elif self._cache:
+            self._cache.wait_for_rate_limit(RATE_LIMIT_KEY, settings.stt_rate_limit_requests)
+
     def _do_transcribe(self, audio_url: str) -> TranscriptionResult:
         """Execute single transcription attempt."""
         config = aai.TranscriptionConfig(
-            speech_models=["universal-2"],
+            speech_models=list(settings.stt_speech_models),
             language_code=settings.stt_language_code,
             speaker_labels=settings.stt_speaker_labels,
             punctuate=settings.stt_punctuate,
@@ -77,7 +239,12 @@ class TranscriptionService:
         )
 
         transcriber = aai.Transcriber(config=config)
-        transcript = transcriber.transcribe(audio_url)
+        try:
+            transcript = transcriber.transcribe(audio_url)
+        except ProviderError as e:
+            if e.status_code == 429:
+                raise TranscriptionError(str(e), "RATE_LIMITED") from e
+            raise
 
         if transcript.status == aai.TranscriptStatus.error:
             error_msg = transcript.error or "Unknown error"
@@ -1,7 +1,11 @@
 """Shared test fixtures."""
 
+from unittest.mock import patch
+
 import pytest
 
+import core.db as db
+
 
 @pytest.fixture
 def sample_transcription_dict() -> dict:
@@ -14,3 +18,34 @@ def sample_transcription_dict() -> dict:
         "duration_ms": 1000,
         "audio_url": "https://example.com/audio.mp3",
     }
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    with patch("core.db.settings") as mock_settings:
+        mock_settings.database_url = f"sqlite:///{tmp_path / 'test.db'}"
+        mock_settings.db_pool_class = "queue"
+        mock_settings.db_pool_size = 2
+        mock_settings.db_max_overflow = 0
+        mock_settings.db_pool_timeout_seconds = 5
+        mock_settings.db_pool_recycle_seconds = 1800
+        mock_settings.db_pool_pre_ping = False
+        mock_settings.database_replica_urls = []
+        mock_settings.db_replica_read_your_writes_seconds = 5
+
+        db.dispose_engines()
+        db.init_db()
+        yield mock_settings
+        db.dispose_engines()
+
+
+@pytest.fixture
+def fake_redis():
+    import fakeredis
+
+    from core.cache import RedisCache
+
+    cache = RedisCache()
+    cache._client = fakeredis.FakeRedis(decode_responses=True)
+    yield cache
+    cache._client = None
@@ -0,0 +1,181 @@
+"""Tests for the Flask API."""
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import core.db as db
+from core.api import app
+
+
+@pytest.fixture
+def client(sqlite_db):
+    with patch("core.api.create_cache") as mock_create_cache:
+        mock_create_cache.return_value = None
+        app.config["TESTING"] = True
+        with app.test_client() as client:
+            yield client
+
+
+@pytest.fixture
+def campaign(sqlite_db):
+    campaign = db.create_campaign("c")
+    for n in range(5):
+        db.create_item(campaign.id, f"https://example.com/{n}")
+    return campaign
+
+
+class TestGetCampaign:
+    def test_not_found(self, client):
+        assert client.get("/campaigns/missing").status_code == 404
+
+    def test_all_items(self, client, campaign):
+        body = client.get(f"/campaigns/{campaign.id}").get_json()
+
+        assert len(body["items"]) == 5
+        assert "next_after" not in body
+
+    def test_keyset_pagination(self, client, campaign):
+        seen = []
+        after = None
+        while True:
+            query = f"?limit=2&after={after}" if after else "?limit=2"
+            body = client.get(f"/campaigns/{campaign.id}{query}").get_json()
+            seen.extend(item["id"] for item in body["items"])
+            after = body["next_after"]
+            if after is None:
+                break
+
+        assert seen == sorted(seen)
+        assert len(seen) == 5
+
+    def test_invalid_limit(self, client, campaign):
+        assert client.get(f"/campaigns/{campaign.id}?limit=0").status_code == 400
+
+    def test_ndjson_stream(self, client, campaign):
+        response = client.get(f"/campaigns/{campaign.id}?format=ndjson")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert response.mimetype == "application/x-ndjson"
+        assert lines[0]["id"] == campaign.id
+        assert [item["campaign_id"] for item in lines[1:]] == [campaign.id] * 5
+
+    def test_results_attached_in_one_round_trip(self, client, campaign):
+        items = db.get_campaign_items(campaign.id)
+        db.update_item_status(items[0].id, "completed")
+        cache = MagicMock()
+        cache.get_or_load.side_effect = lambda key, loader: loader()
+        cache.get_many.return_value = [{"text": "Hello"}]
+
+        with patch("core.api.create_cache", return_value=cache):
+            body = client.get(f"/campaigns/{campaign.id}").get_json()
+
+        cache.get_many.assert_called_once_with([f"stt:result:{items[0].id}"])
+        assert body["items"][0]["result"] == {"text": "Hello"}
+
+
+class TestCreateCampaign:
+    def test_lane_and_weight(self, client):
+        body = client.post(
+            "/campaigns", json={"name": "c", "lane": "backfill", "weight": 2}
+        ).get_json()
+
+        assert (body["lane"], body["weight"]) == ("backfill", 2.0)
+        campaign = db.get_campaign(body["campaign_id"])
+        assert (campaign.lane, campaign.weight) == ("backfill", 2.0)
+
+    @pytest.mark.parametrize("payload", [{"lane": "bulk"}, {"weight": 0}, {"weight": "high"}])
+    def test_invalid_scheduling(self, client, payload):
+        assert client.post("/campaigns", json={"name": "c", **payload}).status_code == 400
+
+    def test_item_audio_duration_is_stored(self, client):
+        item = {"source_url": "https://example.com/a", "audio_duration_ms": 95_000}
+
+        body = client.post("/campaigns", json={"name": "c", "items": [item]}).get_json()
+
+        assert db.get_item(body["items"][0]["id"]).audio_duration_ms == 95_000
+
+    @pytest.mark.parametrize("duration", [0, 1.5, "95s", True])
+    def test_invalid_audio_duration(self, client, duration):
+        payload = {"name": "c", "items": [{"audio_duration_ms": duration}]}
+
+        assert client.post("/campaigns", json=payload).status_code == 400
+
+    def test_write_keeps_client_reads_on_primary(self, client, campaign):
+        response = client.post("/campaigns", json={"name": "c"})
+
+        assert "db_read_primary_until=" in response.headers["Set-Cookie"]
+        with patch("core.utils.begin_unit_of_work", wraps=db.begin_unit_of_work) as begin:
+            read = client.get(f"/campaigns/{campaign.id}")
+            fresh = app.test_client().get(f"/campaigns/{campaign.id}")
+
+        assert "Set-Cookie" not in read.headers
+        assert begin.call_args_list[0].kwargs["primary_until"] > time.time()
+        assert begin.call_args_list[1].kwargs["primary_until"] == 0.0
+        assert fresh.status_code == 200
+
+
+class TestRetryCampaign:
+    def test_not_found(self, client):
+        assert client.post("/campaigns/missing/retry").status_code == 404
+
+    @patch("core.api.invoke_stt_campaign")
+    def test_requeues_retryable_failures_once(self, mock_invoke, client, campaign):
+        items = db.get_campaign_items(campaign.id)
+        errors = ["RATE_LIMITED", "TIMEOUT", "NO_SPEECH_DETECTED"]
+        for item, error in zip(items[:3], errors, strict=True):
+            db.create_failure(item.id, campaign.id, "stt", error, "")
+            db.update_item_status(item.id, "failed")
+        expected = sorted(item.id for item in items[:2])
+        mock_invoke.return_value = [(expected, {"statusCode": 202})]
+
+        body = client.post(f"/campaigns/{campaign.id}/retry").get_json()
+
+        assert body["requeued"] == 2
+        assert body["item_ids"] == expected
+        assert body["invocations"] == 1
+        mock_invoke.assert_called_once_with(campaign.id, expected)
+        assert client.post(f"/campaigns/{campaign.id}/retry").get_json()["requeued"] == 0
+
+    @patch("core.api.invoke_stt_campaign")
+    def test_failed_invocation_returns_items_to_failed(self, mock_invoke, client, campaign):
+        items = db.get_campaign_items(campaign.id)
+        for item in items[:2]:
+            db.create_failure(item.id, campaign.id, "stt", "TIMEOUT", "")
+            db.update_item_status(item.id, "failed")
+        first, second = sorted(item.id for item in items[:2])
+        mock_invoke.return_value = [
+            ([first], {"statusCode": 202}),
+            ([second], {"statusCode": 503, "body": {"error": "SERVICE_UNAVAILABLE"}}),
+        ]
+
+        response = client.post(f"/campaigns/{campaign.id}/retry")
+
+        assert response.status_code == 502
+        body = response.get_json()
+        assert body["item_ids"] == [first]
+        assert body["failed_item_ids"] == [second]
+        assert body["invocations"] == 1
+        assert db.get_item(second).status == "failed"
+        assert db.get_campaign_summary(campaign.id)["items_failed"] == 1
+        # Still retryable
+        mock_invoke.return_value = [([second], {"statusCode": 202})]
+        assert client.post(f"/campaigns/{campaign.id}/retry").get_json()["item_ids"] == [second]
+
+
+class TestCampaignSummary:
+    def test_not_found(self, client):
+        assert client.get("/campaigns/missing/summary").status_code == 404
+
+    def test_summary(self, client, campaign):
+        item = db.get_campaign_items(campaign.id)[0]
+        db.complete_item(item.id, duration_ms=1000, word_count=3, confidence=0.5)
+
+        body = client.get(f"/campaigns/{campaign.id}/summary").get_json()
+
+        assert body["items_total"] == 5
+        assert body["items_completed"] == 1
+        assert body["mean_confidence"] == 0.5
+        assert body["failures_by_error"] == {}
@@ -0,0 +1,132 @@
+"""Tests for Redis cache."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+from redis.crc import key_slot
+
+import core.cache as cache_module
+from core.cache import RedisCache, campaign_key, connect, ttl_for
+
+
+@pytest.fixture
+def ttl_settings():
+    with patch("core.cache.settings") as mock_settings:
+        mock_settings.cache_ttl_seconds = 3600
+        mock_settings.cache_ttl_policies = {"stt:": 100, "stt:transcript": 10_000}
+        mock_settings.cache_ttl_jitter_ratio = 0.0
+        mock_settings.cache_fresh_ttl_seconds = 30
+        mock_settings.cache_refresh_workers = 1
+        yield mock_settings
+
+
+def _drain_refreshes() -> None:
+    if cache_module._refresh_pool is not None:
+        cache_module._refresh_pool.shutdown(wait=True)
+        cache_module._refresh_pool = None
+
+
+class TestTtlPolicies:
+    def test_longest_prefix_wins(self, ttl_settings):
+        assert ttl_for("stt:transcript:abc") == 10_000
+        assert ttl_for("stt:result:abc") == 100
+        assert ttl_for("other") == 3600
+
+    def test_jitter_bounds(self, ttl_settings):
+        ttl_settings.cache_ttl_jitter_ratio = 0.1
+        ttls = {ttl_for("other") for _ in range(200)}
+
+        assert min(ttls) >= 3240
+        assert max(ttls) <= 3960
+        assert len(ttls) > 1
+
+    def test_set_applies_policy(self, ttl_settings, fake_redis):
+        fake_redis.set("stt:transcript:abc", {"text": "hi"})
+
+        assert 9_990 < fake_redis.client.ttl("stt:transcript:abc") <= 10_000
+
+
+class TestStaleWhileRevalidate:
+    def test_miss_loads_synchronously(self, ttl_settings, fake_redis):
+        loader = MagicMock(return_value={"v": 1})
+
+        assert fake_redis.get_or_load("campaign:1", loader) == {"v": 1}
+        assert fake_redis.get_or_load("campaign:1", loader) == {"v": 1}
+        loader.assert_called_once()
+
+    def test_stale_value_returned_and_refreshed(self, ttl_settings, fake_redis):
+        fake_redis.get_or_load("campaign:1", lambda: {"v": 1})
+        fake_redis.client.delete("campaign:1:fresh")
+
+        assert fake_redis.get_or_load("campaign:1", lambda: {"v": 2}) == {"v": 1}
+        _drain_refreshes()
+
+        assert fake_redis.get("campaign:1") == {"v": 2}
+        assert fake_redis.client.exists("campaign:1:fresh")
+        assert not fake_redis.client.exists("campaign:1:refresh")
+
+    def test_single_refresh_in_flight(self, ttl_settings, fake_redis):
+        fake_redis.get_or_load("campaign:1", lambda: {"v": 1})
+        fake_redis.client.delete("campaign:1:fresh")
+        fake_redis.client.set("campaign:1:refresh", "1")
+        loader = MagicMock(return_value={"v": 2})
+
+        fake_redis.get_or_load("campaign:1", loader)
+        _drain_refreshes()
+
+        loader.assert_not_called()
+
+    def test_deleted_source_evicts(self, ttl_settings, fake_redis):
+        fake_redis.get_or_load("campaign:1", lambda: {"v": 1})
+        fake_redis.client.delete("campaign:1:fresh")
+
+        fake_redis.get_or_load("campaign:1", lambda: None)
+        _drain_refreshes()
+
+        assert fake_redis.get("campaign:1") is None
+
+
+class TestTopology:
+    def test_campaign_keys_share_a_slot(self):
+        key = campaign_key("abc")
+
+        assert key == "campaign:{abc}"
+        assert campaign_key("abc", "stats") == "campaign:{abc}:stats"
+        assert key_slot(key.encode()) == key_slot(f"{key}{cache_module.FRESH_SUFFIX}".encode())
+
+    def test_cluster_reads_split_by_slot(self, ttl_settings, monkeypatch):
+        client = MagicMock(spec=redis.RedisCluster)
+        client.mget_nonatomic.return_value = ['{"v": 1}', None]
+        cache = RedisCache()
+        monkeypatch.setattr(cache, "_client", client)
+
+        assert cache.get_many(["a", "b"]) == [{"v": 1}, None]
+        client.mget_nonatomic.assert_called_once_with(["a", "b"])
+        client.mget.assert_not_called()
+
+    def test_cluster_mode(self):
+        with (
+            patch("core.cache.settings") as mock_settings,
+            patch("core.cache.redis.RedisCluster.from_url") as mock_from_url,
+        ):
+            mock_settings.redis_mode = "cluster"
+            mock_settings.redis_url = "redis://node:7000/0"
+
+            assert connect() is mock_from_url.return_value
+            mock_from_url.assert_called_once_with("redis://node:7000/0", decode_responses=True)
+
+    def test_sentinel_mode(self):
+        with (
+            patch("core.cache.settings") as mock_settings,
+            patch("core.cache.Sentinel") as mock_sentinel,
+        ):
+            mock_settings.redis_mode = "sentinel"
+            mock_settings.redis_sentinels = ["sentinel-1:26379", "sentinel-2:26379"]
+            mock_settings.redis_sentinel_service = "mymaster"
+
+            assert connect() is mock_sentinel.return_value.master_for.return_value
+            mock_sentinel.assert_called_once_with(
+                [("sentinel-1", 26379), ("sentinel-2", 26379)], decode_responses=True
+            )
+            mock_sentinel.return_value.master_for.assert_called_once_with("mymaster")
@@ -0,0 +1,260 @@
+"""Tests for database client."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import core.db as db
+from core.models import RETRYABLE_ERRORS, Base, Campaign
+from stt.handler import handler
+
+
+def _checkouts() -> int:
+    return db.pool_stats()["checkouts"]
+
+
+class TestUnitOfWork:
+    def test_without_unit_of_work_each_call_checks_out(self, sqlite_db):
+        campaign = db.create_campaign("c")
+        before = _checkouts()
+
+        db.get_campaign(campaign.id)
+        db.update_campaign_status(campaign.id, "running")
+        db.get_campaign_items(campaign.id)
+
+        assert _checkouts() - before == 3
+
+    def test_unit_of_work_shares_one_connection(self, sqlite_db):
+        before = _checkouts()
+
+        with db.unit_of_work():
+            campaign = db.create_campaign("c")
+            item = db.create_item(campaign.id, "https://example.com/v")
+            db.update_item_status(item.id, "processing")
+            assert db.get_item(item.id).status == "processing"
+
+        assert _checkouts() - before == 1
+        assert db.get_item(item.id).status == "processing"
+
+    def test_nested_unit_of_work_is_reused(self, sqlite_db):
+        with db.unit_of_work() as outer, db.unit_of_work() as inner:
+            assert inner is outer
+
+    def test_unit_of_work_without_queries_is_free(self, sqlite_db):
+        before = _checkouts()
+
+        with db.unit_of_work():
+            pass
+
+        assert _checkouts() == before
+
+    def test_rollback_on_error(self, sqlite_db):
+        campaign = db.create_campaign("c")
+
+        with pytest.raises(RuntimeError), db.unit_of_work() as uow:
+            uow.session.get(db.Campaign, campaign.id).status = "dirty"
+            raise RuntimeError
+
+        assert db.get_campaign(campaign.id).status == "pending"
+
+    def test_null_pool(self, sqlite_db):
+        sqlite_db.db_pool_class = "null"
+        db._engine = None
+
+        assert db.get_engine().pool.__class__.__name__ == "NullPool"
+
+    def test_connections_returned_when_commit_fails(self, sqlite_db):
+        campaign = db.create_campaign("c")
+
+        with pytest.raises(RuntimeError), db.unit_of_work() as uow:
+            db.get_campaign(campaign.id)
+            uow.session.commit = MagicMock(side_effect=RuntimeError)
+
+        assert db.get_engine().pool.checkedout() == 0
+
+    def test_failed_statement_rolled_back(self, sqlite_db):
+        campaign = db.create_campaign("c")
+
+        with db.unit_of_work():
+            with pytest.raises(IntegrityError):
+                db.create_failure("item", campaign.id, "stt", None, "")
+            db.rollback_session()
+            db.update_campaign_status(campaign.id, "running")
+
+        assert db.get_campaign(campaign.id).status == "running"
+
+    @patch("stt.handler.create_cache")
+    @patch("stt.handler.get_service")
+    def test_handler_releases_connection_during_transcription(
+        self, mock_get_service, mock_cache, sqlite_db
+    ):
+        campaign = db.create_campaign("c")
+        item = db.create_item(campaign.id, "https://example.com/v", audio_url="https://a.mp3")
+        mock_result = MagicMock(duration_ms=1000, confidence=0.9)
+        mock_result.to_dict.return_value = {"text": "Hello"}
+        checked_out = []
+
+        def transcribe(*_):
+            checked_out.append(db.get_engine().pool.checkedout())
+            return mock_result
+
+        mock_get_service.return_value.transcribe.side_effect = transcribe
+        mock_cache.return_value = None
+        before = _checkouts()
+
+        result = handler({"campaign_id": campaign.id, "item_id": item.id}, None)
+
+        assert result["statusCode"] == 200
+        assert checked_out == [0]
+        assert _checkouts() - before == 2
+        assert db.get_item(item.id).status == "completed"
+
+
+class TestRetryableItems:
+    @pytest.fixture
+    def items(self, sqlite_db):
+        campaign = db.create_campaign("c")
+        items = {}
+        for name, status, errors in [
+            ("rate_limited", "failed", ["RATE_LIMITED"]),
+            ("timeout_then_no_speech", "failed", ["TIMEOUT", "NO_SPEECH_DETECTED"]),
+            ("no_speech", "failed", ["NO_SPEECH_DETECTED"]),
+            ("recovered", "completed", ["INTERNAL_ERROR"]),
+        ]:
+            item = db.create_item(campaign.id, f"https://example.com/{name}")
+            for error in errors:
+                db.create_failure(item.id, campaign.id, "stt", error, "")
+            db.update_item_status(item.id, status)
+            items[name] = item.id
+        return campaign.id, items
+
+    def test_only_retryable_failures(self, items):
+        campaign_id, ids = items
+
+        assert db.get_retryable_item_ids(campaign_id, RETRYABLE_ERRORS, 5) == [ids["rate_limited"]]
+
+    def test_attempt_cap(self, items):
+        campaign_id, ids = items
+        db.start_item_attempt(ids["rate_limited"])
+        db.start_item_attempt(ids["rate_limited"])
+        db.update_item_status(ids["rate_limited"], "failed")
+
+        assert db.get_item(ids["rate_limited"]).attempts == 2
+        assert db.get_retryable_item_ids(campaign_id, RETRYABLE_ERRORS, 2) == []
+
+    def test_requeue_claims_once(self, items):
+        _, ids = items
+        candidates = [ids["rate_limited"], ids["recovered"]]
+
+        assert db.requeue_failed_items(candidates) == [ids["rate_limited"]]
+        assert db.requeue_failed_items(candidates) == []
+        assert db.get_item(ids["rate_limited"]).status == "pending"
+
+
+class TestCampaignStats:
+    def test_counters_follow_status_transitions(self, sqlite_db):
+        campaign = db.create_campaign("c")
+        first, second, third = (
+            db.create_item(campaign.id, f"https://example.com/{n}").id for n in range(3)
+        )
+
+        db.start_item_attempt(first)
+        db.complete_item(first, duration_ms=60_000, word_count=120, confidence=0.9, flag_count=2)
+        db.start_item_attempt(second)
+        db.complete_item(second, duration_ms=30_000, word_count=40, confidence=0.7)
+        db.create_failure(third, campaign.id, "stt", "TIMEOUT", "")
+        db.update_item_status(third, "failed")
+        db.create_failure(third, campaign.id, "stt", "TIMEOUT", "")
+        db.update_item_status(third, "failed")
+        db.start_item_attempt(second)  # reprocessing leaves the completed count
+
+        summary = db.get_campaign_summary(campaign.id)
+
+        assert summary["items_total"] == 3
+        assert summary["items_completed"] == 1
+        assert summary["items_failed"] == 1
+        assert summary["transcriptions"] == 2
+        assert summary["audio_ms"] == 90_000
+        assert summary["word_count"] == 160
+        assert summary["mean_confidence"] == pytest.approx(0.8)
+        assert summary["flag_count"] == 2
+        assert summary["failures_by_error"] == {"TIMEOUT": 2}
+
+    def test_redelivered_completion_counts_once(self, sqlite_db):
+        campaign = db.create_campaign("c")
+        item = db.create_item(campaign.id, "https://example.com/a")
+
+        for _ in range(2):
+            db.complete_item(item.id, duration_ms=60_000, word_count=100, confidence=0.9)
+
+        summary = db.get_campaign_summary(campaign.id)
+        assert summary["items_completed"] == 1
+        assert summary["transcriptions"] == 1
+        assert summary["audio_ms"] == 60_000
+        assert summary["word_count"] == 100
+
+    def test_requeue_leaves_failed_count(self, sqlite_db):
+        campaign = db.create_campaign("c")
+        item = db.create_item(campaign.id, "https://example.com/a")
+        db.update_item_status(item.id, "failed")
+
+        db.requeue_failed_items([item.id])
+
+        assert db.get_campaign_summary(campaign.id)["items_failed"] == 0
+
+    def test_missing_campaign(self, sqlite_db):
+        assert db.get_campaign_summary("missing") is None
+
+
+class TestReadReplicas:
+    @pytest.fixture
+    def replica(self, sqlite_db, tmp_path):
+        sqlite_db.database_replica_urls = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        sqlite_db.db_replica_read_your_writes_seconds = 0
+        Base.metadata.create_all(db.get_replica_engine())
+        with Session(db.get_replica_engine()) as session:
+            session.add(Campaign(id="replica-only", name="r"))
+            session.commit()
+        return sqlite_db
+
+    def test_reads_go_to_replica(self, replica):
+        assert db.get_campaign("replica-only").name == "r"
+
+    def test_missing_rows_fall_back_to_primary(self, replica):
+        campaign = db.create_campaign("c")
+
+        assert db.get_campaign(campaign.id).name == "c"
+
+    def test_client_recent_write_reads_primary(self, replica):
+        token = db.begin_unit_of_work(primary_until=time.time() + 60)
+        try:
+            assert db.get_campaign("replica-only") is None
+        finally:
+            db.end_unit_of_work(token)
+
+    def test_write_does_not_pin_other_units_of_work(self, replica):
+        with db.unit_of_work():
+            db.create_campaign("c")
+
+        with db.unit_of_work():
+            assert db.get_campaign("replica-only") is not None
+
+    def test_unit_of_work_reads_its_writes(self, replica):
+        with db.unit_of_work():
+            assert db.get_campaign("replica-only") is not None
+            db.create_campaign("c")
+            assert db.get_campaign("replica-only") is None
+
+    def test_unit_of_work_without_replicas(self, replica):
+        with db.unit_of_work(use_replicas=False):
+            assert db.get_campaign("replica-only") is None
+
+    def test_nested_unit_of_work_without_replicas(self, replica):
+        # e.g. the STT handler inside the STT server's request unit of work
+        with db.unit_of_work():
+            with db.unit_of_work(use_replicas=False):
+                assert db.get_campaign("replica-only") is None
+            assert db.get_campaign("replica-only") is not None
@@ -0,0 +1,99 @@
+"""Tests for campaign export."""
+
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import core.db as db
+from core.api import app
+from core.export import iter_rows, main, stream
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def campaign(sqlite_db, sample_transcription_dict):
+    campaign = db.create_campaign("c")
+    items = [db.create_item(campaign.id, f"https://example.com/{n}") for n in range(3)]
+    db.update_item_status(items[0].id, "completed")
+    results = {f"stt:result:{items[0].id}": sample_transcription_dict}
+    cache = MagicMock()
+    cache.get_or_load.side_effect = lambda key, loader: loader()
+    cache.get_many.side_effect = lambda keys: [results.get(key) for key in keys]
+    return campaign, items, cache
+
+
+@pytest.fixture
+def client(campaign):
+    _, _, cache = campaign
+    with patch("core.api.create_cache", return_value=cache):
+        app.config["TESTING"] = True
+        with app.test_client() as client:
+            yield client
+
+
+def test_rows_stream_in_db_batches(campaign, sample_transcription_dict):
+    campaign, items, cache = campaign
+
+    batches = list(iter_rows(campaign.id, "words", cache, batch_size=2))
+
+    assert len(cache.get_many.call_args_list) == 2
+    words = [row for rows in batches for row in rows]
+    assert len(words) == len(sample_transcription_dict["words"])
+    assert words[0] == {"item_id": items[0].id, "index": 0, **sample_transcription_dict["words"][0]}
+
+
+def test_parquet_row_group_per_batch(campaign):
+    campaign, items, cache = campaign
+
+    data = b"".join(
+        stream(iter_rows(campaign.id, "items", cache, batch_size=2), "items", "parquet")
+    )
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.column("id").to_pylist() == sorted(item.id for item in items)
+    assert table.column("text").to_pylist().count(None) == 2
+
+
+class TestExportEndpoint:
+    def test_arrow_sentences(self, client, campaign, sample_transcription_dict):
+        campaign, _, _ = campaign
+
+        response = client.get(f"/campaigns/{campaign.id}/export?table=sentences&format=arrow")
+
+        assert response.mimetype == "application/vnd.apache.arrow.stream"
+        assert "attachment" in response.headers["Content-Disposition"]
+        table = pa.ipc.open_stream(response.data).read_all()
+        texts = [s["text"] for s in sample_transcription_dict["sentences"]]
+        assert table.column("text").to_pylist() == texts
+
+    def test_ndjson(self, client, campaign):
+        campaign, items, _ = campaign
+
+        response = client.get(f"/campaigns/{campaign.id}/export?format=ndjson")
+
+        rows = [json.loads(line) for line in response.data.splitlines()]
+        assert [row["id"] for row in rows] == sorted(item.id for item in items)
+
+    def test_invalid_table(self, client, campaign):
+        campaign, _, _ = campaign
+        response = client.get(f"/campaigns/{campaign.id}/export?table=speakers")
+        assert response.status_code == 400
+
+    def test_not_found(self, client):
+        assert client.get("/campaigns/missing/export").status_code == 404
+
+
+def test_cli_writes_file(campaign, tmp_path):
+    campaign, _, cache = campaign
+    out = tmp_path / "words.parquet"
+
+    with patch("core.export.create_cache", return_value=cache):
+        main([campaign.id, "--table", "words", "--out", str(out)])
+
+    assert pq.read_table(out).num_rows > 0
@@ -0,0 +1,99 @@
+"""Tests for STT invocation."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from core import invoker
+
+ASL_PATH = Path(__file__).parents[2] / "statemachine" / "stt_campaign.asl.json"
+FUNCTION_ARN = "arn:aws:lambda:us-east-1:123456789012:function:stt"
+
+
+@pytest.fixture
+def step_settings(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws(), patch("core.invoker.settings") as mock_settings:
+        invoker._stepfunctions_client.cache_clear()
+        definition = ASL_PATH.read_text()
+        definition = definition.replace("${STTBatchFunctionArn}", FUNCTION_ARN)
+        definition = definition.replace("${MaxConcurrency}", "10")
+        state_machine = boto3.client("stepfunctions").create_state_machine(
+            name="stt-campaign",
+            definition=definition,
+            roleArn="arn:aws:iam::123456789012:role/stt",
+        )
+        mock_settings.invoke_mode = "step"
+        mock_settings.stt_campaign_state_machine_arn = state_machine["stateMachineArn"]
+        mock_settings.stt_step_batch_size = 25
+        mock_settings.stt_step_max_items_per_execution = 2000
+        mock_settings.stt_stepfunctions_endpoint_url = ""
+        yield mock_settings
+        invoker._stepfunctions_client.cache_clear()
+
+
+def _executions(state_machine_arn: str) -> list[dict]:
+    client = boto3.client("stepfunctions")
+    executions = client.list_executions(stateMachineArn=state_machine_arn)["executions"]
+    return [
+        json.loads(client.describe_execution(executionArn=e["executionArn"])["input"])
+        for e in executions
+    ]
+
+
+class TestInvokeCampaign:
+    def test_asl_definition_is_valid_json(self):
+        definition = ASL_PATH.read_text().replace("${MaxConcurrency}", "10")
+        assert json.loads(definition)["States"]["TranscribeItems"]["Type"] == "Map"
+
+    def test_single_execution_for_campaign(self, step_settings):
+        item_ids = [f"item-{n}" for n in range(100)]
+
+        responses = invoker.invoke_stt_campaign("campaign-1", item_ids)
+
+        assert [(ids, r["statusCode"]) for ids, r in responses] == [(item_ids, 202)]
+        (execution,) = _executions(step_settings.stt_campaign_state_machine_arn)
+        assert execution["batch_size"] == 25
+        assert [i["item_id"] for i in execution["items"]] == item_ids
+
+    def test_large_campaign_is_chunked(self, step_settings):
+        step_settings.stt_step_max_items_per_execution = 40
+
+        responses = invoker.invoke_stt_campaign("campaign-1", [str(n) for n in range(100)])
+
+        assert [len(ids) for ids, _ in responses] == [40, 40, 20]
+        sizes = sorted(
+            len(e["items"]) for e in _executions(step_settings.stt_campaign_state_machine_arn)
+        )
+        assert sizes == [20, 40, 40]
+
+    def test_client_is_cached(self, step_settings):
+        assert invoker._stepfunctions_client() is invoker._stepfunctions_client()
+
+    @patch("core.invoker.invoke_stt")
+    def test_falls_back_to_per_item(self, mock_invoke_stt, step_settings):
+        step_settings.stt_campaign_state_machine_arn = ""
+
+        invoker.invoke_stt_campaign("campaign-1", ["a", "b"])
+
+        assert mock_invoke_stt.call_count == 2
+
+    @patch("time.sleep")
+    @patch("core.invoker.invoke_stt")
+    def test_per_item_executions_start_without_waiting(
+        self, mock_invoke_stt, mock_sleep, step_settings
+    ):
+        # Dispatch runs inside API requests; the handler paces provider calls
+        step_settings.stt_campaign_state_machine_arn = ""
+        step_settings.stt_rate_limit_requests = 5
+
+        invoker.invoke_stt_campaign("campaign-1", ["a", "b", "c"])
+
+        assert mock_invoke_stt.call_count == 3
+        mock_sleep.assert_not_called()
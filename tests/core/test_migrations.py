@@ -0,0 +1,52 @@
+"""Tests for schema migrations."""
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import inspect, text
+
+import core.db as db
+from core.models import Base
+
+
+def _indexes(table: str) -> set[str]:
+    return {ix["name"] for ix in inspect(db.get_engine()).get_indexes(table)}
+
+
+def _revision() -> str:
+    with db.get_engine().connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+class TestMigrations:
+    def test_upgrade_creates_indexes(self, sqlite_db):
+        assert "ix_content_items_campaign_id_status" in _indexes("content_items")
+        assert {"ix_failures_campaign_id_error", "ix_failures_item_id"} <= _indexes("failures")
+
+    def test_migrations_match_models(self, sqlite_db):
+        with db.get_engine().connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+        assert diff == []
+
+    def test_adopts_database_created_without_migrations(self, sqlite_db):
+        with db.get_engine().begin() as connection:
+            command.downgrade(db.alembic_config(connection), db.BASELINE_REVISION)
+            connection.execute(text("DROP TABLE alembic_version"))
+
+        db.init_db()
+
+        assert "ix_content_items_campaign_id_status" in _indexes("content_items")
+        assert _revision() is not None
+
+    def test_campaign_items_query_uses_index(self, sqlite_db):
+        with db.get_engine().connect() as connection:
+            plan = connection.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT * FROM content_items "
+                    "WHERE campaign_id = :cid AND status = :status"
+                ),
+                {"cid": "c", "status": "failed"},
+            ).fetchall()
+
+        assert "ix_content_items_campaign_id_status" in " ".join(str(row) for row in plan)
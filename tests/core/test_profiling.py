@@ -0,0 +1,138 @@
+"""Tests for opt-in profiling."""
+
+import pstats
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from core.profiling import profile_scope
+from core.utils import register_profiling
+
+
+@pytest.fixture
+def profiling_settings(tmp_path):
+    with patch("core.profiling.settings") as mock_settings:
+        mock_settings.profiling_enabled = True
+        mock_settings.profiling_mode = "cprofile"
+        mock_settings.profiling_sample_rate = 0.0
+        mock_settings.profiling_output_dir = str(tmp_path / "profiles")
+        mock_settings.profiling_interval_ms = 1
+        yield mock_settings
+
+
+def _profiles(settings) -> list[Path]:
+    return sorted(Path(settings.profiling_output_dir).glob("*"))
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+class TestProfileScope:
+    def test_disabled_ignores_requests(self, profiling_settings):
+        profiling_settings.profiling_enabled = False
+
+        with profile_scope("work", requested=True):
+            _busy(0.01)
+
+        assert _profiles(profiling_settings) == []
+
+    def test_unrequested_not_sampled(self, profiling_settings):
+        with profile_scope("work"):
+            _busy(0.01)
+
+        assert _profiles(profiling_settings) == []
+
+    def test_cprofile_writes_pstats(self, profiling_settings):
+        with profile_scope("GET /campaigns", requested=True):
+            _busy(0.01)
+
+        (path,) = _profiles(profiling_settings)
+        assert path.suffix == ".prof"
+        assert "GET_campaigns" in path.name
+        functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+        assert "_busy" in functions
+
+    def test_sampling_writes_collapsed_stacks(self, profiling_settings):
+        profiling_settings.profiling_mode = "sampling"
+        profiling_settings.profiling_sample_rate = 1.0
+
+        with profile_scope("work"):
+            _busy(0.2)
+
+        (path,) = _profiles(profiling_settings)
+        assert path.suffix == ".collapsed"
+        stack, count = path.read_text().splitlines()[0].rsplit(" ", 1)
+        assert stack.endswith("test_profiling:_busy")
+        assert int(count) > 0
+
+    def test_concurrent_cprofile_falls_back_to_sampling(self, profiling_settings):
+        both_profiling = threading.Barrier(2)
+        errors = []
+
+        def request() -> None:
+            try:
+                with profile_scope("work", requested=True):
+                    both_profiling.wait(timeout=5)
+                    _busy(0.05)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=request) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert sorted(path.suffix for path in _profiles(profiling_settings)) == [
+            ".collapsed",
+            ".prof",
+        ]
+
+    def test_failed_start_does_not_fail_block_or_thread(self, profiling_settings):
+        with (
+            patch("core.profiling.cProfile.Profile") as profile,
+        ):
+            profile.return_value.enable.side_effect = ValueError("Another profiling tool")
+            with profile_scope("work", requested=True):
+                _busy(0.01)
+
+        assert _profiles(profiling_settings) == []
+        with profile_scope("work", requested=True):
+            _busy(0.01)
+        # The thread profiles again, and with cProfile: the lock was released
+        assert [path.suffix for path in _profiles(profiling_settings)] == [".prof"]
+
+    def test_nested_scope_joins_outer_profile(self, profiling_settings):
+        with profile_scope("outer", requested=True), profile_scope("inner", requested=True):
+            _busy(0.01)
+
+        assert len(_profiles(profiling_settings)) == 1
+
+
+def test_flask_header_triggers_profile(profiling_settings):
+    app = Flask(__name__)
+    register_profiling(app)
+
+    @app.route("/work")
+    def work() -> str:
+        _busy(0.01)
+        return "ok"
+
+    with patch("core.utils.settings") as utils_settings:
+        utils_settings.profiling_header = "X-Profile"
+        client = app.test_client()
+        client.get("/work")
+        assert _profiles(profiling_settings) == []
+
+        client.get("/work", headers={"X-Profile": "1"})
+
+    (path,) = _profiles(profiling_settings)
+    assert "work" in path.name
@@ -0,0 +1,53 @@
+"""Tests for JSON serialization backends."""
+
+import pytest
+
+from core import serialization
+from core.serialization import BACKENDS, _load_backend
+
+TRANSCRIPT = {
+    "text": "Héllo wörld.",
+    "words": [{"text": "Héllo", "start_ms": 0, "end_ms": 500, "confidence": 0.95}],
+    "duration_ms": 1000,
+    "audio_url": None,
+}
+
+
+def _available() -> list[str]:
+    names = []
+    for name in BACKENDS:
+        try:
+            _load_backend(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+@pytest.mark.parametrize("name", _available())
+def test_round_trip(name):
+    dumps, loads = _load_backend(name)
+
+    encoded = dumps(TRANSCRIPT)
+
+    assert isinstance(encoded, bytes)
+    assert loads(encoded) == TRANSCRIPT
+    assert loads(encoded.decode()) == TRANSCRIPT
+
+
+@pytest.mark.parametrize("name", _available())
+def test_invalid_input_raises_value_error(name):
+    _, loads = _load_backend(name)
+
+    with pytest.raises(ValueError):
+        loads(b"{not json")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        _load_backend("pickle")
+
+
+def test_module_helpers():
+    assert serialization.backend in BACKENDS
+    assert serialization.loads(serialization.dumps_str(TRANSCRIPT)) == TRANSCRIPT
@@ -0,0 +1,77 @@
+"""Tests for serving entry points."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core import serving
+
+
+@pytest.fixture
+def server_settings():
+    with patch("core.serving.settings") as mock_settings:
+        mock_settings.server_mode = "production"
+        mock_settings.server_debug = False
+        mock_settings.server_host = "0.0.0.0"
+        mock_settings.server_workers = 3
+        mock_settings.server_threads = 4
+        mock_settings.server_worker_class = "gthread"
+        mock_settings.server_timeout_seconds = 330
+        mock_settings.server_graceful_timeout_seconds = 300
+        mock_settings.server_keepalive_seconds = 5
+        yield mock_settings
+
+
+class TestServe:
+    def test_gunicorn_options(self, server_settings):
+        options = serving.gunicorn_options(5001)
+
+        assert options["bind"] == "0.0.0.0:5001"
+        assert options["workers"] == 3
+        assert options["threads"] == 4
+        assert options["graceful_timeout"] == 300
+        assert options["post_fork"] is serving._post_fork
+
+    def test_options_are_valid_gunicorn_config(self, server_settings):
+        app = MagicMock()
+        application = serving.GunicornApplication(app, serving.gunicorn_options(5001))
+
+        assert application.cfg.workers == 3
+        assert application.cfg.worker_class_str == "gthread"
+        assert application.load() is app
+
+    @patch("core.serving.GunicornApplication")
+    def test_production_uses_gunicorn(self, mock_application, server_settings):
+        app = MagicMock()
+
+        serving.serve(app, 5000)
+
+        mock_application.return_value.run.assert_called_once()
+        app.run.assert_not_called()
+
+    def test_development_uses_flask_server(self, server_settings):
+        server_settings.server_mode = "development"
+        app = MagicMock()
+
+        serving.serve(app, 5000)
+
+        app.run.assert_called_once_with(host="0.0.0.0", port=5000, debug=False)
+
+
+class TestWarmUp:
+    @patch("core.serving.create_cache")
+    @patch("core.serving.get_engine")
+    def test_opens_pools(self, mock_get_engine, mock_create_cache):
+        serving.warm_up()
+
+        mock_get_engine.return_value.dispose.assert_called_once_with(close=False)
+        mock_get_engine.return_value.connect.assert_called_once()
+        mock_create_cache.assert_called_once()
+
+    @patch("core.serving.create_cache")
+    @patch("core.serving.get_engine")
+    def test_unreachable_backends_do_not_fail_boot(self, mock_get_engine, mock_create_cache):
+        mock_get_engine.return_value.connect.side_effect = OSError("db down")
+        mock_create_cache.side_effect = OSError("redis down")
+
+        serving.warm_up()
@@ -0,0 +1,105 @@
+"""Tests for vectorized transcript analytics."""
+
+import numpy as np
+import pytest
+
+import core.db as db
+from stt.analytics import (
+    Timeline,
+    analyze,
+    analyze_campaign,
+    low_confidence_spans,
+    rolling_confidence,
+    silence_gaps,
+    words_per_minute,
+)
+from stt.models import TranscriptionResult, Word
+
+
+def _timeline(confidences: list[float], step_ms: int = 500) -> Timeline:
+    return Timeline.from_words(
+        [
+            Word(text="w", start_ms=n * step_ms, end_ms=n * step_ms + 400, confidence=c)
+            for n, c in enumerate(confidences)
+        ]
+    )
+
+
+class TestRollingConfidence:
+    def test_window_means(self):
+        means = rolling_confidence(np.array([1.0, 0.0, 1.0, 0.0]), 2)
+
+        assert means.tolist() == [0.5, 0.5, 0.5]
+
+    def test_window_larger_than_transcript(self):
+        assert rolling_confidence(np.array([0.2, 0.4]), 10).tolist() == pytest.approx([0.3])
+
+
+class TestLowConfidenceSpans:
+    def test_span_covers_low_windows(self):
+        timeline = _timeline([0.9] * 5 + [0.2, 0.3, 0.1] + [0.9] * 5)
+
+        spans = low_confidence_spans(timeline, threshold=0.4, window=3)
+
+        assert spans == [
+            {
+                "start_ms": 2500,
+                "end_ms": 3900,
+                "word_index": 5,
+                "word_count": 3,
+                "mean_confidence": 0.2,
+            }
+        ]
+
+    def test_separate_spans(self):
+        timeline = _timeline([0.1, 0.9, 0.9, 0.9, 0.1])
+
+        spans = low_confidence_spans(timeline, threshold=0.5, window=1)
+
+        assert [(s["word_index"], s["word_count"]) for s in spans] == [(0, 1), (4, 1)]
+
+    def test_empty_transcript(self):
+        assert low_confidence_spans(_timeline([]), threshold=0.5, window=3) == []
+
+
+def test_words_per_minute_scales_partial_bucket():
+    timeline = _timeline([0.9] * 90, step_ms=1000)  # one word per second for 90 s
+
+    overall, buckets = words_per_minute(timeline, 90_000, 60_000)
+
+    assert overall == 60.0
+    assert buckets == [60.0, 60.0]
+
+
+def test_silence_gaps():
+    timeline = Timeline.from_words(
+        [
+            Word(text="a", start_ms=0, end_ms=400, confidence=0.9),
+            Word(text="b", start_ms=500, end_ms=900, confidence=0.9),
+            Word(text="c", start_ms=4000, end_ms=4400, confidence=0.9),
+        ]
+    )
+
+    assert silence_gaps(timeline, 2000) == [
+        {"start_ms": 900, "end_ms": 4000, "after_word_index": 1}
+    ]
+
+
+def test_analyze(sample_transcription_dict):
+    analytics = analyze(TranscriptionResult.from_dict(sample_transcription_dict))
+
+    assert analytics["low_confidence_spans"] == []
+    assert analytics["words_per_minute"] == 60.0
+    assert analytics["silence_ms"] == 0
+
+
+def test_analyze_campaign(sqlite_db, fake_redis, sample_transcription_dict):
+    campaign = db.create_campaign("c")
+    item = db.create_item(campaign.id, "https://example.com/a")
+    db.update_item_status(item.id, "completed")
+    fake_redis.set(f"stt:result:{item.id}", sample_transcription_dict)
+
+    assert analyze_campaign(campaign.id, fake_redis) == 1
+    stored = fake_redis.get(f"stt:result:{item.id}")
+    assert stored["text"] == sample_transcription_dict["text"]
+    assert stored["analytics"]["words_per_minute"] == 60.0
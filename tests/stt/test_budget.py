@@ -0,0 +1,152 @@
+"""Tests for per-campaign audio budgets."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.models import RETRYABLE_ERRORS
+from stt.budget import HELD_BY_IN_FLIGHT, Budget, BudgetLedger
+from stt.models import TranscriptionResult
+from stt.service import TranscriptionError, TranscriptionService
+
+
+def _campaign(minutes=None, spend=None):
+    return MagicMock(id="c1", budget_audio_minutes=minutes, budget_spend_usd=spend)
+
+
+class TestBudget:
+    def test_no_budget(self):
+        assert Budget.for_campaign(_campaign()) is None
+
+    def test_tighter_limit_wins(self):
+        with patch("stt.budget.settings") as mock_settings:
+            mock_settings.stt_cost_per_audio_hour_usd = 0.5
+            # $1 buys two hours, so the 60 minute budget is tighter
+            assert Budget.for_campaign(_campaign(60, 1.0)) == Budget("c1", 3_600_000)
+            assert Budget.for_campaign(_campaign(None, 0.25)) == Budget("c1", 1_800_000)
+
+
+class TestBudgetLedger:
+    def test_reservations_stop_at_limit(self, fake_redis):
+        ledger = BudgetLedger(fake_redis)
+        budget = Budget("c1", 1000)
+
+        assert ledger.reserve(budget, 600) == 600
+        assert ledger.reserve(budget, 600) == HELD_BY_IN_FLIGHT
+        ledger.settle(budget, 600, 600)
+        # Nothing in flight: the last item takes what is left
+        assert ledger.reserve(budget, 600) == 400
+        ledger.settle(budget, 400, 400)
+        assert ledger.reserve(budget, 600) == 0
+
+    def test_concurrent_reservations_wait_for_unspent_budget(self, fake_redis):
+        ledger = BudgetLedger(fake_redis)
+        budget = Budget("c1", 60 * 60_000)
+
+        reserved = [ledger.reserve(budget, 600_000) for _ in range(8)]
+
+        assert reserved == [600_000] * 6 + [HELD_BY_IN_FLIGHT] * 2
+        assert ledger.used_ms("c1") == 0
+
+    def test_settle_charges_actual_duration(self, fake_redis):
+        ledger = BudgetLedger(fake_redis)
+        budget = Budget("c1", 1000)
+
+        reserved = ledger.reserve(budget, 800)
+        assert ledger.settle(budget, reserved, 300) == 300
+        assert ledger.used_ms("c1") == 300
+        assert ledger.reserve(budget, 800) == 700
+
+
+class TestServiceBudget:
+    @pytest.fixture
+    def service(self, fake_redis):
+        with (
+            patch("stt.service.settings") as mock_settings,
+            patch("stt.service.aai"),
+            patch("stt.service.create_cache", return_value=fake_redis),
+            patch("stt.service.transcript_identity", return_value="audio"),
+            patch("stt.service.transcript_namespace", return_value="stt:transcript"),
+            patch("stt.service.time.sleep"),
+        ):
+            mock_settings.stt_budget_reserve_seconds = 600
+            mock_settings.stt_budget_wait_seconds = 0
+            yield TranscriptionService()
+
+    def test_charges_duration_after_completion(self, service, sample_transcription_dict):
+        result = TranscriptionResult.from_dict(sample_transcription_dict)
+        budget = Budget("c1", 60_000)
+
+        with patch.object(service, "_transcribe_within_rate_limit", return_value=result):
+            service.transcribe("https://example.com/a.mp3", budget=budget)
+
+        assert service._ledger.used_ms("c1") == result.duration_ms
+
+    def test_over_budget_fails_fast(self, service):
+        budget = Budget("c1", 1000)
+        service._ledger.settle(budget, 0, 1000)
+
+        with (
+            patch.object(service, "_transcribe_within_rate_limit") as mock_transcribe,
+            pytest.raises(TranscriptionError) as exc,
+        ):
+            service.transcribe("https://example.com/a.mp3", budget=budget)
+
+        assert exc.value.error_code == "BUDGET_EXCEEDED"
+        mock_transcribe.assert_not_called()
+
+    def test_reserves_item_duration(self, service, sample_transcription_dict):
+        result = TranscriptionResult.from_dict(sample_transcription_dict)
+        budget = Budget("c1", 60_000)
+
+        with (
+            patch.object(service._ledger, "reserve", return_value=1000) as mock_reserve,
+            patch.object(service, "_transcribe_within_rate_limit", return_value=result),
+        ):
+            service.transcribe("https://example.com/a.mp3", budget=budget, estimate_ms=1000)
+
+        mock_reserve.assert_called_once_with(budget, 1000)
+
+    def test_waits_for_in_flight_reservations(self, service, sample_transcription_dict):
+        result = TranscriptionResult.from_dict(sample_transcription_dict)
+        budget = Budget("c1", 1500)
+        in_flight = service._ledger.reserve(budget, 1000)
+
+        with (
+            patch("stt.service.settings.stt_budget_wait_seconds", 60),
+            patch(
+                "stt.service.time.sleep",
+                side_effect=lambda _: service._ledger.settle(budget, in_flight, 400),
+            ),
+            patch.object(service, "_transcribe_within_rate_limit", return_value=result),
+        ):
+            service.transcribe("https://example.com/a.mp3", budget=budget, estimate_ms=1000)
+
+        assert service._ledger.used_ms("c1") == 400 + result.duration_ms
+
+    def test_budget_held_by_in_flight_work_is_retryable(self, service):
+        budget = Budget("c1", 1500)
+        service._ledger.reserve(budget, 1000)
+
+        with (
+            patch.object(service, "_transcribe_within_rate_limit") as mock_transcribe,
+            pytest.raises(TranscriptionError) as exc,
+        ):
+            service.transcribe("https://example.com/a.mp3", budget=budget)
+
+        assert exc.value.error_code == "BUDGET_RESERVED"
+        assert exc.value.error_code in RETRYABLE_ERRORS
+        mock_transcribe.assert_not_called()
+
+    def test_failed_transcription_releases_reservation(self, service):
+        budget = Budget("c1", 1000)
+
+        with (
+            patch.object(
+                service, "_transcribe_within_rate_limit", side_effect=TranscriptionError("boom")
+            ),
+            pytest.raises(TranscriptionError),
+        ):
+            service.transcribe("https://example.com/a.mp3", budget=budget)
+
+        assert service._ledger.reserve(budget, 1000) == 1000
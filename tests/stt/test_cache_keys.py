@@ -0,0 +1,86 @@
+"""Tests for transcript cache identity."""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from stt.cache_keys import canonical_url, config_fingerprint, transcript_identity
+
+STRIP = ["X-Amz-*", "Expires", "Signature", "x-signature"]
+PRESIGNED = (
+    "https://Bucket.s3.amazonaws.com/audio/a.mp3?X-Amz-Date=20260101"
+    "&X-Amz-Signature=abc&versionId=2&X-Amz-Expires=900"
+)
+
+
+class TestCanonicalUrl:
+    def test_strip_signing_keeps_other_params(self):
+        assert canonical_url(PRESIGNED, "strip_signing", STRIP) == (
+            "https://bucket.s3.amazonaws.com/audio/a.mp3?versionId=2"
+        )
+
+    def test_resigned_urls_match(self):
+        resigned = PRESIGNED.replace("Signature=abc", "Signature=def").replace("0101", "0202")
+
+        assert canonical_url(PRESIGNED, "strip_signing", STRIP) == canonical_url(
+            resigned, "strip_signing", STRIP
+        )
+
+    def test_path_mode_drops_query(self):
+        assert canonical_url(PRESIGNED, "path", STRIP) == (
+            "https://bucket.s3.amazonaws.com/audio/a.mp3"
+        )
+
+    def test_none_mode(self):
+        assert canonical_url(PRESIGNED, "none", STRIP) == PRESIGNED
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            canonical_url(PRESIGNED, "bogus", STRIP)
+
+
+class TestConfigFingerprint:
+    def test_changes_with_language(self):
+        with patch("stt.cache_keys.settings") as mock_settings:
+            mock_settings.stt_speech_models = ["universal-2"]
+            mock_settings.stt_language_code = "en_us"
+            mock_settings.stt_speaker_labels = False
+            mock_settings.stt_punctuate = True
+            mock_settings.stt_format_text = True
+            mock_settings.stt_chunking_enabled = False
+            before = config_fingerprint()
+            mock_settings.stt_language_code = "es"
+
+            assert config_fingerprint() != before
+
+
+class TestTranscriptIdentity:
+    @patch("stt.cache_keys.settings")
+    def test_content_fingerprint(self, mock_settings):
+        mock_settings.stt_cache_content_fingerprint = True
+        mock_settings.stt_cache_fingerprint_bytes = 4
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(
+                206, content=b"RIFF", headers={"content-range": "bytes 0-3/100"}
+            )
+        )
+
+        with patch("stt.cache_keys.httpx.stream") as mock_stream:
+            mock_stream.side_effect = lambda method, url, **kw: httpx.Client(
+                transport=transport
+            ).stream(method, url, headers=kw["headers"])
+            first = transcript_identity("https://cdn.example.com/a.mp3?x-signature=1")
+            second = transcript_identity("https://other.example.com/b.mp3")
+
+        assert first.startswith("content:")
+        assert first == second
+
+    @patch("stt.cache_keys.content_fingerprint", return_value=None)
+    @patch("stt.cache_keys.settings")
+    def test_falls_back_to_canonical_url(self, mock_settings, _):
+        mock_settings.stt_cache_content_fingerprint = True
+        mock_settings.stt_cache_url_mode = "path"
+        mock_settings.stt_cache_strip_params = []
+
+        assert transcript_identity("https://a.com/x.mp3?sig=1") == "https://a.com/x.mp3"
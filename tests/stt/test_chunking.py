@@ -0,0 +1,151 @@
+"""Tests for chunked transcription."""
+
+import subprocess
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from stt.chunking import AudioChunk, ChunkingConfig, chunk_spans, stitch
+from stt.models import Sentence, TranscriptionResult, Word
+from stt.service import TranscriptionError, TranscriptionService
+
+
+def _result(words: list[tuple[str, int]], duration_ms: int = 10_000) -> TranscriptionResult:
+    return TranscriptionResult(
+        text=" ".join(text for text, _ in words),
+        words=tuple(Word(text, start, start + 400, 0.9) for text, start in words),
+        sentences=tuple(Sentence(text, start, start + 400) for text, start in words),
+        language_code="en",
+        confidence=0.9,
+        duration_ms=duration_ms,
+        audio_url="chunk",
+    )
+
+
+class FakeSplitter:
+    def __init__(self, chunks: list[AudioChunk]) -> None:
+        self.chunks = chunks
+
+    @contextmanager
+    def split(self, audio_url, chunk_ms, overlap_ms):
+        yield self.chunks
+
+
+CHUNKS = [AudioChunk("a", 0, 10_000), AudioChunk("b", 8_000, 10_000)]
+
+
+class TestChunkSpans:
+    def test_overlapping_spans_cover_audio(self):
+        assert chunk_spans(25_000, 10_000, 2_000) == [
+            (0, 10_000),
+            (8_000, 10_000),
+            (16_000, 9_000),
+        ]
+
+    def test_short_audio_is_single_span(self):
+        assert chunk_spans(5_000, 10_000, 2_000) == [(0, 5_000)]
+
+    def test_overlap_must_be_shorter_than_chunk(self):
+        with pytest.raises(ValueError):
+            chunk_spans(25_000, 2_000, 2_000)
+
+
+class TestStitch:
+    def test_offsets_and_overlap_dedup(self):
+        first = _result([("one", 1_000), ("two", 8_500), ("three", 9_500)])
+        # "two" and "three" are heard again by the second chunk (relative timestamps)
+        second = _result([("two", 500), ("three", 1_500), ("four", 5_000)])
+
+        result = stitch(CHUNKS, [first, second], "https://example.com/long.mp3")
+
+        assert [w.text for w in result.words] == ["one", "two", "three", "four"]
+        assert [w.start_ms for w in result.words] == [1_000, 8_500, 9_500, 13_000]
+        assert [s.start_ms for s in result.sentences] == [1_000, 8_500, 9_500, 13_000]
+        assert result.text == "one two three four"
+        assert result.duration_ms == 18_000
+        assert result.audio_url == "https://example.com/long.mp3"
+
+
+@pytest.fixture
+def service():
+    with (
+        patch("stt.service.settings") as mock_settings,
+        patch("stt.service.create_cache") as mock_create_cache,
+        patch("stt.service.aai"),
+    ):
+        mock_settings.stt_rate_limit_requests = 5
+        cache = MagicMock()
+        cache.get.return_value = None
+        mock_create_cache.return_value = cache
+        yield TranscriptionService(FakeSplitter(CHUNKS), ChunkingConfig(10_000, 2_000, 2)), cache
+
+
+class TestChunkedService:
+    def test_chunks_transcribed_under_rate_limit(self, service):
+        svc, cache = service
+        results = {
+            "a": _result([("one", 1_000)]),
+            "b": _result([("two", 5_000)]),
+        }
+
+        with patch.object(svc, "_do_transcribe", side_effect=results.__getitem__):
+            result = svc.transcribe("https://example.com/long.mp3")
+
+        assert [w.start_ms for w in result.words] == [1_000, 13_000]
+        assert cache.wait_for_rate_limit.call_count == 2
+        cache.set.assert_called_once()
+
+    def test_silent_chunk_is_skipped(self, service):
+        svc, _ = service
+
+        def transcribe(source):
+            if source == "a":
+                raise TranscriptionError("No speech", "NO_SPEECH_DETECTED")
+            return _result([("two", 5_000)])
+
+        with patch.object(svc, "_do_transcribe", side_effect=transcribe):
+            result = svc.transcribe("https://example.com/long.mp3")
+
+        assert result.text == "two"
+
+    def test_all_chunks_silent(self, service):
+        svc, _ = service
+        error = TranscriptionError("No speech", "NO_SPEECH_DETECTED")
+
+        with (
+            patch.object(svc, "_do_transcribe", side_effect=error),
+            pytest.raises(TranscriptionError) as exc,
+        ):
+            svc.transcribe("https://example.com/long.mp3")
+
+        assert exc.value.error_code == "NO_SPEECH_DETECTED"
+
+    @pytest.mark.parametrize(
+        "error", [FileNotFoundError("ffprobe"), subprocess.CalledProcessError(1, "ffprobe")]
+    )
+    def test_unsplittable_audio_is_sent_whole(self, service, error):
+        svc, _ = service
+        whole = _result([("one", 1_000)], duration_ms=30_000)
+
+        with (
+            patch.object(FakeSplitter, "split", side_effect=error),
+            patch.object(svc, "_do_transcribe", return_value=whole) as mock_transcribe,
+        ):
+            result = svc.transcribe("https://example.com/long.mp3")
+
+        assert result is whole
+        mock_transcribe.assert_called_once_with("https://example.com/long.mp3")
+
+    def test_errors_while_transcribing_chunks_are_not_retried_whole(self, service):
+        svc, _ = service
+
+        with (
+            patch.object(svc, "_do_transcribe", side_effect=OSError("disk")) as mock_transcribe,
+            pytest.raises(OSError),
+        ):
+            svc.transcribe("https://example.com/long.mp3")
+
+        assert "https://example.com/long.mp3" not in {
+            call.args[0] for call in mock_transcribe.call_args_list
+        }
@@ -0,0 +1,124 @@
+"""Tests for the fake AssemblyAI server and the service running against it."""
+
+from unittest.mock import patch
+
+import assemblyai as aai
+import pytest
+
+from core.config import settings
+from core.serialization import dumps
+from stt.fake_assemblyai import FakeProfile, create_app, running
+from stt.service import TranscriptionError, TranscriptionService
+
+FAST = {"latency_median_seconds": 0.05, "latency_sigma": 0.0}
+
+
+@pytest.fixture
+def service_at(monkeypatch):
+    """Build a TranscriptionService pointed at a fake server URL."""
+    original = aai.settings.copy()
+
+    def build(base_url: str) -> TranscriptionService:
+        monkeypatch.setattr(settings, "stt_assemblyai_api_key", "fake-key", raising=False)
+        monkeypatch.setattr(settings, "stt_assemblyai_base_url", base_url)
+        monkeypatch.setattr(settings, "stt_assemblyai_polling_interval_seconds", 0.01)
+        with patch("stt.service.create_cache", return_value=None):
+            return TranscriptionService()
+
+    yield build
+    aai.settings.base_url = original.base_url
+    aai.settings.api_key = original.api_key
+    aai.settings.polling_interval = original.polling_interval
+
+
+class TestFakeServer:
+    def test_synthetic_transcript_follows_requested_duration(self):
+        client = create_app(FakeProfile(latency_median_seconds=0, latency_sigma=0)).test_client()
+
+        created = client.post("/v2/transcript", json={"audio_url": "https://x/a.mp3?duration=30"})
+        transcript = client.get(f"/v2/transcript/{created.get_json()['id']}").get_json()
+
+        assert transcript["status"] == "completed"
+        assert transcript["audio_duration"] == 30
+        assert len(transcript["words"]) == 75  # 150 words per minute
+        assert transcript["words"][-1]["end"] <= 30_000
+
+    def test_processing_until_latency_elapses(self):
+        client = create_app(FakeProfile(latency_median_seconds=60, latency_sigma=0)).test_client()
+
+        created = client.post("/v2/transcript", json={"audio_url": "https://x/a.mp3"})
+        transcript = client.get(f"/v2/transcript/{created.get_json()['id']}").get_json()
+
+        assert transcript["status"] == "processing"
+
+    def test_rate_limited(self):
+        client = create_app(FakeProfile(rate_limit_rate=1.0)).test_client()
+
+        response = client.post("/v2/transcript", json={"audio_url": "https://x/a.mp3"})
+
+        assert response.status_code == 429
+        assert client.get("/fake/stats").get_json()["rate_limited"] == 1
+
+    def test_replay_requires_recordings(self, tmp_path):
+        with pytest.raises(ValueError):
+            create_app(FakeProfile(mode="replay", recordings_dir=tmp_path))
+
+
+class TestServiceAgainstFake:
+    def test_synthetic(self, service_at):
+        with running(FakeProfile(**FAST)) as base_url:
+            result = service_at(base_url).transcribe("https://x/a.mp3?duration=12")
+
+        assert result.duration_ms == 12_000
+        assert len(result.words) == 30
+        assert result.sentences and result.sentences[0].text[0].isupper()
+
+    def test_replay(self, service_at, tmp_path):
+        recording = {
+            "transcript": {
+                "audio_url": "https://x/recorded.mp3",
+                "text": "Hello world.",
+                "words": [{"text": "Hello", "start": 0, "end": 400, "confidence": 0.9}],
+                "confidence": 0.9,
+                "audio_duration": 2,
+                "language_code": "en_us",
+            },
+            "sentences": [
+                {
+                    "text": "Hello world.",
+                    "start": 0,
+                    "end": 900,
+                    "confidence": 0.9,
+                    "words": [{"text": "Hello", "start": 0, "end": 400, "confidence": 0.9}],
+                }
+            ],
+        }
+        (tmp_path / "t1.json").write_bytes(dumps(recording))
+
+        profile = FakeProfile(mode="replay", recordings_dir=tmp_path, **FAST)
+        with running(profile) as base_url:
+            result = service_at(base_url).transcribe("https://x/other.mp3")
+
+        assert result.text == "Hello world."
+        assert result.duration_ms == 2000
+        assert result.audio_url == "https://x/other.mp3"
+
+    def test_http_429_is_rate_limited(self, service_at):
+        with (
+            running(FakeProfile(rate_limit_rate=1.0, **FAST)) as base_url,
+            patch("stt.service.time.sleep") as mock_sleep,
+            pytest.raises(TranscriptionError) as exc,
+        ):
+            service_at(base_url).transcribe("https://x/a.mp3")
+
+        assert exc.value.error_code == "RATE_LIMITED"
+        assert mock_sleep.call_count == 3
+
+    def test_provider_error(self, service_at):
+        with (
+            running(FakeProfile(error_rate=1.0, **FAST)) as base_url,
+            pytest.raises(TranscriptionError) as exc,
+        ):
+            service_at(base_url).transcribe("https://x/a.mp3")
+
+        assert exc.value.error_code == "STT_FAILED"
@@ -4,7 +4,11 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from stt.handler import handler
+from stt.budget import Budget
+from stt.handler import batch_handler, handler
+from stt.models import TranscriptionResult, Word
+from stt.scanner import KeywordScanner
+from stt.scheduler import Share
 
 
 @pytest.fixture
@@ -13,6 +17,8 @@ def mock_item():
     item.id = "item-123"
     item.campaign_id = "campaign-456"
     item.audio_url = "https://example.com/audio.mp3"
+    item.audio_duration_ms = 95_000
+    item.status = "pending"
     return item
 
 
@@ -32,6 +38,22 @@ class TestHandler:
 
         assert result["statusCode"] == 404
 
+    @patch("stt.handler.start_item_attempt")
+    @patch("stt.handler.get_service")
+    @patch("stt.handler.get_item")
+    def test_completed_item_is_not_transcribed_again(
+        self, mock_get_item, mock_get_service, mock_start_attempt, mock_item
+    ):
+        mock_item.status = "completed"
+        mock_get_item.return_value = mock_item
+
+        result = handler({"campaign_id": "campaign-456", "item_id": "item-123"}, None)
+
+        assert result["statusCode"] == 200
+        assert result["body"]["status"] == "completed"
+        mock_start_attempt.assert_not_called()
+        mock_get_service.return_value.transcribe.assert_not_called()
+
     @patch("stt.handler.update_item_status")
     @patch("stt.handler.create_failure")
     @patch("stt.handler.get_item")
@@ -42,17 +64,36 @@ class TestHandler:
         result = handler({"campaign_id": "campaign-456", "item_id": "item-123"}, None)
 
         assert result["statusCode"] == 422
-        assert "NO_AUDIO_URL" in result["body"]
+        assert result["body"]["error"] == "NO_AUDIO_URL"
 
+    @patch("stt.handler.start_item_attempt")
+    @patch("stt.handler.get_campaign")
     @patch("stt.handler.create_cache")
     @patch("stt.handler.get_service")
-    @patch("stt.handler.update_item_status")
+    @patch("stt.handler.complete_item")
     @patch("stt.handler.get_item")
-    def test_success(self, mock_get_item, _, mock_get_service, mock_cache, mock_item):
+    def test_success(
+        self,
+        mock_get_item,
+        mock_complete_item,
+        mock_get_service,
+        mock_cache,
+        mock_get_campaign,
+        mock_start_attempt,
+        mock_item,
+    ):
         mock_get_item.return_value = mock_item
+        mock_get_campaign.return_value = MagicMock(
+            id="campaign-456",
+            lane="backfill",
+            weight=2.0,
+            budget_audio_minutes=10,
+            budget_spend_usd=None,
+        )
         mock_result = MagicMock()
         mock_result.duration_ms = 1000
         mock_result.confidence = 0.95
+        mock_result.words = (Word(text="Hello", start_ms=0, end_ms=500, confidence=0.95),)
         mock_result.to_dict.return_value = {"text": "Hello"}
         mock_get_service.return_value.transcribe.return_value = mock_result
         mock_cache.return_value = MagicMock()
@@ -60,4 +101,117 @@ class TestHandler:
         result = handler({"campaign_id": "campaign-456", "item_id": "item-123"}, None)
 
         assert result["statusCode"] == 200
-        assert "completed" in result["body"]
+        assert result["body"]["status"] == "completed"
+        mock_start_attempt.assert_called_once_with("item-123")
+        mock_get_service.return_value.transcribe.assert_called_once_with(
+            mock_item.audio_url,
+            Share("campaign-456", "backfill", 2.0),
+            Budget("campaign-456", 600_000),
+            mock_item.audio_duration_ms,
+        )
+        mock_complete_item.assert_called_once_with(
+            "item-123", duration_ms=1000, word_count=1, confidence=0.95, flag_count=0
+        )
+
+    @patch("stt.handler.get_scanner")
+    @patch("stt.handler.start_item_attempt")
+    @patch("stt.handler.get_campaign", return_value=None)
+    @patch("stt.handler.create_cache")
+    @patch("stt.handler.get_service")
+    @patch("stt.handler.complete_item")
+    @patch("stt.handler.get_item")
+    def test_flags_stored_with_result(
+        self,
+        mock_get_item,
+        _,
+        mock_get_service,
+        mock_cache,
+        _campaign,
+        _attempt,
+        mock_get_scanner,
+        mock_item,
+        sample_transcription_dict,
+    ):
+        mock_get_item.return_value = mock_item
+        result = TranscriptionResult.from_dict(sample_transcription_dict)
+        mock_get_service.return_value.transcribe.return_value = result
+        first_word = result.words[0].text
+        mock_get_scanner.return_value = KeywordScanner([("test", first_word)])
+
+        response = handler({"campaign_id": "campaign-456", "item_id": "item-123"}, None)
+
+        assert response["body"]["flags"] == 1
+        stored = mock_cache.return_value.set.call_args.args[1]
+        assert stored["flags"][0]["term"] == first_word
+        assert stored["analytics"]["low_confidence_spans"] == []
+
+
+def _response(status: int, error: str | None = None) -> dict:
+    body = {"error": error} if error else {"status": "completed"}
+    return {"statusCode": status, "body": body}
+
+
+@patch("stt.handler.get_service")
+@patch("stt.handler.handler")
+class TestBatchHandler:
+    def test_sqs_records_report_retryable_failures(self, mock_handler, _):
+        responses = {
+            "ok": _response(200),
+            "throttled": _response(422, "RATE_LIMITED"),
+            "no-audio": _response(422, "NO_AUDIO_URL"),
+            "crashed": _response(500, "INTERNAL_ERROR"),
+        }
+        mock_handler.side_effect = lambda event, _: responses[event["item_id"]]
+        event = {
+            "Records": [
+                {
+                    "messageId": f"msg-{item_id}",
+                    "body": f'{{"campaign_id": "c", "item_id": "{item_id}"}}',
+                }
+                for item_id in responses
+            ]
+        }
+
+        result = batch_handler(event, None)
+
+        assert result["batchItemFailures"] == [
+            {"itemIdentifier": "msg-throttled"},
+            {"itemIdentifier": "msg-crashed"},
+        ]
+        assert len(result["results"]) == 4
+
+    def test_step_functions_items(self, mock_handler, _):
+        mock_handler.side_effect = lambda event, _: (
+            _response(422, "TIMEOUT") if event["item_id"] == "b" else _response(200)
+        )
+        event = {"Items": [{"campaign_id": "c", "item_id": i} for i in ("a", "b", "c")]}
+
+        result = batch_handler(event, None)
+
+        assert result["batchItemFailures"] == [{"itemIdentifier": "b"}]
+        assert mock_handler.call_count == 3
+
+    def test_exception_fails_only_its_item(self, mock_handler, _):
+        def process(event, _):
+            if event["item_id"] == "b":
+                raise RuntimeError("database unavailable")
+            return _response(200)
+
+        mock_handler.side_effect = process
+        event = {"Items": [{"campaign_id": "c", "item_id": i} for i in ("a", "b", "c")]}
+
+        result = batch_handler(event, None)
+
+        assert result["batchItemFailures"] == [{"itemIdentifier": "b"}]
+        assert [r["statusCode"] for r in result["results"]] == [200, 500, 200]
+
+
+@pytest.mark.parametrize("body", ["not json", "[1]", '"text"'])
+@patch("stt.handler.get_service")
+def test_batch_malformed_record_is_not_retried(_, body):
+    event = {"Records": [{"messageId": "m1", "body": body}]}
+
+    result = batch_handler(event, None)
+
+    assert result["batchItemFailures"] == []
+    assert result["results"][0]["statusCode"] == 400
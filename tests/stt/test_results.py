@@ -0,0 +1,37 @@
+"""Tests for rewriting stored campaign results."""
+
+import core.db as db
+from stt.analytics import analyze_campaign
+from stt.results import rewrite_campaign_results
+from stt.scanner import KeywordScanner, rescan_campaign
+
+
+def test_rewrite_merges_update_into_completed_results(sqlite_db, fake_redis):
+    campaign = db.create_campaign("c")
+    done, pending = (db.create_item(campaign.id, f"https://example.com/{n}") for n in range(2))
+    db.update_item_status(done.id, "completed")
+    for item in (done, pending):
+        fake_redis.set(f"stt:result:{item.id}", {"text": "hi"})
+
+    rewritten = rewrite_campaign_results(campaign.id, fake_redis, lambda data: {"n": len(data)})
+
+    assert rewritten == 1
+    assert fake_redis.get(f"stt:result:{done.id}") == {"text": "hi", "n": 1}
+    assert fake_redis.get(f"stt:result:{pending.id}") == {"text": "hi"}
+    # The campaign lock is released
+    assert fake_redis.client.lock(f"stt:rewrite:{campaign.id}").acquire(blocking=False)
+
+
+def test_passes_keep_each_others_fields(sqlite_db, fake_redis, sample_transcription_dict):
+    campaign = db.create_campaign("c")
+    item = db.create_item(campaign.id, "https://example.com/a")
+    db.update_item_status(item.id, "completed")
+    fake_redis.set(f"stt:result:{item.id}", sample_transcription_dict)
+    first_word = sample_transcription_dict["words"][0]["text"]
+
+    rescan_campaign(campaign.id, fake_redis, KeywordScanner([("x", first_word)]))
+    analyze_campaign(campaign.id, fake_redis)
+
+    stored = fake_redis.get(f"stt:result:{item.id}")
+    assert len(stored["flags"]) == 1
+    assert "analytics" in stored
@@ -0,0 +1,105 @@
+"""Tests for the transcript term scanner."""
+
+import os
+from unittest.mock import patch
+
+import core.db as db
+import stt.scanner as scanner_module
+from stt.models import TranscriptionResult, Word
+from stt.scanner import KeywordScanner, compile_scanner, get_scanner, rescan_campaign
+
+
+def _words(text: str) -> list[Word]:
+    return [
+        Word(text=token, start_ms=n * 100, end_ms=n * 100 + 80, confidence=0.9)
+        for n, token in enumerate(text.split())
+    ]
+
+
+class TestKeywordScanner:
+    def test_phrase_hit_has_word_timestamps(self):
+        scanner = KeywordScanner([("fraud", "wire transfer")])
+
+        hits = scanner.scan(_words("Please send a Wire transfer, today."))
+
+        assert len(hits) == 1
+        hit = hits[0]
+        assert (hit.term, hit.category, hit.word_index, hit.word_count) == (
+            "wire transfer",
+            "fraud",
+            3,
+            2,
+        )
+        assert (hit.start_ms, hit.end_ms) == (300, 480)
+
+    def test_overlapping_and_nested_terms(self):
+        scanner = KeywordScanner(
+            [("a", "free money"), ("b", "money"), ("c", "money back guarantee")]
+        )
+
+        hits = scanner.scan(_words("free money back guarantee"))
+
+        assert sorted(hit.term for hit in hits) == [
+            "free money",
+            "money",
+            "money back guarantee",
+        ]
+
+    def test_failure_links_restart_partial_matches(self):
+        scanner = KeywordScanner([("x", "a a b")])
+
+        hits = scanner.scan(_words("a a a b"))
+
+        assert [(hit.word_index, hit.word_count) for hit in hits] == [(1, 3)]
+
+    def test_punctuation_only_words_are_skipped(self):
+        scanner = KeywordScanner([("x", "buy now")])
+
+        assert len(scanner.scan(_words("buy - now"))) == 1
+
+    def test_empty_scanner_is_falsy(self):
+        assert not KeywordScanner([])
+
+
+def test_scanner_compiled_once_per_term_list():
+    with patch("stt.scanner.settings") as mock_settings:
+        mock_settings.stt_flag_terms = {"fraud": ["wire transfer"]}
+        mock_settings.stt_flag_terms_path = ""
+
+        assert get_scanner() is get_scanner()
+        assert get_scanner() is compile_scanner((("fraud", "wire transfer"),))
+
+
+def test_scanner_follows_terms_file_changes(tmp_path):
+    path = tmp_path / "terms.json"
+    path.write_text('{"fraud": ["wire transfer"]}')
+    with patch("stt.scanner.settings") as mock_settings:
+        mock_settings.stt_flag_terms = {}
+        mock_settings.stt_flag_terms_path = str(path)
+
+        with patch("stt.scanner._collect_terms", wraps=scanner_module._collect_terms) as collect:
+            first = get_scanner()
+            assert get_scanner() is first
+            assert collect.call_count == 1
+
+        path.write_text('{"fraud": ["gift card"]}')
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+
+        assert get_scanner() is not first
+        assert len(get_scanner().scan(_words("buy a gift card"))) == 1
+
+
+def test_rescan_campaign(sqlite_db, fake_redis, sample_transcription_dict):
+    campaign = db.create_campaign("c")
+    item = db.create_item(campaign.id, "https://example.com/v")
+    db.update_item_status(item.id, "completed")
+    fake_redis.set(f"stt:result:{item.id}", {**sample_transcription_dict, "extra": 1})
+    first_word = sample_transcription_dict["words"][0]["text"]
+
+    scanned = rescan_campaign(campaign.id, fake_redis, KeywordScanner([("x", first_word)]))
+
+    stored = fake_redis.get(f"stt:result:{item.id}")
+    assert scanned == 1
+    assert stored["extra"] == 1
+    assert stored["flags"][0]["word_index"] == 0
+    assert TranscriptionResult.from_dict(stored).words[0].text == first_word
@@ -0,0 +1,154 @@
+"""Simulation tests for the fair scheduler against a Redis-held token budget."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from stt.scheduler import FairScheduler, Share
+
+LANE_WEIGHTS = {"interactive": 8, "backfill": 1}
+TOKEN_KEY = "stt:ratelimit:{test}"
+
+
+class FakeProvider:
+    """Rate limit that hands out a token only when the test releases one."""
+
+    def __init__(self, cache) -> None:
+        self._client = cache.client
+        # A full window that never expires during the test
+        self._client.set(TOKEN_KEY, 1, ex=3600)
+
+    def release(self) -> None:
+        self._client.decr(TOKEN_KEY)
+
+    def waiting(self) -> int:
+        return self._client.zcard(f"{TOKEN_KEY}:tickets")
+
+
+@pytest.fixture
+def provider(fake_redis):
+    return FakeProvider(fake_redis)
+
+
+def _scheduler(cache) -> FairScheduler:
+    return FairScheduler(
+        cache, TOKEN_KEY, 1, 3600, LANE_WEIGHTS, poll_interval=0.001, max_poll_interval=0.004
+    )
+
+
+def _simulate(
+    schedulers: list[FairScheduler], provider: FakeProvider, shares: list[Share]
+) -> list[str]:
+    """Queue every share on its own thread, then release tokens one at a time."""
+    grants: list[str] = []
+    grants_lock = threading.Lock()
+
+    def worker(scheduler: FairScheduler, share: Share) -> None:
+        scheduler.acquire(share)
+        with grants_lock:
+            grants.append(share.campaign_id)
+
+    threads = [
+        threading.Thread(target=worker, args=(schedulers[n % len(schedulers)], share))
+        for n, share in enumerate(shares)
+    ]
+    for thread in threads:
+        thread.start()
+    while provider.waiting() < len(shares):
+        threading.Event().wait(0.001)
+
+    for granted in range(1, len(shares) + 1):
+        provider.release()
+        while len(grants) < granted:
+            threading.Event().wait(0.001)
+
+    for thread in threads:
+        thread.join(timeout=5)
+    return grants
+
+
+def test_interactive_campaign_is_not_stuck_behind_backfill(fake_redis, provider):
+    backfill = [Share("backfill", "backfill")] * 40
+    interactive = [Share("interactive", "interactive")] * 10
+
+    grants = _simulate([_scheduler(fake_redis)], provider, backfill + interactive)
+
+    last_interactive = max(i for i, campaign in enumerate(grants) if campaign == "interactive")
+    assert last_interactive < 12
+    assert grants.count("backfill") == 40
+
+
+def test_budget_split_follows_weights(fake_redis, provider):
+    shares = [Share("heavy", "backfill", 3.0)] * 30 + [Share("light", "backfill", 1.0)] * 30
+
+    grants = _simulate([_scheduler(fake_redis)], provider, shares)
+
+    first_40 = grants[:40]
+    assert first_40.count("heavy") == 30
+    assert first_40.count("light") == 10
+
+
+def test_fairness_holds_across_processes(fake_redis, provider):
+    # Each scheduler stands for a separate Lambda invocation with its own memory
+    schedulers = [_scheduler(fake_redis) for _ in range(5)]
+    shares = [Share("backfill", "backfill")] * 40 + [Share("interactive", "interactive")] * 10
+
+    grants = _simulate(schedulers, provider, shares)
+
+    last_interactive = max(i for i, campaign in enumerate(grants) if campaign == "interactive")
+    assert last_interactive < 12
+
+
+def test_idle_campaign_does_not_bank_credit(fake_redis, provider):
+    scheduler = _scheduler(fake_redis)
+    fake_redis.client.set(TOKEN_KEY, -4, ex=3600)
+    for _ in range(5):
+        scheduler.acquire(Share("a"))
+
+    grants = _simulate([scheduler], provider, [Share("a")] * 4 + [Share("b")] * 4)
+
+    assert grants[:2] in (["a", "b"], ["b", "a"])
+
+
+def test_crashed_waiter_stops_holding_the_queue(fake_redis, provider):
+    scheduler = _scheduler(fake_redis)
+    # A process polled once for "a" and died; "b" is next once its lease runs out
+    with patch("stt.scheduler.time.time", return_value=1000.0):
+        assert scheduler._try_grant("a|crashed", "a", 1.0) == 0
+        assert scheduler._try_grant("b|live", "b", 1.0) == -1
+    provider.release()
+    with patch("stt.scheduler.time.time", return_value=1001.0):
+        assert scheduler._try_grant("b|live", "b", 1.0) == -1
+    with patch("stt.scheduler.time.time", return_value=1003.0):
+        assert scheduler._try_grant("b|live", "b", 1.0) == 1
+
+    assert fake_redis.client.zcard(f"{TOKEN_KEY}:queue") == 0
+    assert fake_redis.client.hlen(f"{TOKEN_KEY}:waiters") == 0
+
+
+def test_waiter_behind_another_campaign_backs_off(fake_redis, provider):
+    scheduler = _scheduler(fake_redis)
+    results = iter([-1, -1, -1, -1, 0, 1])
+
+    with (
+        patch.object(scheduler, "_try_grant", side_effect=lambda *_: next(results)),
+        patch("stt.scheduler.time.sleep") as sleep,
+    ):
+        scheduler.acquire(Share("a"))
+
+    delays = [call.args[0] for call in sleep.call_args_list]
+    assert delays == [0.002, 0.004, 0.004, 0.004, 0.001]
+
+
+def test_withdrawn_waiter_leaves_the_queue(fake_redis, provider):
+    scheduler = _scheduler(fake_redis)
+
+    with (
+        patch("stt.scheduler.time.sleep", side_effect=KeyboardInterrupt),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        scheduler.acquire(Share("a"))
+
+    assert provider.waiting() == 0
+    assert fake_redis.client.zcard(f"{TOKEN_KEY}:queue") == 0
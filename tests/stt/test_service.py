@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from stt.scheduler import Share
 from stt.service import TranscriptionError, TranscriptionService
 
 
@@ -65,6 +66,16 @@ class TestTranscriptionService:
         assert result.text == "Hello world."
         mock_deps["aai"].Transcriber.assert_not_called()
 
+    def test_transcribe_waits_on_scheduler(self, mock_deps):
+        scheduler = MagicMock()
+        share = Share("campaign-1", "backfill")
+
+        service = TranscriptionService(scheduler=scheduler)
+        service.transcribe("https://example.com/audio.mp3", share)
+
+        scheduler.acquire.assert_called_once_with(share)
+        mock_deps["cache"].wait_for_rate_limit.assert_not_called()
+
     def test_transcribe_no_speech(self, mock_deps):
         mock_deps["transcript"].text = ""
 